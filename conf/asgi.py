@@ -5,6 +5,15 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/3.1/howto/deployment/asgi/
+
+Запуск воркерами uvicorn вместо синхронных воркеров (Procfile):
+
+    web: gunicorn conf.asgi:application -k uvicorn.workers.UvicornWorker --workers 2
+
+и ASYNC_VIEWS = True в настройках. Тогда главная, списки вакансий, вакансия, компания и поиск
+выполняют независимые запросы к базе параллельно (vacancies.async_views), а один воркер обслуживает
+много одновременных запросов. Соединений с базой на воркер - до ASYNC_DB_THREADS; для PostgreSQL
+стоит задать CONN_MAX_AGE и проверить max_connections. Сравнение режимов: manage.py bench_async.
 """
 
 import os
@@ -41,28 +41,35 @@ INSTALLED_APPS = [
 ]
 
 INSTALLED_APPS += [
-    'vacancies',
+    'vacancies.apps.VacanciesConfig',
     'crispy_forms',
     'phonenumber_field',
     'bootstrap_pagination',
     'captcha',
-    'debug_toolbar',
 ]
 
-INTERNAL_IPS = ['127.0.0.1']  # debug_toolbar
-
 MIDDLEWARE = [
+    'vacancies.media.MediaMiddleware',
+    'vacancies.profiling.ProfilingMiddleware',
+    'vacancies.querycheck.NPlusOneMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'vacancies.sessions.CachedUserMiddleware',  # request.user из кэша
+    'vacancies.owners.OwnersMiddleware',  # request.company, request.resume
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
-    'djangorescue.middleware.StaticMediaMiddleware',
+    'djangorescue.middleware.StaticMediaMiddleware',  # /static/; /media/ отдаёт vacancies.media
 ]
 
+# debug_toolbar только для разработки; в продакшене - ProfilingMiddleware (см. PROFILING_SAMPLE_RATE)
+if DEBUG:
+    INSTALLED_APPS += ['debug_toolbar']
+    MIDDLEWARE.insert(MIDDLEWARE.index('django.middleware.clickjacking.XFrameOptionsMiddleware') + 1,
+                      'debug_toolbar.middleware.DebugToolbarMiddleware')
+    INTERNAL_IPS = ['127.0.0.1']
+
 ROOT_URLCONF = 'conf.urls'
 
 TEMPLATES = [
@@ -95,6 +102,79 @@ DATABASES = {
     },
 }
 
+# Поиск: IndexSearchBackend (свой индекс, любая база), SqliteFTSSearchBackend (FTS5), PostgresSearchBackend (tsvector)
+SEARCH_BACKEND = 'vacancies.search.backends.SqliteFTSSearchBackend'
+
+# Пагинация списков: 'offset' (номера страниц) или 'keyset' (курсор по (published_at, id), без OFFSET и COUNT)
+PAGINATION_MODE = 'keyset'
+
+# Асинхронные публичные страницы (vacancies.async_views); включать при запуске под ASGI, см. conf/asgi.py.
+# ASYNC_DB_THREADS - потоков для запросов к базе на процесс, у каждого своё соединение
+ASYNC_VIEWS = False
+ASYNC_DB_THREADS = 20
+
+# Кэш: локальный в процессе; при нескольких процессах (воркеры gunicorn, run_worker) нужен общий
+# (Memcached/Redis), иначе сброс по записи виден только одному процессу (vacancies.caching, check --deploy)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'board-jobs',
+    },
+}
+
+# Сессии и пользователь (vacancies.sessions): сессии из кэша, в базу - новые и вход/выход сразу, прочие
+# изменения не чаще раза в SESSION_WRITE_BEHIND секунд; request.user, request.company и request.resume
+# (vacancies.owners) - из общего кэша на USER_CACHE_TIMEOUT секунд, с локальным - из базы.
+# Без базы совсем: SESSION_ENGINE = 'django.contrib.sessions.backends.signed_cookies'.
+# Сообщения - только в cookie: ни чтения, ни записи сессии ради них
+SESSION_ENGINE = 'vacancies.sessions'
+SESSION_WRITE_BEHIND = 60
+USER_CACHE_TIMEOUT = 5 * 60
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
+# Итоги списков (vacancies.counts): срок жизни в кэше, секунды; порог приблизительного счёта в поиске
+COUNTS_CACHE_TIMEOUT = 60
+SEARCH_COUNT_LIMIT = 1000
+# Поиск (vacancies.search: индекс, FTS5, tsvector) отдаёт не больше стольких лучших результатов («1000+»)
+SEARCH_RESULTS_LIMIT = SEARCH_COUNT_LIMIT + 1
+
+# Примеры навыков на главной (vacancies.skills.popular_skills): срок жизни списка в кэше, секунды
+SKILLS_CACHE_TIMEOUT = 60 * 60
+
+# Отклики работодателю: сколько последних показывать на странице вакансии; все - в выгрузке CSV/XLSX
+# (vacancies.exports), которая читает базу пачками по EXPORT_CHUNK_SIZE
+APPLICATIONS_ON_PAGE = 20
+EXPORT_CHUNK_SIZE = 2000
+
+# Подбор резюме к вакансии (vacancies.matching): веса составляющих оценки, сколько кандидатов показывать,
+# снимок матрицы признаков (manage.py build_matching) и как часто догружать изменённые резюме, секунды
+MATCHING_WEIGHTS = {'specialty': 3, 'grade': 1, 'salary': 2, 'status': 1, 'text': 3}
+MATCHING_CANDIDATES = 10
+MATCHING_SNAPSHOT = BASE_DIR / 'matching.npz'
+MATCHING_SYNC_INTERVAL = 60
+
+# Похожие вакансии (vacancies.similar): сколько показывать, наименьшее сходство (косинус TF-IDF), строк
+# в блоке умножения матриц (блок - SIMILAR_BLOCK_SIZE x число вакансий float32) и как часто воркер строит
+# матрицу заново, секунды
+SIMILAR_COUNT = 6
+SIMILAR_MIN_SCORE = 0.1
+SIMILAR_BLOCK_SIZE = 256
+SIMILAR_INDEX_TTL = 60 * 60
+
+# Подборка вакансий по резюме (vacancies.recommendations): длина ленты, веса составляющих оценки и сколько
+# дней свежести стоят столько же, сколько вес fresh
+RECOMMENDATIONS_SIZE = 30
+RECOMMENDATIONS_WEIGHTS = {'grade': 1, 'salary': 2, 'text': 3, 'fresh': 1}
+RECOMMENDATIONS_FRESHNESS = 30
+
+# JSON API (vacancies.api): размер страницы по умолчанию и наибольший (?limit=), срок жизни ответов в кэше
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+API_CACHE_TIMEOUT = 300
+
+# Карточки вакансий в списках (vacancies.cards): срок жизни готового HTML в кэше, секунды
+CARD_CACHE_TIMEOUT = 24 * 60 * 60
+
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
 
@@ -145,6 +225,77 @@ MEDIA_COMPANY_IMAGE_DIR = 'company_images'
 MEDIA_SPECIALITY_IMAGE_DIR = 'speciality_images'
 MEDIA_USER_PHOTO_IMAGE_DIR = 'user_photo'
 
+# Отдача media (vacancies.media): 'python', 'x-accel' (nginx) или 'x-sendfile' (Apache, lighttpd)
+MEDIA_SERVE = 'python'
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+MEDIA_MAX_AGE = 3600
+
+# Загрузки: сразу во временный файл, проверка типа и размера по ходу приёма (vacancies.uploads)
+FILE_UPLOAD_HANDLERS = ['vacancies.uploads.ImageUploadHandler']
+IMAGE_UPLOAD_MAX_SIZE = 10 * 1024 * 1024
+
+# Очередь фоновых задач в базе (vacancies.jobs): повтор через JOB_RETRY_DELAY * 2^(попытка - 1) с,
+# задание зависшего воркера возвращается в очередь через JOB_TIMEOUT с (проверка раз в JOB_REQUEUE_INTERVAL с)
+JOB_RETRY_DELAY = 30
+JOB_TIMEOUT = 600
+JOB_REQUEUE_INTERVAL = 60
+
+# Письма работодателям (vacancies.tasks); для отправки настроить SMTP (EMAIL_HOST и т.д.)
+EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+DEFAULT_FROM_EMAIL = 'Board Jobs <noreply@board-jobs.herokuapp.com>'
+SITE_URL = 'https://board-jobs.herokuapp.com'
+
+# Запросы к базе (vacancies.querycheck). N+1: 'raise' - исключение, 'log' - предупреждение для доли
+# NPLUSONE_SAMPLE_RATE запросов, 'off'. QUERY_BUDGETS - наибольшее число запросов на страницу с пустым
+# кэшем (manage.py check_queries; --suggest печатает текущие значения)
+NPLUSONE_MODE = 'raise' if DEBUG else 'log'
+NPLUSONE_THRESHOLD = 3
+NPLUSONE_SAMPLE_RATE = 0.01
+QUERY_BUDGETS = {
+    'main': 3,
+    'vacancies': 6,
+    'resumes': 5,
+    'resumes_access': 0,
+    'vacancy': 3,
+    'vacancies_specialty': 8,
+    'vacancies_skill': 7,
+    'resume_send': 0,
+    'company': 4,
+    'search': 2,
+    'user_profile': 3,
+    'my_company_letsstart': 3,
+    'my_company_empty_form': 2,
+    'my_company_form': 3,
+    'my_vacancies': 4,
+    'my_vacancy_empty_form': 3,
+    'my_vacancy_form': 8,
+    'my_applications_export': 3,
+    'my_vacancy_applications_export': 4,
+    'my_resume_letsstart': 3,
+    'my_resume_empty_form': 3,
+    'my_resume_form': 4,
+    'my_recommendations': 4,
+    'login': 0,
+    'register': 1,
+    'profiling': 2,
+    'api_vacancies': 1,
+    'api_vacancy_search': 2,
+    'api_vacancy': 1,
+    'api_companies': 1,
+    'api_company': 1,
+    'api_company_vacancies': 2,
+    'api_specialties': 1,
+    'api_specialty': 1,
+    'api_specialty_vacancies': 2,
+}
+
+# Профилирование (vacancies.profiling): доля запросов с замером (0 - выключено), Server-Timing не только для
+# staff, сколько последних замеров хранить на имя URL и как часто процесс выгружает их в кэш, с
+PROFILING_SAMPLE_RATE = 0.05
+PROFILING_SERVER_TIMING = False
+PROFILING_WINDOW = 500
+PROFILING_FLUSH_INTERVAL = 10
+
 # messages -> css bootstrap
 MESSAGE_TAGS = {
     messages.DEBUG: 'alert-secondary',
@@ -15,17 +15,22 @@ Including another URLconf
 """
 import debug_toolbar
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.contrib.auth.views import LogoutView
 from django.urls import include, path
 
-from vacancies.views import CompanyCardView, MainView, UserProfile, VacanciesView, VacancyView
+from vacancies.api import CompaniesApiView, CompanyApiView, CompanyVacanciesApiView, SpecialtiesApiView
+from vacancies.api import SpecialtyApiView, SpecialtyVacanciesApiView, VacanciesApiView, VacancyApiView
+from vacancies.api import VacancySearchApiView
+from vacancies.async_views import public_view
+from vacancies.views import CompanyCardView, MainView, UserProfile, VacanciesSkillView, VacanciesView, VacancyView
 from vacancies.views import custom_handler404, custom_handler500
 from vacancies.views import Login, Registration
+from vacancies.views import MyApplicationsExportView, MyVacancyApplicationsExportView
 from vacancies.views import MyCompanyCreateView, MyCompanyDeleteView, MyCompanyLetsstarView, MyCompanyView
+from vacancies.views import MyRecommendationsView
 from vacancies.views import MyResumeCreateView, MyResumeDeleteView, MyResumeLetsstartView, MyResumeView
-from vacancies.views import MyVacanciesView, MyVacancyCreateView, MyVacancyDeleteView, MyVacancyView
+from vacancies.views import MyVacanciesView, MyVacancyCreateView, MyVacancyDeleteView, MyVacancyView, ProfilingView
 from vacancies.views import ResumesAccessView, ResumeSendingView, ResumesView, SearchView, VacanciesSpecialtyView
 
 handler404 = custom_handler404
@@ -33,15 +38,16 @@ handler500 = custom_handler500
 
 urlpatterns = [
     # основные
-    path('', MainView.as_view(), name='main'),
-    path('vacancies', VacanciesView.as_view(), name='vacancies'),  # все вакансии
+    path('', public_view(MainView), name='main'),
+    path('vacancies', public_view(VacanciesView), name='vacancies'),  # все вакансии
     path('resumes', ResumesView.as_view(), name='resumes'),  # все резюме
     path('resumes_access', ResumesAccessView.as_view(), name='resumes_access'),  # все резюме
-    path('vacancies/<int:vacancy_id>', VacancyView.as_view(), name='vacancy'),  # одна вакансия
-    path('vacancies/cat/<str:specialty>', VacanciesSpecialtyView.as_view(), name='vacancies_specialty'),
+    path('vacancies/<int:vacancy_id>', public_view(VacancyView), name='vacancy'),  # одна вакансия
+    path('vacancies/cat/<str:specialty>', public_view(VacanciesSpecialtyView), name='vacancies_specialty'),
+    path('vacancies/skill/<str:skill>', public_view(VacanciesSkillView), name='vacancies_skill'),  # по навыку
     path('vacancies/<int:vacancy_id>/send/', ResumeSendingView.as_view(), name='resume_send'),  # отправка заявки
-    path('companies/<int:company_id>', CompanyCardView.as_view(), name='company'),  # компания
-    path('search', SearchView.as_view(), name='search'),
+    path('companies/<int:company_id>', public_view(CompanyCardView), name='company'),  # компания
+    path('search', public_view(SearchView), name='search'),
     path('profile/<int:pk>', UserProfile.as_view(), name='user_profile'),
 
     # компания
@@ -54,18 +60,39 @@ urlpatterns = [
     path('mycompany/vacancies/create/', MyVacancyCreateView.as_view(), name='my_vacancy_empty_form'),  # пустая форма
     path('mycompany/vacancies/<int:vacancy_id>', MyVacancyView.as_view(), name='my_vacancy_form'),  # заполненная форма
     path('mycompany/vacancies/<int:vacancy_id>/delete/', MyVacancyDeleteView.as_view(), name='my_vacancy_delete'),
+    # выгрузка откликов, ?format=csv|xlsx
+    path('mycompany/applications/', MyApplicationsExportView.as_view(), name='my_applications_export'),
+    path('mycompany/vacancies/<int:vacancy_id>/applications/', MyVacancyApplicationsExportView.as_view(),
+         name='my_vacancy_applications_export'),
 
     # резюме
     path('myresume/letsstart', MyResumeLetsstartView.as_view(), name='my_resume_letsstart'),  # предложение создать
     path('myresume/create/', MyResumeCreateView.as_view(), name='my_resume_empty_form'),  # пустая форма
     path('myresume/', MyResumeView.as_view(), name='my_resume_form'),  # заполненная форма
     path('myresume/<int:user_id>/delete', MyResumeDeleteView.as_view(), name='my_resume_delete'),  # удаление резюме
+    path('myresume/vacancies/', MyRecommendationsView.as_view(), name='my_recommendations'),  # подборка вакансий
+]
+
+urlpatterns += [
+    # API только для чтения (vacancies.api)
+    path('api/v1/vacancies', VacanciesApiView.as_view(), name='api_vacancies'),
+    path('api/v1/vacancies/search', VacancySearchApiView.as_view(), name='api_vacancy_search'),  # ?q=
+    path('api/v1/vacancies/<int:vacancy_id>', VacancyApiView.as_view(), name='api_vacancy'),
+    path('api/v1/companies', CompaniesApiView.as_view(), name='api_companies'),
+    path('api/v1/companies/<int:company_id>', CompanyApiView.as_view(), name='api_company'),
+    path('api/v1/companies/<int:company_id>/vacancies', CompanyVacanciesApiView.as_view(),
+         name='api_company_vacancies'),
+    path('api/v1/specialties', SpecialtiesApiView.as_view(), name='api_specialties'),
+    path('api/v1/specialties/<str:specialty>', SpecialtyApiView.as_view(), name='api_specialty'),
+    path('api/v1/specialties/<str:specialty>/vacancies', SpecialtyVacanciesApiView.as_view(),
+         name='api_specialty_vacancies'),
 ]
 
 urlpatterns += [
     path('login/', Login.as_view(), name='login'),
     path('logout/', LogoutView.as_view(), name='logout'),
     path('register/', Registration.as_view(), name='register'),
+    path('admin/profiling/', ProfilingView.as_view(), name='profiling'),  # статистика запросов, только staff
     path('admin/', admin.site.urls),
     path('captcha/', include('captcha.urls')),
 ]
@@ -74,6 +101,3 @@ if settings.DEBUG:
     urlpatterns += [
         path('__debug__/', include(debug_toolbar.urls)),
     ]
-
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -1,21 +1,28 @@
 from django.contrib import admin
 
-from .models import Application, Company, Resume, Specialty, Vacancy
+from . import jobs
+from .models import Application, Company, Job, Resume, Skill, Specialty, Vacancy
 
 
 @admin.register(Company)
 class CompanyAdmin(admin.ModelAdmin):
-    pass
+    readonly_fields = ('vacancy_count',)
 
 
 @admin.register(Vacancy)
 class VacancyAdmin(admin.ModelAdmin):
-    pass
+    readonly_fields = ('application_count',)
+
+
+@admin.register(Skill)
+class SkillAdmin(admin.ModelAdmin):
+    list_display = ('name', 'slug')
+    search_fields = ('name',)
 
 
 @admin.register(Specialty)
 class SpecialtyAdmin(admin.ModelAdmin):
-    pass
+    readonly_fields = ('vacancy_count',)
 
 
 @admin.register(Application)
@@ -26,3 +33,15 @@ class ApplicationAdmin(admin.ModelAdmin):
 @admin.register(Resume)
 class ResumeAdmin(admin.ModelAdmin):
     pass
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'priority', 'attempts', 'run_at', 'locked_by')
+    list_filter = ('status', 'name')
+    readonly_fields = ('locked_by', 'locked_at', 'last_error', 'created_at')
+    actions = ('retry',)
+
+    def retry(self, request, queryset):
+        self.message_user(request, f'В очередь поставлено заданий: {jobs.retry(queryset)}')
+    retry.short_description = 'Повторить'
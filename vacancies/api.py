@@ -0,0 +1,243 @@
+"""
+JSON API только для чтения: /api/v1/ (вакансии, компании, специализации).
+
+Для агрегаторов, которые иначе разбирают HTML-страницы: ответ - данные без шаблонов, сессий и
+пользователя, поэтому префикс /api/ можно отдать отдельным воркерам.
+
+* списки листаются курсором (?cursor= из поля next/previous, ?limit= до API_MAX_PAGE_SIZE), как
+  HTML-списки в режиме keyset (vacancies.pagination);
+* ?fields=id,title,... - только перечисленные поля, из базы выбираются они же (.only());
+* готовый JSON кэшируется по адресу запроса на cache_timeout представления; запись вакансии, компании
+  или специализации сбрасывает все ответы сразу (поколение в ключе, см. vacancies.signals);
+* ETag - хэш тела ответа: совпадение If-None-Match даёт 304 прямо из кэша, без базы;
+* gzip при Accept-Encoding: gzip.
+"""
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models.fields.files import FieldFile
+from django.http import Http404, HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.decorators import method_decorator
+from django.views.decorators.gzip import gzip_page
+from django.views.generic import View
+
+from vacancies.models import Company, Specialty, Vacancy
+from vacancies.pagination import KeysetPaginator
+from vacancies.search.backends import get_backend, RankedResults
+
+GENERATION_KEY = 'api:generation'
+
+
+class ApiError(Exception):
+    """Ошибка в параметрах запроса: ответ {"error": ...} с кодом status"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def invalidate():
+    """Сбрасывает все закэшированные ответы API"""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 1, None)
+
+
+#################################################
+#                    Ресурсы                    #
+#################################################
+class Resource:
+    """Модель, поля, доступные в ответе, и ключ курсорной пагинации"""
+
+    def __init__(self, model, fields, keys):
+        self.model = model
+        self.fields = fields
+        self.keys = keys
+
+    def select(self, fields: str) -> tuple:
+        """Поля из параметра fields= (все, если не задан)"""
+        selected = tuple(name for name in fields.split(',') if name) or self.fields
+        unknown = set(selected) - set(self.fields)
+        if unknown:
+            raise ApiError(f'Неизвестные поля: {", ".join(sorted(unknown))}. Доступны: {", ".join(self.fields)}')
+        return selected
+
+    def queryset(self, fields):
+        # ключ пагинации нужен всегда, даже если его нет в ответе
+        return self.model.objects.only(*dict.fromkeys(fields + self.keys))
+
+    def serialize(self, instance, fields) -> dict:
+        return {name: _value(instance, self.model._meta.get_field(name)) for name in fields}
+
+
+def _value(instance, field):
+    value = getattr(instance, field.attname)
+    if isinstance(value, FieldFile):
+        return value.url if value else None
+    return value
+
+
+VACANCIES = Resource(
+    Vacancy,
+    ('id', 'title', 'skills', 'description', 'salary_min', 'salary_max', 'published_at', 'updated_at',
+     'company', 'specialty'),
+    ('published_at', 'id'),
+)
+COMPANIES = Resource(
+    Company,
+    ('id', 'name', 'location', 'description', 'employee_count', 'logo', 'vacancy_count', 'updated_at'),
+    ('id',),
+)
+SPECIALTIES = Resource(Specialty, ('code', 'title', 'picture', 'vacancy_count', 'updated_at'), ('code',))
+
+
+#################################################
+#                 Представления                 #
+#################################################
+@method_decorator(gzip_page, name='dispatch')
+class ApiView(View):
+    """Общая часть: поля, кэш ответа по адресу, ETag, ошибки в JSON"""
+    http_method_names = ['get', 'head']
+    resource = None
+    cache_timeout = None
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except ApiError as error:
+            return JsonResponse({'error': str(error)}, status=error.status, json_dumps_params={'ensure_ascii': False})
+
+    def get(self, request, *args, **kwargs):
+        generation = cache.get_or_set(GENERATION_KEY, 1, None)
+        digest = md5(request.get_full_path().encode()).hexdigest()
+        key = f'api:{generation}:{digest}'
+        cached = cache.get(key)
+        if cached is None:
+            content = DjangoJSONEncoder(ensure_ascii=False).encode(self.get_data()).encode()
+            cached = content, f'"{md5(content).hexdigest()}"'
+            cache.set(key, cached, self.get_cache_timeout())
+        return self.respond(*cached)
+
+    def respond(self, content, etag):
+        response = get_conditional_response(self.request, etag=etag)
+        if response is None:
+            response = HttpResponse(content, content_type='application/json; charset=utf-8')
+        response['ETag'] = etag
+        return response
+
+    def get_cache_timeout(self):
+        return self.cache_timeout or getattr(settings, 'API_CACHE_TIMEOUT', 300)
+
+    def get_fields(self) -> tuple:
+        return self.resource.select(self.request.GET.get('fields', ''))
+
+    def get_data(self) -> dict:
+        raise NotImplementedError
+
+
+class ApiDetailView(ApiView):
+    lookup = None
+
+    def get_data(self):
+        fields = self.get_fields()
+        instance = self.resource.queryset(fields).filter(pk=self.kwargs[self.lookup]).first()
+        if instance is None:
+            raise ApiError(f'{self.resource.model._meta.verbose_name.capitalize()} не найдена', status=404)
+        return self.resource.serialize(instance, fields)
+
+
+class ApiListView(ApiView):
+
+    def get_page_size(self) -> int:
+        maximum = getattr(settings, 'API_MAX_PAGE_SIZE', 100)
+        limit = self.request.GET.get('limit', getattr(settings, 'API_PAGE_SIZE', 20))
+        try:
+            return min(max(int(limit), 1), maximum)
+        except ValueError:
+            raise ApiError(f'limit должен быть числом от 1 до {maximum}')
+
+    def get_object_list(self, queryset):
+        return queryset
+
+    def page_url(self, cursor):
+        if cursor is None:
+            return None
+        query = self.request.GET.copy()
+        query['cursor'] = cursor
+        return self.request.build_absolute_uri(f'{self.request.path}?{query.urlencode()}')
+
+    def get_data(self):
+        fields = self.get_fields()
+        object_list = self.get_object_list(self.resource.queryset(fields))
+        paginator = KeysetPaginator(object_list, self.get_page_size(), self.resource.keys)
+        try:
+            page = paginator.page(self.request.GET.get('cursor'))
+        except Http404:
+            raise ApiError('Неверный курсор')
+        return {
+            'results': [self.resource.serialize(instance, fields) for instance in page],
+            'next': self.page_url(page.next_cursor),
+            'previous': self.page_url(page.previous_cursor),
+        }
+
+
+class VacanciesApiView(ApiListView):
+    """Вакансии, от новых к старым"""
+    resource = VACANCIES
+
+
+class VacancyApiView(ApiDetailView):
+    resource = VACANCIES
+    lookup = 'vacancy_id'
+
+
+class VacancySearchApiView(ApiListView):
+    """Поиск вакансий (?q=) в порядке релевантности"""
+    resource = VACANCIES
+    cache_timeout = 60
+
+    def get_object_list(self, queryset):
+        query = self.request.GET.get('q', '').strip()
+        if not query:
+            raise ApiError('Не задан поисковый запрос q')
+        return RankedResults(get_backend().search_vacancies(query), queryset)
+
+
+class CompaniesApiView(ApiListView):
+    resource = COMPANIES
+
+
+class CompanyApiView(ApiDetailView):
+    resource = COMPANIES
+    lookup = 'company_id'
+
+
+class CompanyVacanciesApiView(ApiListView):
+    resource = VACANCIES
+
+    def get_object_list(self, queryset):
+        if not Company.objects.filter(pk=self.kwargs['company_id']).exists():
+            raise ApiError('Компания не найдена', status=404)
+        return queryset.filter(company_id=self.kwargs['company_id'])
+
+
+class SpecialtiesApiView(ApiListView):
+    resource = SPECIALTIES
+
+
+class SpecialtyApiView(ApiDetailView):
+    resource = SPECIALTIES
+    lookup = 'specialty'
+
+
+class SpecialtyVacanciesApiView(ApiListView):
+    resource = VACANCIES
+
+    def get_object_list(self, queryset):
+        if not Specialty.objects.filter(pk=self.kwargs['specialty']).exists():
+            raise ApiError('Специализация не найдена', status=404)
+        return queryset.filter(specialty_id=self.kwargs['specialty'])
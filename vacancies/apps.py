@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class VacanciesConfig(AppConfig):
     name = 'vacancies'
     verbose_name = 'Вакансии и резюме'
+
+    def ready(self):
+        from vacancies import caching, signals  # noqa: F401
@@ -0,0 +1,91 @@
+"""
+Асинхронные варианты публичных страниц: главная, списки вакансий, вакансия (GET), компания, поиск.
+
+Включаются settings.ASYNC_VIEWS и имеют смысл под ASGI-сервером (запуск - в conf/asgi.py). Логика страниц не
+дублируется: обёртка async_view берёт синхронный класс представления и
+
+1. получает список объектов (get_queryset) в отдельном потоке;
+2. параллельно вычисляет независимые части страницы - свойства из атрибута async_prefetch
+   (итоги, фасеты, компания, ...), каждое в своём потоке со своим соединением с базой;
+3. выполняет обычный dispatch и рендеринг в потоке: шаблоны тоже обращаются к базе (request.user).
+
+Пока идут запросы к базе, цикл событий обслуживает другие запросы. Остальные методы (POST) проходят
+через тот же dispatch в потоке без предварительной выборки.
+
+ProfilingMiddleware и NPlusOneMiddleware считают запросы через connection.execute_wrapper, а соединение у
+каждого потока своё: запросы в потоках _executor (то есть почти все запросы этих страниц) они не видят.
+Число запросов асинхронных страниц проверяется с ASYNC_VIEWS = False (check_queries) - логика та же.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+from functools import partial
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.views.generic.list import MultipleObjectMixin
+
+# Свой пул, а не пул цикла событий по умолчанию (min(32, CPU + 4) потоков): потоки здесь ждут базу,
+# а не считают, и на маленькой машине пяти потоков мало. Каждый поток держит своё соединение с базой.
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'ASYNC_DB_THREADS', 20), thread_name_prefix='async-db',
+)
+
+
+def _call_in_thread(func, *args, **kwargs):
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+def database_sync_to_async(func):
+    """Синхронная функция, работающая с базой, как корутина: выполняется в пуле потоков параллельно"""
+    async def call(*args, **kwargs):
+        context = contextvars.copy_context()
+        task = partial(context.run, _call_in_thread, func, *args, **kwargs)
+        return await asyncio.get_event_loop().run_in_executor(_executor, task)
+    return call
+
+
+def _fetch_object_list(view):
+    view.object_list = view.get_queryset()
+    # ListView.get() вызовет get_queryset ещё раз - отдаём уже полученный список (поиск не повторяется)
+    view.get_queryset = lambda: view.object_list
+
+
+async def prefetch(view):
+    if isinstance(view, MultipleObjectMixin):
+        await database_sync_to_async(_fetch_object_list)(view)
+    names = getattr(view, 'async_prefetch', ())
+    await asyncio.gather(*(database_sync_to_async(getattr)(view, name) for name in names))
+
+
+def _respond(view, request, *args, **kwargs):
+    response = view.dispatch(request, *args, **kwargs)
+    return response.render() if hasattr(response, 'render') else response
+
+
+def _prefetchable(request) -> bool:
+    # условный запрос обычно заканчивается 304 (vacancies.versions) - выборка для рендеринга не нужна
+    conditional = {'HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE'} & request.META.keys()
+    return request.method in ('GET', 'HEAD') and not conditional
+
+
+def async_view(view_class, **initkwargs):
+    async def view(request, *args, **kwargs):
+        instance = view_class(**initkwargs)
+        instance.setup(request, *args, **kwargs)
+        if _prefetchable(request):
+            await prefetch(instance)
+        return await database_sync_to_async(_respond)(instance, request, *args, **kwargs)
+
+    view.view_class = view_class
+    view.__doc__ = view_class.__doc__
+    return view
+
+
+def public_view(view_class):
+    """Представление для urls.py: асинхронное при settings.ASYNC_VIEWS, иначе обычное as_view()"""
+    return async_view(view_class) if getattr(settings, 'ASYNC_VIEWS', False) else view_class.as_view()
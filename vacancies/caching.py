@@ -0,0 +1,38 @@
+"""
+Общий ли кэш у процессов сайта.
+
+LocMemCache (и DummyCache) у каждого процесса свой: сброс, сделанный в одном процессе (другой воркер
+gunicorn, фоновый run_worker из Procfile), остальные не видят. Поэтому то, что нельзя показывать
+устаревшим, - пользователь, его компания и резюме (vacancies.sessions, vacancies.owners) - хранится между
+запросами только в общем кэше (Memcached, Redis, база, файлы); с локальным каждый запрос читает их из базы.
+Итоги списков (vacancies.counts) и ответы API (vacancies.api) кэшируются и в локальном, но изменения
+фоновых задач видны там только по истечении их срока жизни.
+
+Проверка vacancies.W001 (manage.py check --deploy, запуск run_worker) напоминает о локальном кэше.
+"""
+from django.conf import settings
+from django.core import checks
+
+PROCESS_LOCAL = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+W001 = checks.Warning(
+    'Кэш по умолчанию свой у каждого процесса',
+    hint=(
+        'Сбросы кэша из фоновых задач (run_worker) и других процессов не видны: итоги и API устаревают до '
+        'COUNTS_CACHE_TIMEOUT/API_CACHE_TIMEOUT, пользователь и компания читаются из базы на каждый запрос. '
+        'Укажите в CACHES общий кэш (Memcached, Redis, база).'
+    ),
+    id='vacancies.W001',
+)
+
+
+def is_shared(alias: str = 'default') -> bool:
+    return settings.CACHES[alias]['BACKEND'] not in PROCESS_LOCAL
+
+
+@checks.register(checks.Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs) -> list:
+    return [] if is_shared() else [W001]
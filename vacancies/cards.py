@@ -0,0 +1,37 @@
+"""
+Кэш карточек вакансий в списках (вакансии, поиск, страница компании).
+
+Карточка (vacancies/vacancy_card.html) - готовый HTML по ключу из id вакансии и версии: updated_at
+вакансии и её компании. Сохранение вакансии или компании меняет версию, и старая карточка становится
+недостижимой (вытесняется кэшем или истекает через CARD_CACHE_TIMEOUT). Миниатюры логотипа создаются
+в фоне; задача тоже сдвигает updated_at компании (vacancies.thumbnails.process_image).
+
+Страница списка - один get_many на все карточки и один set_many на отсутствующие. Вакансии должны
+быть выбраны с select_related('company').
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+TEMPLATE = 'vacancies/vacancy_card.html'
+
+
+def card_key(vacancy) -> str:
+    return f'card:{vacancy.pk}:{vacancy.updated_at.timestamp()}:{vacancy.company.updated_at.timestamp()}'
+
+
+def render_card(vacancy) -> str:
+    return render_to_string(TEMPLATE, {'vacancy': vacancy})
+
+
+def render_cards(vacancies) -> str:
+    """HTML карточек в порядке vacancies: из кэша, недостающие рендерятся и кладутся в кэш"""
+    vacancies = list(vacancies)
+    keys = {vacancy.pk: card_key(vacancy) for vacancy in vacancies}
+    cached = cache.get_many(keys.values())
+    missing = {keys[vacancy.pk]: render_card(vacancy) for vacancy in vacancies if keys[vacancy.pk] not in cached}
+    if missing:
+        cache.set_many(missing, getattr(settings, 'CARD_CACHE_TIMEOUT', 86400))
+    cached.update(missing)
+    return mark_safe(''.join(cached[keys[vacancy.pk]] for vacancy in vacancies))
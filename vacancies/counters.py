@@ -0,0 +1,80 @@
+"""
+Денормализованные счётчики: Specialty.vacancy_count, Company.vacancy_count, Vacancy.application_count.
+
+Обновляются атомарно через F() при создании, переносе и удалении вакансий/откликов (см. vacancies.signals).
+Счётчики специализации и компании меняют и updated_at: по нему страницы со списками отдают Last-Modified
+(vacancies.versions). Число откликов видит только работодатель на страницах без условного GET - отклик
+updated_at вакансии не трогает (иначе устаревали бы её карточка и ETag).
+Массовые операции (QuerySet.update, bulk_create) сигналов не вызывают - после них нужен reconcile()
+(для вставки вакансий пачкой достаточно vacancies_created()).
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from vacancies.models import Application, Company, Specialty, Vacancy
+
+
+# модели, чей счётчик - часть версии страницы
+VERSIONED = (Specialty, Company)
+
+
+def shift(model, pk, field, delta):
+    if pk is not None:
+        touched = {'updated_at': timezone.now()} if model in VERSIONED else {}
+        model.objects.filter(pk=pk).update(**{field: F(field) + delta}, **touched)
+
+
+def vacancy_created(vacancy):
+    shift(Specialty, vacancy.specialty_id, 'vacancy_count', 1)
+    shift(Company, vacancy.company_id, 'vacancy_count', 1)
+
+
+def vacancy_deleted(vacancy):
+    shift(Specialty, vacancy.specialty_id, 'vacancy_count', -1)
+    shift(Company, vacancy.company_id, 'vacancy_count', -1)
+
+
+def vacancies_created(vacancies):
+    """Массовая вставка (bulk_create): один UPDATE на каждую затронутую специализацию и компанию"""
+    for model, attribute in ((Specialty, 'specialty_id'), (Company, 'company_id')):
+        for pk, added in Counter(getattr(vacancy, attribute) for vacancy in vacancies).items():
+            shift(model, pk, 'vacancy_count', added)
+
+
+def vacancy_moved(vacancy, old_specialty_id, old_company_id):
+    """Вакансию перенесли в другую специализацию и/или компанию"""
+    if vacancy.specialty_id != old_specialty_id:
+        shift(Specialty, old_specialty_id, 'vacancy_count', -1)
+        shift(Specialty, vacancy.specialty_id, 'vacancy_count', 1)
+    if vacancy.company_id != old_company_id:
+        shift(Company, old_company_id, 'vacancy_count', -1)
+        shift(Company, vacancy.company_id, 'vacancy_count', 1)
+
+
+def application_created(application):
+    shift(Vacancy, application.vacancy_id, 'application_count', 1)
+
+
+def application_deleted(application):
+    shift(Vacancy, application.vacancy_id, 'application_count', -1)
+
+
+def recount(model, field, related_model, related_field):
+    """Пересчитывает счётчик одним UPDATE с коррелированным подзапросом"""
+    related = related_model.objects.filter(**{related_field: OuterRef('pk')}).order_by()
+    counts = related.values(related_field).annotate(total=Count('pk')).values('total')
+    return model.objects.update(**{field: Coalesce(Subquery(counts, output_field=IntegerField()), 0)})
+
+
+@transaction.atomic
+def reconcile():
+    """Пересчёт всех счётчиков по фактическим данным"""
+    return {
+        'specialty.vacancy_count': recount(Specialty, 'vacancy_count', Vacancy, 'specialty'),
+        'company.vacancy_count': recount(Company, 'vacancy_count', Vacancy, 'company'),
+        'vacancy.application_count': recount(Vacancy, 'application_count', Application, 'vacancy'),
+    }
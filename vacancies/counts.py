@@ -0,0 +1,106 @@
+"""
+Количество результатов для списков.
+
+Итоги кэшируются по ключу (пространство, вид + фильтр). Каждое пространство ('vacancies', 'resumes')
+имеет номер поколения, входящий в ключ: запись в таблицу увеличивает поколение, и все старые итоги
+становятся недостижимыми (см. vacancies.signals). С локальным кэшем (LocMemCache) сброс виден только
+текущему процессу, поэтому итоги ещё и живут не дольше COUNTS_CACHE_TIMEOUT.
+"""
+from hashlib import md5
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+
+class ResultCount(NamedTuple):
+    value: int
+    approximate: bool = False
+
+
+def _limited(found: int, limit=None) -> ResultCount:
+    if limit is not None and found > limit:
+        return ResultCount(limit, True)
+    return ResultCount(found)
+
+
+def count_queryset(queryset, limit=None) -> ResultCount:
+    """COUNT(*) или, если задан limit, выборка не более limit + 1 id («1000+»)"""
+    if limit is None:
+        return ResultCount(queryset.count())
+    return _limited(len(queryset.order_by().values_list('pk', flat=True)[:limit + 1]), limit)
+
+
+def count_objects(object_list, limit=None) -> ResultCount:
+    """Для QuerySet - запрос к базе, для уже посчитанных списков (результаты поиска) - len()"""
+    if isinstance(object_list, QuerySet):
+        return count_queryset(object_list, limit)
+    return _limited(len(object_list), limit)
+
+
+def _generation_key(namespace):
+    return f'counts:{namespace}:generation'
+
+
+def invalidate(namespace):
+    """Сбрасывает все закэшированные итоги пространства"""
+    try:
+        cache.incr(_generation_key(namespace))
+    except ValueError:
+        cache.set(_generation_key(namespace), 1, None)
+
+
+def cached_value(namespace, key, compute):
+    """compute() из кэша под поколением пространства: сбрасывается тем же invalidate(), что и итоги"""
+    generation = cache.get_or_set(_generation_key(namespace), 1, None)
+    digest = md5(repr(key).encode()).hexdigest()
+    cache_key = f'counts:{namespace}:{generation}:{digest}'
+
+    value = cache.get(cache_key)
+    if value is None:
+        value = compute()
+        cache.set(cache_key, value, getattr(settings, 'COUNTS_CACHE_TIMEOUT', 60))
+    return value
+
+
+def cached_count(namespace, key, queryset, limit=None) -> ResultCount:
+    return ResultCount(*cached_value(namespace, (key, limit), lambda: tuple(count_queryset(queryset, limit))))
+
+
+class CountedPaginator(Paginator):
+    """Paginator с заранее известным количеством объектов (без своего COUNT(*))"""
+
+    def __init__(self, *args, count=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._known_count = count
+
+    @cached_property
+    def count(self):
+        if self._known_count is None:
+            return super().count
+        return self._known_count
+
+
+class CachedCountMixin:
+    """
+    Один итог на запрос для ListView: из кэша по get_count_key(), общий для paginator и контекста.
+
+    count_limit включает приблизительный режим: считается не больше count_limit объектов.
+    """
+    count_namespace = 'vacancies'
+    count_limit = None
+
+    def get_count_key(self):
+        return (type(self).__name__,)
+
+    @cached_property
+    def total(self) -> ResultCount:
+        if not isinstance(self.object_list, QuerySet):
+            return count_objects(self.object_list, self.count_limit)
+        return cached_count(self.count_namespace, self.get_count_key(), self.object_list, self.count_limit)
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return CountedPaginator(queryset, per_page, count=self.total.value, **kwargs)
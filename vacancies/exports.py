@@ -0,0 +1,197 @@
+"""
+Выгрузка откликов работодателю потоком (StreamingHttpResponse): CSV или XLSX.
+
+Отклики читаются из базы через .iterator(chunk_size=EXPORT_CHUNK_SIZE) - курсором на стороне сервера,
+где база его поддерживает (PostgreSQL), иначе fetchmany() - и уходят клиенту пачками по мере чтения.
+Память воркера не зависит от числа откликов, первые байты клиент получает сразу.
+
+XLSX собирается без сторонних библиотек: zip-архив (zipfile умеет писать в поток без seek) с минимальным
+набором частей SpreadsheetML, строки листа пишутся в архив по пачке.
+"""
+import csv
+from itertools import islice
+import re
+from xml.sax.saxutils import escape
+import zipfile
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import Http404, StreamingHttpResponse
+
+# (заголовок, поле для values_list)
+COLUMNS = (
+    ('Номер', 'id'),
+    ('Вакансия', 'vacancy__title'),
+    ('Имя', 'written_username'),
+    ('Телефон', 'written_phone'),
+    ('Сопроводительное письмо', 'written_cover_letter'),
+    ('Фотография', 'written_photo'),
+)
+
+
+def _chunk_size() -> int:
+    return getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+
+
+def _batches(rows, size):
+    rows = iter(rows)
+    batch = list(islice(rows, size))
+    while batch:
+        yield batch
+        batch = list(islice(rows, size))
+
+
+def _photo_url(name) -> str:
+    return f'{settings.SITE_URL}{default_storage.url(name)}' if name else ''
+
+
+def application_rows(queryset):
+    """Строки выгрузки по порядку откликов; телефон - строкой, фотография - полной ссылкой"""
+    rows = queryset.order_by('id').values_list(*(path for _, path in COLUMNS))
+    for number, vacancy, name, phone, letter, photo in rows.iterator(chunk_size=_chunk_size()):
+        yield number, vacancy, name, str(phone), letter, _photo_url(photo)
+
+
+#################################################
+#                      CSV                      #
+#################################################
+# с этих символов Excel и LibreOffice начинают формулу (=HYPERLINK(...) в имени или письме, +7... в телефоне)
+FORMULA_START = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _csv_cell(value):
+    """Текст, похожий на формулу, - с апострофом впереди: табличный редактор покажет его как текст"""
+    if isinstance(value, str) and value.startswith(FORMULA_START):
+        return "'" + value
+    return value
+
+
+class _Echo:
+    """«Файл» для csv.writer: writerow() возвращает готовую строку"""
+
+    def write(self, value):
+        return value
+
+
+def csv_stream(header, rows):
+    writer = csv.writer(_Echo())
+    # BOM - чтобы Excel открыл UTF-8 без мастера импорта
+    yield '\ufeff' + writer.writerow(header)
+    for batch in _batches(rows, _chunk_size()):
+        yield ''.join(writer.writerow([_csv_cell(value) for value in row]) for row in batch)
+
+
+#################################################
+#                     XLSX                      #
+#################################################
+XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="xl/workbook.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Отклики" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+        '</Relationships>'
+    ),
+}
+SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+SHEET_END = '</sheetData></worksheet>'
+
+# управляющие символы, недопустимые в XML 1.0
+XML_ILLEGAL = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def _cell(value) -> str:
+    if isinstance(value, int):
+        return f'<c><v>{value}</v></c>'
+    text = escape(XML_ILLEGAL.sub('', str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _row(values) -> str:
+    return f'<row>{"".join(_cell(value) for value in values)}</row>'
+
+
+class _Buffer:
+    """Поток для zipfile без seek: записанное забирается кусками через take()"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        """Нечего сбрасывать: данные забирает take()"""
+
+    def take(self) -> bytes:
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _sheet(archive, buffer, header, rows):
+    with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+        sheet.write((SHEET_START + _row(header)).encode())
+        for batch in _batches(rows, _chunk_size()):
+            sheet.write(''.join(_row(row) for row in batch).encode())
+            yield buffer.take()
+        sheet.write(SHEET_END.encode())
+
+
+def xlsx_stream(header, rows):
+    buffer = _Buffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, content in XLSX_PARTS.items():
+            archive.writestr(name, content)
+        yield from _sheet(archive, buffer, header, rows)
+    # после закрытия архива - хвост листа и оглавление архива
+    yield buffer.take()
+
+
+#################################################
+#                    Ответ                      #
+#################################################
+FORMATS = {
+    'csv': (csv_stream, 'text/csv; charset=utf-8'),
+    'xlsx': (xlsx_stream, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
+
+
+def applications_response(queryset, fmt: str, filename: str) -> StreamingHttpResponse:
+    """Отклики из queryset файлом filename.<fmt> для скачивания"""
+    if fmt not in FORMATS:
+        raise Http404(f'Неизвестный формат выгрузки: {fmt}')
+    stream, content_type = FORMATS[fmt]
+    header = [title for title, _ in COLUMNS]
+    response = StreamingHttpResponse(stream(header, application_rows(queryset)), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{fmt}"'
+    return response
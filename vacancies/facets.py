@@ -0,0 +1,232 @@
+"""
+Фасетный фильтр вакансий.
+
+Внутри фасета выбранные значения объединяются через ИЛИ, между фасетами - через И. Количество у значения
+фасета считается с учётом фильтров всех остальных фасетов (дизъюнктивные фасеты), поэтому выбор одного
+города не обнуляет счётчики соседних городов.
+
+Все скалярные фасеты (специализация, город, размер компании, зарплата) считаются одним запросом
+GROUP BY по всем их полям сразу: из такого "куба" счётчики каждого фасета получаются суммированием
+в Python. Навыки живут в отдельной таблице связей и считаются вторым группированным запросом.
+Готовые счётчики кэшируются вместе с итогом списка (vacancies.counts) и сбрасываются вместе с ним.
+"""
+from collections import Counter
+from typing import NamedTuple
+
+from django.db.models import Case, Count, F, IntegerField, Q, Value, When
+from django.utils.functional import cached_property
+
+from vacancies.counts import cached_value
+from vacancies.models import Company, Skill, Specialty, VacancySkill
+
+# (номер, подпись, от, до) по нижней границе вилки
+SALARY_BUCKETS = (
+    (1, 'до 50 000', 0, 50000),
+    (2, '50 000 - 100 000', 50000, 100000),
+    (3, '100 000 - 150 000', 100000, 150000),
+    (4, 'от 150 000', 150000, None),
+)
+
+
+class FacetOption(NamedTuple):
+    value: str
+    label: str
+    count: int
+    selected: bool
+
+
+class FacetCounts(NamedTuple):
+    param: str
+    title: str
+    options: list
+
+
+class Facet:
+    """Фасет по полю вакансии (или связанной компании)"""
+
+    def __init__(self, param, title, field, choices=None):
+        self.param = param
+        self.title = title
+        self.field = field
+        self.choices = choices
+
+    @property
+    def key(self):
+        return f'facet_{self.param}'
+
+    @property
+    def expression(self):
+        return F(self.field)
+
+    def selected(self, query):
+        """Выбранные значения из GET-параметров"""
+        return self.clean(set(query.getlist(self.param)) - {''})
+
+    def clean(self, values):
+        if self.choices is None:
+            return values
+        return values & {str(choice) for choice, label in self.choices}
+
+    def condition(self, values):
+        return Q(**{f'{self.field}__in': values})
+
+    def labels(self, values):
+        return {str(choice): str(label) for choice, label in self.choices or ((value, value) for value in values)}
+
+    def order(self, option):
+        return option.label
+
+    def options(self, counts: Counter, selected):
+        counts = Counter({str(value): count for value, count in counts.items()})
+        values = set(counts) | selected
+        labels = self.labels(list(values))
+        options = [FacetOption(value, labels.get(value, value), counts[value], value in selected) for value in values]
+        return FacetCounts(self.param, self.title, sorted(options, key=self.order))
+
+
+class SpecialtyFacet(Facet):
+
+    def labels(self, values):
+        return dict(Specialty.objects.filter(code__in=values).values_list('code', 'title'))
+
+
+class SalaryFacet(Facet):
+    """Вилка по нижней границе зарплаты, корзины SALARY_BUCKETS"""
+
+    def __init__(self, param, title):
+        super().__init__(param, title, 'salary_min', [(number, label) for number, label, *_ in SALARY_BUCKETS])
+
+    @property
+    def expression(self):
+        return Case(
+            *(When(**self._range(low, high), then=Value(number)) for number, label, low, high in SALARY_BUCKETS),
+            output_field=IntegerField(),
+        )
+
+    def _range(self, low, high):
+        bounds = {f'{self.field}__gte': low}
+        if high is not None:
+            bounds[f'{self.field}__lt'] = high
+        return bounds
+
+    def condition(self, values):
+        condition = Q()
+        for number, label, low, high in SALARY_BUCKETS:
+            if str(number) in values:
+                condition |= Q(**self._range(low, high))
+        return condition
+
+    def order(self, option):
+        return int(option.value)
+
+
+class SkillFacet(Facet):
+    """Навыки: через таблицу связей, отдельным запросом; показываются самые частые"""
+
+    def __init__(self, param, title, limit=15):
+        super().__init__(param, title, 'skill__slug')
+        self.limit = limit
+
+    def condition(self, values):
+        return Q(id__in=VacancySkill.objects.filter(skill__slug__in=values).values('vacancy_id'))
+
+    def labels(self, values):
+        return dict(Skill.objects.filter(slug__in=values).values_list('slug', 'name'))
+
+    def order(self, option):
+        return -option.count, option.label
+
+    def count(self, queryset, selected):
+        rows = VacancySkill.objects.filter(vacancy__in=queryset.values('id')).values('skill__slug')
+        counts = Counter(dict(rows.annotate(n=Count('vacancy_id')).values_list('skill__slug', 'n')))
+        shown = {slug for slug, count in counts.most_common(self.limit)} | selected
+        return Counter({slug: count for slug, count in counts.items() if slug in shown})
+
+
+FACETS = (
+    SpecialtyFacet('specialty', 'Специализация', 'specialty_id'),
+    Facet('city', 'Город', 'company__location'),
+    Facet('size', 'Размер компании', 'company__employee_count', Company.EmployeeCount.choices),
+    SalaryFacet('salary', 'Зарплата'),
+    SkillFacet('skill', 'Навыки'),
+)
+
+
+def apply(queryset, facets, selection):
+    for facet in facets:
+        if facet.param in selection:
+            queryset = queryset.filter(facet.condition(selection[facet.param]))
+    return queryset
+
+
+def _misses(row, facets, selection):
+    """Фасеты, фильтру которых строка куба не проходит"""
+    return [facet for facet in facets if facet.param in selection and str(row[facet.key]) not in selection[facet.param]]
+
+
+def _counted_in(facets, misses):
+    """Строка идёт в счётчики всех фасетов, если проходит фильтр, или только того, которому не прошла"""
+    if not misses:
+        return facets
+    return misses if len(misses) == 1 else ()
+
+
+def cube_counts(queryset, facets, selection):
+    """Счётчики скалярных фасетов из одного GROUP BY по всем их полям"""
+    rows = queryset.order_by().values(**{facet.key: facet.expression for facet in facets}).annotate(n=Count('id'))
+    counts = {facet.param: Counter() for facet in facets}
+    for row in rows:
+        for facet in _counted_in(facets, _misses(row, facets, selection)):
+            counts[facet.param][row[facet.key]] += row['n']
+    return counts
+
+
+def count(queryset, facets, selection):
+    """FacetCounts для каждого фасета; queryset - список до применения фасетного фильтра"""
+    scalar = [facet for facet in facets if not isinstance(facet, SkillFacet)]
+    separate = [facet for facet in facets if isinstance(facet, SkillFacet)]
+
+    counts = cube_counts(apply(queryset, separate, selection), scalar, selection)
+    for facet in separate:
+        counts[facet.param] = facet.count(apply(queryset, scalar, selection), selection.get(facet.param, set()))
+    return [facet.options(counts[facet.param], selection.get(facet.param, set())) for facet in facets]
+
+
+class FacetedListMixin:
+    """
+    Фасетный фильтр для ListView вакансий: get_queryset пропускает список через filter_facets(),
+    в контекст попадают facets (список FacetCounts) и facets_selected.
+    """
+    facets = FACETS
+
+    @cached_property
+    def facet_selection(self):
+        selection = {facet.param: facet.selected(self.request.GET) for facet in self.facets}
+        return {param: values for param, values in selection.items() if values}
+
+    def filter_facets(self, queryset):
+        self.facet_base = queryset
+        return apply(queryset, self.facets, self.facet_selection)
+
+    def get_count_key(self):
+        key = super().get_count_key()
+        if not self.facet_selection:
+            return key
+        return key + (sorted((param, sorted(values)) for param, values in self.facet_selection.items()),)
+
+    @cached_property
+    def facet_counts(self):
+        if not self.facets:
+            return None
+        # кэш под тем же ключом и поколением, что и итог списка (CachedCountMixin)
+        return cached_value(
+            self.count_namespace, ('facets', self.get_count_key()),
+            lambda: count(self.facet_base, self.facets, self.facet_selection),
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if self.facets:
+            context['facets'] = self.facet_counts
+            context['facets_selected'] = bool(self.facet_selection)
+        return context
@@ -0,0 +1,248 @@
+"""
+Потоковый импорт и экспорт вакансий, компаний и резюме в JSONL и CSV (команды import_vacancies и
+export_vacancies).
+
+Файл читается и пишется построчно: в памяти одна пачка объектов и словари ссылок (название компании,
+код специализации, логин пользователя -> id), загруженные один раз. Пачка проверяется clean_fields()
+без запросов к базе и вставляется bulk_create в своей транзакции. Сигналы при этом не срабатывают,
+поэтому навыки, поисковый индекс и счётчики обновляются после каждой пачки (Feed.inserted).
+
+Формат строки - словарь с колонками Feed.columns; ссылки - по ключу (company - название компании,
+specialty - код специализации, owner/user - логин). Выгрузка читается загрузкой без изменений.
+"""
+from contextlib import nullcontext
+import csv
+from itertools import islice
+import json
+import sys
+from typing import NamedTuple
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.models import Max
+
+from vacancies import counters, skills
+from vacancies.models import Company, Resume, Skill, Specialty, Vacancy, VacancySkill
+from vacancies.search.backends import get_backend
+
+
+class Reference(NamedTuple):
+    """Внешний ключ field, который в файле записан значением поля key связанной модели"""
+    field: str
+    model: type
+    key: str
+
+    def lookup(self) -> dict:
+        # при повторяющихся значениях (одноимённые компании) выигрывает первая запись
+        return dict(self.model.objects.order_by('-pk').values_list(self.key, 'pk'))
+
+
+class Lookups(NamedTuple):
+    keys: dict   # поле -> {значение в файле: id}
+    taken: dict  # поле один-к-одному -> id, которые уже заняты (в базе или выше в файле)
+
+
+class Progress(NamedTuple):
+    read: int
+    inserted: int
+    errors: list
+
+
+def _message(error) -> str:
+    if isinstance(error, ValidationError) and hasattr(error, 'error_dict'):
+        return '; '.join(f'{field}: {" ".join(messages)}' for field, messages in error.message_dict.items())
+    return ' '.join(getattr(error, 'messages', [str(error)]))
+
+
+def bulk_insert(model, objects):
+    """bulk_create, после которого у объектов есть pk (SQLite их не возвращает - id назначаются заранее)"""
+    if not connection.features.can_return_rows_from_bulk_insert:
+        # вставки в SQLite идут по одной транзакции за раз, но параллельная запись всё же может
+        # занять эти id - тогда пачка откатится с IntegrityError
+        last = model.objects.aggregate(last=Max('pk'))['last'] or 0
+        for pk, instance in enumerate(objects, last + 1):
+            instance.pk = pk
+    return model.objects.bulk_create(objects)
+
+
+class Feed:
+    model = None
+    fields = ()
+    references = ()
+    # итоги списков, которые сбрасываются после загрузки (vacancies.counts)
+    count_namespace = None
+
+    @property
+    def columns(self) -> tuple:
+        return self.fields + tuple(reference.field for reference in self.references)
+
+    def lookups(self) -> Lookups:
+        unique = [ref.field for ref in self.references if self.model._meta.get_field(ref.field).unique]
+        return Lookups(
+            keys={reference.field: reference.lookup() for reference in self.references},
+            taken={field: set(self.model.objects.values_list(f'{field}_id', flat=True)) for field in unique},
+        )
+
+    def build(self, row, lookups):
+        if not isinstance(row, dict):
+            raise ValueError('строка должна быть объектом')
+        instance = self.model(**{field: row.get(field) for field in self.fields}, **self.resolve(row, lookups.keys))
+        instance.clean_fields(exclude=[reference.field for reference in self.references])
+        self.reserve(instance, lookups.taken)
+        return instance
+
+    def resolve(self, row, keys) -> dict:
+        missing = {
+            reference.field: f'не найдено: {reference.model._meta.verbose_name} «{row.get(reference.field)}»'
+            for reference in self.references if row.get(reference.field) not in keys[reference.field]
+        }
+        if missing:
+            raise ValidationError(missing)
+        return {f'{ref.field}_id': keys[ref.field][row[ref.field]] for ref in self.references}
+
+    def reserve(self, instance, taken):
+        """Один-к-одному (владелец компании, автор резюме): вторую запись bulk_create не вставит"""
+        busy = {
+            field: f'уже есть {self.model._meta.verbose_name} с этим значением'
+            for field, ids in taken.items() if getattr(instance, f'{field}_id') in ids
+        }
+        if busy:
+            raise ValidationError(busy)
+        for field, ids in taken.items():
+            ids.add(getattr(instance, f'{field}_id'))
+
+    def build_batch(self, chunk, decode, lookups):
+        """Объекты пачки и ошибки [(номер строки, сообщение)]"""
+        results = [self._try_build(number, row, decode, lookups) for number, row in chunk]
+        errors = [result for result in results if isinstance(result, tuple)]
+        return [result for result in results if not isinstance(result, tuple)], errors
+
+    def _try_build(self, number, row, decode, lookups):
+        try:
+            return self.build(decode(row), lookups)
+        except (ValueError, ValidationError) as error:
+            return number, _message(error)
+
+    def insert(self, objects):
+        with transaction.atomic():
+            bulk_insert(self.model, objects)
+            self.inserted(objects)
+
+    def inserted(self, objects):
+        """Что при обычном save() делают сигналы"""
+
+    def export(self, batch_size):
+        paths = self.fields + tuple(f'{reference.field}__{reference.key}' for reference in self.references)
+        queryset = self.model.objects.order_by('pk').values_list(*paths)
+        rows = queryset.iterator(chunk_size=batch_size)
+        return (dict(zip(self.columns, row)) for row in rows)
+
+
+class VacancyFeed(Feed):
+    """Дата публикации из файла сохраняется; нет её в строке - сегодняшняя, как при создании"""
+    model = Vacancy
+    fields = ('title', 'skills', 'description', 'salary_min', 'salary_max', 'published_at')
+    references = (Reference('company', Company, 'name'), Reference('specialty', Specialty, 'code'))
+    count_namespace = 'vacancies'
+
+    def build(self, row, lookups):
+        instance = super().build(row, lookups)
+        # auto_now_add перепишет дату при вставке - её вернёт restore_dates()
+        instance.published_in_file = instance.published_at
+        return instance
+
+    @staticmethod
+    def restore_dates(objects):
+        """Один UPDATE на каждую дату пачки (выгрузка идёт по id, даты соседних строк близки); вакансии не из
+        файла (generate_data) без published_in_file - их даты задаёт сам генератор"""
+        by_date = {}
+        for vacancy in (vacancy for vacancy in objects if getattr(vacancy, 'published_in_file', None)):
+            vacancy.published_at = vacancy.published_in_file
+            by_date.setdefault(vacancy.published_at, []).append(vacancy.pk)
+        for published_at, ids in by_date.items():
+            Vacancy.objects.filter(pk__in=ids).update(published_at=published_at)
+
+    def inserted(self, objects):
+        self.restore_dates(objects)
+        skills.link_skills(objects, Skill, VacancySkill)
+        counters.vacancies_created(objects)
+        created = Vacancy.objects.filter(pk__in=[vacancy.pk for vacancy in objects]).select_related('company')
+        get_backend().index_vacancies(created)
+
+
+class CompanyFeed(Feed):
+    """Логотип - имя уже лежащего в MEDIA_ROOT файла; миниатюры - командой build_thumbnails"""
+    model = Company
+    fields = ('name', 'location', 'description', 'employee_count', 'logo')
+    references = (Reference('owner', User, 'username'),)
+
+
+class ResumeFeed(Feed):
+    model = Resume
+    fields = ('name', 'surname', 'status', 'salary', 'grade', 'education', 'experience', 'portfolio')
+    references = (Reference('user', User, 'username'), Reference('specialty', Specialty, 'code'))
+    count_namespace = 'resumes'
+
+
+FEEDS = {
+    'vacancies': VacancyFeed(),
+    'companies': CompanyFeed(),
+    'resumes': ResumeFeed(),
+}
+
+
+def import_feed(feed, rows, decode, batch_size):
+    """Загружает строки пачками, после каждой пачки отдаёт Progress"""
+    lookups = feed.lookups()
+    numbered = enumerate(rows, 1)
+    read = inserted = 0
+    while True:
+        chunk = list(islice(numbered, batch_size))
+        if not chunk:
+            return
+        objects, errors = feed.build_batch(chunk, decode, lookups)
+        feed.insert(objects)
+        read, inserted = read + len(chunk), inserted + len(objects)
+        yield Progress(read, inserted, errors)
+
+
+#################################################
+#                    Форматы                    #
+#################################################
+def read_jsonl(stream):
+    return (line for line in stream if line.strip())
+
+
+def write_jsonl(stream, columns, rows):
+    for row in rows:
+        stream.write(json.dumps(row, ensure_ascii=False, default=str) + '\n')
+
+
+def write_csv(stream, columns, rows):
+    writer = csv.DictWriter(stream, fieldnames=columns)
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+class Format(NamedTuple):
+    read: object
+    decode: object
+    write: object
+
+
+FORMATS = {
+    'jsonl': Format(read_jsonl, json.loads, write_jsonl),
+    'csv': Format(csv.DictReader, dict, write_csv),
+}
+
+
+def guess_format(path: str) -> str:
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+
+def open_file(path: str, mode: str):
+    """Файл или stdin/stdout для '-'"""
+    if path == '-':
+        return nullcontext(sys.stdin if mode == 'r' else sys.stdout)
+    return open(path, mode, encoding='utf-8', newline='')
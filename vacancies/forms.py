@@ -6,6 +6,7 @@ from django.contrib.auth.forms import AuthenticationForm, UserCreationForm
 from django.contrib.auth.models import User
 
 from vacancies.models import Application, Company, Resume, Vacancy
+from vacancies.uploads import validate_upload
 
 
 class MyRegistrationForm(UserCreationForm):
@@ -141,6 +142,14 @@ class VacancyForm(forms.ModelForm):
 
 
 class ApplicationForm(forms.ModelForm):
+    # без проверки через Pillow в запросе: файл проверен обработчиком загрузки, декодируется в фоне
+    written_photo = forms.FileField(
+        label='Фотография',
+        required=False,
+        validators=[validate_upload],
+        widget=forms.ClearableFileInput(attrs={'accept': 'image/*'}),
+    )
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.fields['written_username'].label = 'ФИО'
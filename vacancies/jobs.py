@@ -0,0 +1,153 @@
+"""
+Очередь фоновых задач в базе данных: без брокера, на той же машине, что и сайт.
+
+Задача - функция, помеченная @task. enqueue() записывает задание (модель Job) в текущей транзакции:
+оно появляется вместе с данными, которые его породили, и исчезает при откате, а запрос не ждёт
+выполнения. Выполняет задания отдельный процесс manage.py run_worker (см. Procfile):
+
+* задания берутся по priority (меньше - раньше), затем по времени, пачками до --batch штук;
+* задания batch-задачи из одной пачки выполняются одним вызовом со списком аргументов;
+* упавшее задание повторяется с растущей задержкой, после max_attempts остаётся в статусе "Ошибка";
+* задание, взятое упавшим воркером, через JOB_TIMEOUT возвращается в очередь (проверка - раз в
+  JOB_REQUEUE_INTERVAL секунд);
+* пустую очередь воркер опрашивает всё реже, пауза растёт вдвое до --max-sleep: простаивающий воркер
+  делает только редкие SELECT.
+
+Аргументы хранятся в JSON, поэтому передаются id и строки, а не объекты. Задачи должны быть
+идемпотентными: после сбоя воркера задание выполнится ещё раз.
+"""
+from datetime import timedelta
+import logging
+import traceback
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from vacancies.models import Job
+
+logger = logging.getLogger(__name__)
+
+HIGH, NORMAL, LOW = 0, 5, 10
+
+
+class TaskOptions(NamedTuple):
+    name: str
+    priority: int
+    max_attempts: int
+    batch: bool
+
+
+def task(priority=NORMAL, max_attempts=3, batch=False):
+    """Регистрирует функцию как задачу; batch-задача получает список аргументов всех заданий пачки"""
+    def register(func):
+        func.task = TaskOptions(f'{func.__module__}.{func.__qualname__}', priority, max_attempts, batch)
+        return func
+    return register
+
+
+def enqueue(func, *args, priority=None, delay=0):
+    options = func.task
+    return Job.objects.create(
+        name=options.name,
+        args=list(args),
+        priority=options.priority if priority is None else priority,
+        max_attempts=options.max_attempts,
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+#################################################
+#                     Воркер                    #
+#################################################
+def requeue_stale() -> int:
+    """Возвращает в очередь задания, которые воркер взял и не завершил за JOB_TIMEOUT"""
+    deadline = timezone.now() - timedelta(seconds=getattr(settings, 'JOB_TIMEOUT', 600))
+    stale = Job.objects.filter(status=Job.Status.running, locked_at__lt=deadline)
+    # чтение не берёт блокировку записи (SQLite): UPDATE - только если есть что возвращать
+    if not stale.exists():
+        return 0
+    stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.Status.failed, last_error='Воркер не завершил задание',
+    )
+    return stale.update(status=Job.Status.queued, locked_by='')
+
+
+def claim(worker: str, limit: int) -> list:
+    """Берёт до limit готовых заданий; условный UPDATE не даёт двум воркерам взять одно задание"""
+    order = ('priority', 'run_at', 'id')
+    ready = Job.objects.filter(status=Job.Status.queued, run_at__lte=timezone.now()).order_by(*order)
+    ids = list(ready.values_list('id', flat=True)[:limit])
+    Job.objects.filter(id__in=ids, status=Job.Status.queued).update(
+        status=Job.Status.running, locked_by=worker, locked_at=timezone.now(), attempts=F('attempts') + 1,
+    )
+    return list(Job.objects.filter(id__in=ids, status=Job.Status.running, locked_by=worker).order_by(*order))
+
+
+def resolve(name: str):
+    func = import_string(name)
+    if not hasattr(func, 'task'):
+        raise ImportError(f'{name} не зарегистрирована как задача')
+    return func
+
+
+def _by_name(jobs):
+    groups = {}
+    for job in jobs:
+        groups.setdefault(job.name, []).append(job)
+    return groups
+
+
+def run(jobs: list):
+    """Выполняет взятые задания, сгруппировав по задаче (порядок групп - по первому заданию)"""
+    for name, group in _by_name(jobs).items():
+        _run_group(name, group)
+    close_old_connections()
+
+
+def _run_group(name, jobs):
+    try:
+        func = resolve(name)
+    except ImportError:
+        # задачу переименовали или удалили - задания ждут повтора, а затем остаются с ошибкой
+        failed(jobs, traceback.format_exc())
+    else:
+        _run_task(func, jobs)
+
+
+def _run_task(func, jobs):
+    if func.task.batch:
+        _execute(func, jobs, [job.args for job in jobs])
+        return
+    for job in jobs:
+        _execute(func, [job], *job.args)
+
+
+def _execute(func, jobs, *args):
+    try:
+        func(*args)
+    except Exception:  # noqa: B902
+        logger.exception('Задача %s завершилась ошибкой', func.task.name)
+        failed(jobs, traceback.format_exc())
+    else:
+        Job.objects.filter(id__in=[job.id for job in jobs]).delete()
+
+
+def failed(jobs, error: str):
+    """Повтор через JOB_RETRY_DELAY * 2^(попытка - 1) секунд или окончательная ошибка"""
+    delay = getattr(settings, 'JOB_RETRY_DELAY', 30)
+    for job in jobs:
+        exhausted = job.attempts >= job.max_attempts
+        job.status = Job.Status.failed if exhausted else Job.Status.queued
+        job.run_at = timezone.now() + timedelta(seconds=delay * 2 ** (job.attempts - 1))
+        job.locked_by = ''
+        job.last_error = error
+        job.save(update_fields=['status', 'run_at', 'locked_by', 'last_error'])
+
+
+def retry(jobs):
+    """Снова ставит задания в очередь (например, упавшие после исправления ошибки)"""
+    return jobs.update(status=Job.Status.queued, attempts=0, run_at=timezone.now(), locked_by='')
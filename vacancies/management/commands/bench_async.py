@@ -0,0 +1,97 @@
+import asyncio
+from functools import partial
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages.storage import default_storage
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory
+
+from vacancies.async_views import async_view
+from vacancies.models import Company, Vacancy
+from vacancies.views import CompanyCardView, MainView, SearchView, VacanciesView, VacancyView
+
+
+def slow_execute(delay, execute, sql, params, many, context):
+    time.sleep(delay)
+    return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = (  # noqa: A003, VNE003
+        'Синхронные и асинхронные публичные страницы при медленной базе: '
+        'один синхронный воркер против одного цикла событий с --concurrency запросами'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--delay', type=float, default=20, help='задержка каждого SQL-запроса, мс')
+        parser.add_argument('--requests', type=int, default=40, help='запросов на страницу')
+        parser.add_argument('--concurrency', type=int, default=10, help='одновременных запросов к async-варианту')
+
+    def handle(self, *args, **options):
+        delay = options['delay'] / 1000
+        connection_created.connect(self.slow_down(delay), weak=False)
+        connections.close_all()
+
+        self.stdout.write(f'{"страница":<12}{"sync, мс":>10}{"sync, rps":>11}{"async, мс":>11}{"async, rps":>12}')
+        for name, view_class, path, kwargs in self.pages():
+            requests = [self.request(path) for _ in range(options['requests'])]
+            sync = self.run_sync(view_class.as_view(), requests, kwargs)
+            concurrent = asyncio.run(self.run_async(async_view(view_class), requests, kwargs, options['concurrency']))
+            self.stdout.write(f'{name:<12}{sync[0]:>10.1f}{sync[1]:>11.1f}{concurrent[0]:>11.1f}{concurrent[1]:>12.1f}')
+
+    @staticmethod
+    def slow_down(delay):
+        def install(sender, connection, **kwargs):
+            connection.execute_wrappers.append(partial(slow_execute, delay))
+        return install
+
+    @staticmethod
+    def pages():
+        vacancy_id = Vacancy.objects.values_list('id', flat=True).first()
+        company_id = Company.objects.values_list('id', flat=True).first()
+        return [
+            ('main', MainView, '/', {}),
+            ('vacancies', VacanciesView, '/vacancies', {}),
+            ('vacancy', VacancyView, f'/vacancies/{vacancy_id}', {'vacancy_id': vacancy_id}),
+            ('company', CompanyCardView, f'/companies/{company_id}', {'company_id': company_id}),
+            ('search', SearchView, '/search?s=python', {}),
+        ]
+
+    @staticmethod
+    def request(path):
+        request = RequestFactory().get(path)
+        request.user = AnonymousUser()
+        request.session = SessionStore()
+        request._messages = default_storage(request)
+        return request
+
+    @staticmethod
+    def run_sync(view, requests, kwargs):
+        """Как синхронный воркер gunicorn: запросы по одному"""
+        started = time.perf_counter()
+        latencies = []
+        for request in requests:
+            begin = time.perf_counter()
+            view(request, **kwargs).render()
+            latencies.append(time.perf_counter() - begin)
+        return 1000 * sum(latencies) / len(latencies), len(requests) / (time.perf_counter() - started)
+
+    @staticmethod
+    async def run_async(view, requests, kwargs, concurrency):
+        """Как один ASGI-воркер: до concurrency запросов одновременно"""
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+
+        async def one(request):
+            async with semaphore:
+                begin = time.perf_counter()
+                await view(request, **kwargs)
+                latencies.append(time.perf_counter() - begin)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(request) for request in requests))
+        return 1000 * sum(latencies) / len(latencies), len(requests) / (time.perf_counter() - started)
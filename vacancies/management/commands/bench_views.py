@@ -0,0 +1,113 @@
+from datetime import datetime
+import json
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from vacancies import routes
+from vacancies.models import Application, Company, Resume, Vacancy
+
+
+def percentile(values, percent):
+    return statistics.quantiles(values, n=100, method='inclusive')[percent - 1]
+
+
+class Command(BaseCommand):
+    help = (  # noqa: A003, VNE003
+        'Задержка (p50/p95/p99), число и время SQL-запросов для каждой страницы из conf/urls.py '
+        'через тестовый клиент; результат сохраняется в JSON для сравнения запусков'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20, help='запросов на страницу (не меньше 2)')
+        parser.add_argument('--warmup', type=int, default=2, help='запросов перед замером (кэши, соединение)')
+        parser.add_argument('--only', nargs='+', default=(), help='имена URL')
+        parser.add_argument('--output', help='куда сохранить результат, JSON')
+        parser.add_argument('--compare', help='предыдущий результат (JSON), с которым сравнить p50')
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 2:
+            raise CommandError('--repeat должен быть не меньше 2')
+        visitors, selected = self.select(options['only'])
+        clients = {visitor: self.client(user) for visitor, user in visitors.items()}
+
+        results = {}
+        for route in selected:
+            results[route.name] = self.measure(clients[route.visitor], route.path, options['warmup'], options['repeat'])
+        report = {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'database': self.database_size(),
+            'repeat': options['repeat'],
+            'views': results,
+        }
+        baseline = self.load(options['compare'])['views'] if options['compare'] else {}
+        self.print_table(results, baseline)
+        self.save(report, options['output'])
+
+    @staticmethod
+    def select(names):
+        try:
+            return routes.sample_routes(User, names)
+        except LookupError as error:
+            raise CommandError(error)
+
+    @staticmethod
+    def client(user):
+        client = Client()
+        if user is not None:
+            client.force_login(user)
+        return client
+
+    @staticmethod
+    def measure(client, path, warmup, repeat):
+        for _ in range(warmup):
+            client.get(path)
+        latencies, queries, sql_times = [], [], []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.get(path)
+                latencies.append(1000 * (time.perf_counter() - started))
+            queries.append(len(captured))
+            sql_times.append(1000 * sum(float(query['time']) for query in captured.captured_queries))
+        return {
+            'path': path,
+            'status': response.status_code,
+            'p50': round(percentile(latencies, 50), 2),
+            'p95': round(percentile(latencies, 95), 2),
+            'p99': round(percentile(latencies, 99), 2),
+            'queries': round(statistics.mean(queries), 1),
+            'sql_ms': round(statistics.mean(sql_times), 2),
+        }
+
+    @staticmethod
+    def database_size():
+        return {model._meta.model_name: model.objects.count() for model in (Company, Vacancy, Resume, Application)}
+
+    def print_table(self, results, baseline):
+        self.stdout.write(
+            f'{"страница":<24}{"код":>5}{"p50, мс":>10}{"p95, мс":>10}{"p99, мс":>10}'
+            f'{"запросов":>10}{"SQL, мс":>10}{"p50 было":>10}',
+        )
+        for name, result in results.items():
+            before = baseline.get(name, {}).get('p50')
+            self.stdout.write(
+                f'{name:<24}{result["status"]:>5}{result["p50"]:>10.1f}{result["p95"]:>10.1f}{result["p99"]:>10.1f}'
+                f'{result["queries"]:>10.1f}{result["sql_ms"]:>10.1f}{"" if before is None else f"{before:.1f}":>10}',
+            )
+
+    @staticmethod
+    def load(path):
+        with open(path, encoding='utf-8') as source:
+            return json.load(source)
+
+    def save(self, report, path):
+        if path:
+            with open(path, 'w', encoding='utf-8') as target:
+                json.dump(report, target, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Результат сохранён в {path}'))
@@ -0,0 +1,28 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from vacancies.matching import ResumeMatrix
+
+
+class Command(BaseCommand):
+    help = (  # noqa: A003, VNE003
+        'Строит матрицу признаков резюме для подбора кандидатов и сохраняет снимок в MATCHING_SNAPSHOT '
+        '(процессы сайта загружают его вместо построения из базы)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--output', help='куда сохранить снимок, по умолчанию settings.MATCHING_SNAPSHOT')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        matrix = ResumeMatrix()
+        for done in matrix.build(options['batch_size']):
+            self.stdout.write(f'резюме: {done}')
+        path = options['output'] or settings.MATCHING_SNAPSHOT
+        matrix.save(path)
+        self.stdout.write(self.style.SUCCESS(
+            f'Матрица из {len(matrix)} резюме сохранена в {path} за {time.perf_counter() - started:.1f} с',
+        ))
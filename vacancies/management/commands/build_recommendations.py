@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from vacancies import recommendations
+from vacancies.models import Resume
+
+
+class Command(BaseCommand):
+    help = (  # noqa: A003, VNE003
+        'Строит ленты подборки вакансий для всех резюме заново (раз в сутки: правки вакансий, '
+        'обрезка лент до RECOMMENDATIONS_SIZE)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='резюме в одной матрице оценок')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        total = Resume.objects.count()
+        done = 0
+        for done in recommendations.rebuild(batch_size=options['batch_size']):
+            self.stdout.write(f'резюме: {done} из {total}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Ленты {done} резюме построены за {time.perf_counter() - started:.1f} с',
+        ))
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from vacancies import similar
+
+
+class Command(BaseCommand):
+    help = (  # noqa: A003, VNE003
+        'Пересчитывает похожие вакансии всех вакансий (TF-IDF) - после массовой загрузки или смены настроек '
+        'SIMILAR_*'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='строк за одно чтение из базы')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        done = 0
+        for done, total in similar.rebuild(options['batch_size']):
+            self.stdout.write(f'вакансий: {done} из {total}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Похожие вакансии пересчитаны для {done} вакансий за {time.perf_counter() - started:.1f} с',
+        ))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from vacancies import thumbnails
+
+
+class Command(BaseCommand):
+    help = 'Создаёт миниатюры для уже загруженных изображений'  # noqa: A003, VNE003
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='пересоздать и существующие миниатюры')
+
+    def handle(self, *args, **options):
+        for model, fields in thumbnails.IMAGE_FIELDS.items():
+            for field in fields:
+                self.build(model, field, options['force'])
+        self.stdout.write(self.style.SUCCESS('Миниатюры готовы'))
+
+    def build(self, model, field, force):
+        names = model.objects.exclude(**{field: ''}).values_list(field, flat=True).distinct()
+        images = [getattr(model(**{field: name}), field) for name in names]
+        pending = [image for image in images if force or not thumbnails.has_thumbnails(image)]
+        for image in pending:
+            self.generate(image)
+        self.stdout.write(f'{model._meta.verbose_name_plural}, {field}: обработано {len(pending)} из {len(images)}')
+
+    def generate(self, image):
+        try:
+            thumbnails.generate(image)
+        except OSError as error:
+            self.stderr.write(f'{image.name}: {error}')
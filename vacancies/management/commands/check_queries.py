@@ -0,0 +1,70 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+
+from vacancies import querycheck, routes
+
+
+class Command(BaseCommand):
+    help = (  # noqa: A003, VNE003
+        'Проверка бюджета запросов (settings.QUERY_BUDGETS) и N+1 для каждой страницы из conf/urls.py; '
+        'код выхода 1 при нарушении - проверка для CI'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', nargs='+', default=(), help='имена URL')
+        parser.add_argument('--suggest', action='store_true', help='напечатать QUERY_BUDGETS по текущим значениям')
+
+    def handle(self, *args, **options):
+        visitors, selected = self.select(options['only'])
+        # своя проверка вместо NPlusOneMiddleware, чтобы собрать все нарушения, а не первое
+        with override_settings(NPLUSONE_MODE='off'):
+            measured = {route.name: self.measure(route, visitors[route.visitor]) for route in selected}
+        failures = [self.report(name, *result) for name, result in measured.items()]
+        if options['suggest']:
+            self.suggest(measured)
+        if any(failures):
+            raise CommandError(f'Нарушений: {sum(failures)}')
+        self.stdout.write(self.style.SUCCESS(f'Проверено страниц: {len(measured)}'))
+
+    @staticmethod
+    def select(names):
+        try:
+            return routes.sample_routes(User, names)
+        except LookupError as error:
+            raise CommandError(error)
+
+    @staticmethod
+    def measure(route, user):
+        """Код ответа и запросы к странице с пустым кэшем - худший случай"""
+        client = Client()
+        if user is not None:
+            client.force_login(user)
+        cache.clear()
+        shapes = querycheck.QueryShapes()
+        with connection.execute_wrapper(shapes):
+            response = client.get(route.path)
+        return response.status_code, shapes
+
+    def report(self, name, status, shapes) -> bool:
+        """Перенаправление или ошибка - тоже нарушение: измерена не та страница"""
+        budget = getattr(settings, 'QUERY_BUDGETS', {}).get(name)
+        repeated = shapes.repeated()
+        failed = budget is None or shapes.total > budget or bool(repeated) or status != 200
+        line = f'{name:<24}{shapes.total:>5} / {"-" if budget is None else budget}'
+        if status != 200:
+            line += f'  HTTP {status}'
+        self.stdout.write(self.style.ERROR(line) if failed else line)
+        if repeated:
+            self.stdout.write(f'    N+1: {querycheck.describe(repeated)}')
+        return failed
+
+    def suggest(self, measured):
+        self.stdout.write('QUERY_BUDGETS = {')
+        for name, (_, shapes) in measured.items():
+            self.stdout.write(f"    '{name}': {shapes.total},")
+        self.stdout.write('}')
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from vacancies import feeds
+
+
+class Command(BaseCommand):
+    help = 'Потоковая выгрузка вакансий (компаний, резюме) в JSONL или CSV'  # noqa: A003, VNE003
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="файл или '-' для stdout")
+        parser.add_argument('--model', choices=feeds.FEEDS, default='vacancies')
+        parser.add_argument('--format', choices=feeds.FORMATS, help='по умолчанию - по расширению файла')
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        feed = feeds.FEEDS[options['model']]
+        fmt = feeds.FORMATS[options['format'] or feeds.guess_format(options['path'])]
+        started = time.perf_counter()
+        self.exported = 0
+        with feeds.open_file(options['path'], 'w') as stream:
+            fmt.write(stream, feed.columns, self.counted(feed.export(options['batch_size'])))
+        rate = self.exported / (time.perf_counter() - started)
+        # при выгрузке в stdout итог - в stderr, чтобы не попасть в данные
+        self.stderr.write(self.style.SUCCESS(f'Выгружено {self.exported}, {rate:.0f} строк/с'))
+
+    def counted(self, rows):
+        for row in rows:
+            self.exported += 1
+            yield row
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from vacancies.synthetic import Generator
+
+
+class Command(BaseCommand):
+    help = 'Синтетические компании, вакансии, резюме и отклики для проверки масштабирования'  # noqa: A003, VNE003
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vacancies', type=int, default=10000, help='например 10000, 100000, 1000000')
+        parser.add_argument('--companies', type=int, help='по умолчанию - вакансий / 20')
+        parser.add_argument('--resumes', type=int, help='по умолчанию - вакансий / 5')
+        parser.add_argument('--applications', type=int, help='по умолчанию - вакансий * 2')
+        parser.add_argument('--days', type=int, default=365, help='на сколько дней назад растянуть публикации')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, help='для воспроизводимых данных')
+
+    def handle(self, *args, **options):
+        vacancies = options['vacancies']
+        generator = Generator(options['batch_size'], options['seed'], options['days'])
+        stages = generator.generate(
+            vacancies=vacancies,
+            companies=options['companies'] if options['companies'] is not None else max(vacancies // 20, 1),
+            resumes=options['resumes'] if options['resumes'] is not None else vacancies // 5,
+            applications=options['applications'] if options['applications'] is not None else vacancies * 2,
+        )
+        started = time.perf_counter()
+        for model, done, total in stages:
+            self.stdout.write(f'{model}: {done} из {total}, {time.perf_counter() - started:.0f} с')
+        self.stdout.write(self.style.SUCCESS(f'Данные созданы за {time.perf_counter() - started:.0f} с'))
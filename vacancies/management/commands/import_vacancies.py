@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from vacancies import api, counts, feeds, jobs, recommendations, similar
+
+# фоновые пересчёты после загрузки
+REBUILDS = {
+    'vacancies': (similar.rebuild_similar, recommendations.rebuild_recommendations),
+    'resumes': (recommendations.rebuild_recommendations,),
+}
+
+
+class Command(BaseCommand):
+    help = 'Потоковая загрузка вакансий (компаний, резюме) из JSONL или CSV через bulk_create'  # noqa: A003, VNE003
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="файл или '-' для stdin")
+        parser.add_argument('--model', choices=feeds.FEEDS, default='vacancies')
+        parser.add_argument('--format', choices=feeds.FORMATS, help='по умолчанию - по расширению файла')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--show-errors', type=int, default=20, help='сколько ошибочных строк показать')
+
+    def handle(self, *args, **options):
+        feed = feeds.FEEDS[options['model']]
+        fmt = feeds.FORMATS[options['format'] or feeds.guess_format(options['path'])]
+        self.started = time.perf_counter()
+        self.errors = 0
+        progress = feeds.Progress(0, 0, [])
+        with feeds.open_file(options['path'], 'r') as stream:
+            for progress in feeds.import_feed(feed, fmt.read(stream), fmt.decode, options['batch_size']):
+                self.report(progress, options['show_errors'])
+        self.loaded(options['model'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено {progress.inserted} из {progress.read}, ошибок {self.errors}, {self.rate(progress.read)}',
+        ))
+
+    def loaded(self, model):
+        """bulk_create обходит сигналы: кэши сбрасываются, похожие вакансии и подборки пересчитывает воркер"""
+        feed = feeds.FEEDS[model]
+        if feed.count_namespace:
+            counts.invalidate(feed.count_namespace)
+        api.invalidate()
+        for task in REBUILDS.get(model, ()):
+            jobs.enqueue(task)
+
+    def rate(self, rows):
+        return f'{rows / (time.perf_counter() - self.started):.0f} строк/с'
+
+    def report(self, progress, show_errors):
+        for number, message in progress.errors[:max(show_errors - self.errors, 0)]:
+            self.stderr.write(f'строка {number}: {message}')
+        self.errors += len(progress.errors)
+        self.stdout.write(f'прочитано {progress.read}, загружено {progress.inserted}, {self.rate(progress.read)}')
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from vacancies.search.backends import get_backend
+
+
+class Command(BaseCommand):
+    help = 'Полная перестройка поискового индекса (бэкенд из settings.SEARCH_BACKEND)'  # noqa: A003, VNE003
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        done = 0
+        for done in backend.rebuild(options['batch_size']):
+            self.stdout.write(f'{type(backend).__name__}: обработано записей {done}')
+        self.stdout.write(self.style.SUCCESS(f'Индекс перестроен, записей: {done}'))
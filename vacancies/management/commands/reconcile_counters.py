@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from vacancies import counters
+
+
+class Command(BaseCommand):
+    help = 'Пересчёт денормализованных счётчиков вакансий и откликов'  # noqa: A003, VNE003
+
+    def handle(self, *args, **options):
+        for counter, rows in counters.reconcile().items():
+            self.stdout.write(f'{counter}: обновлено строк {rows}')
+        self.stdout.write(self.style.SUCCESS('Счётчики пересчитаны'))
@@ -0,0 +1,54 @@
+import os
+import signal
+import socket
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from vacancies import caching, jobs
+
+
+class Command(BaseCommand):
+    help = 'Выполняет задания фоновой очереди (vacancies.jobs)'  # noqa: A003, VNE003
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', type=int, default=20, help='заданий за один проход')
+        parser.add_argument('--sleep', type=float, default=1, help='пауза при пустой очереди, с')
+        parser.add_argument('--max-sleep', type=float, default=10, help='предел паузы, растущей вдвое, с')
+        parser.add_argument('--once', action='store_true', help='выйти, когда очередь опустеет')
+
+    def handle(self, *args, **options):
+        self.running = True
+        self.pause = options['sleep']
+        self.requeued_at = float('-inf')
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        worker = f'{socket.gethostname()}:{os.getpid()}'
+        self.stdout.write(f'Воркер {worker} запущен')
+        if not caching.is_shared():
+            self.stderr.write(f'{caching.W001.msg}. {caching.W001.hint}')
+        while self.running and self.step(worker, options):
+            pass
+        self.stdout.write(f'Воркер {worker} остановлен')
+
+    def stop(self, signum, frame):
+        # текущая пачка дорабатывается до конца
+        self.running = False
+
+    def step(self, worker, options):
+        """Один проход; False - очередь пуста и задан --once"""
+        self.requeue_stale()
+        claimed = jobs.claim(worker, options['batch'])
+        jobs.run(claimed)
+        if claimed or options['once']:
+            self.pause = options['sleep']
+            return bool(claimed)
+        time.sleep(self.pause)
+        self.pause = min(self.pause * 2, options['max_sleep'])
+        return True
+
+    def requeue_stale(self):
+        if time.monotonic() - self.requeued_at >= getattr(settings, 'JOB_REQUEUE_INTERVAL', 60):
+            jobs.requeue_stale()
+            self.requeued_at = time.monotonic()
@@ -0,0 +1,253 @@
+"""
+Подбор резюме к вакансии: вкладка "лучшие кандидаты" на странице вакансии работодателя.
+
+Каждое резюме - строка матрицы признаков (массивы numpy): специализация, квалификация, ожидаемая
+зарплата, готовность к работе и хэши терминов опыта и образования (HASH_BITS бит, по 8 в байте).
+Оценка всех резюме для вакансии - несколько операций над целыми столбцами, без базы; из базы
+выбираются только лучшие.
+
+Составляющие оценки (веса - MATCHING_WEIGHTS):
+
+* specialty - та же специализация: 1, иначе 0;
+* grade - квалификация из названия вакансии (junior, senior, ...): 1 - разница / 4; нет в названии - 0.5;
+* salary - ожидание в вилке или ниже: 1, выше salary_max - линейно до 0 при двукратном превышении;
+* status - ищет работу: 1, рассматривает предложения: 0.5, не ищет: 0;
+* text - доля терминов из навыков вакансии, которые есть в опыте и образовании.
+
+Матрица своя у каждого процесса. Она загружается из снимка (команда build_matching, файл
+MATCHING_SNAPSHOT) или, если снимка нет, строится из базы; изменения резюме в этом процессе попадают
+в неё сразу (vacancies.signals), сделанные другими процессами - перед подбором, не чаще раза в
+MATCHING_SYNC_INTERVAL секунд, по Resume.updated_at. Удалённые резюме отсеиваются при выборке из базы.
+"""
+from collections import deque
+from datetime import datetime
+import os
+import threading
+import time
+import zlib
+
+from django.conf import settings
+from django.utils import timezone
+import numpy as np
+
+from vacancies.models import Resume
+from vacancies.search.text import tokenize, words
+
+HASH_BITS = 1024
+ROW_BYTES = HASH_BITS // 8
+
+FIELDS = ('id', 'specialty_id', 'grade', 'status', 'salary', 'experience', 'education', 'updated_at')
+
+# индекс - Resume.Status
+STATUS_SCORES = np.array([0, 0, 0.5, 1], dtype=np.float32)
+
+GRADE_WORDS = {
+    Resume.Grade.intern: ('стажер', 'стажёр', 'intern', 'trainee'),
+    Resume.Grade.junior: ('junior', 'джуниор', 'младший'),
+    Resume.Grade.middle: ('middle', 'миддл'),
+    Resume.Grade.senior: ('senior', 'синьор', 'сеньор', 'старший', 'ведущий'),
+    Resume.Grade.lead: ('lead', 'тимлид', 'лид', 'руководитель'),
+}
+GRADES = {word: grade for grade, grade_words in GRADE_WORDS.items() for word in grade_words}
+
+DEFAULT_WEIGHTS = {'specialty': 3, 'grade': 1, 'salary': 2, 'status': 1, 'text': 3}
+
+
+def term_bits(text: str) -> np.ndarray:
+    """Номера бит терминов текста (crc32 - одинаков во всех процессах, в отличие от hash())"""
+    return np.array(sorted({zlib.crc32(term.encode()) % HASH_BITS for term in tokenize(text)}), dtype=np.int64)
+
+
+def vacancy_grade(title: str):
+    """Квалификация по первому подходящему слову названия вакансии или None"""
+    return next((GRADES[word] for word in words(title) if word in GRADES), None)
+
+
+class Columns:
+    """Признаки пачки резюме - одна строка на резюме"""
+
+    def __init__(self, rows, specialty_index):
+        self.ids = np.array([row[0] for row in rows], dtype=np.int64)
+        self.specialty = np.array([specialty_index(row[1]) for row in rows], dtype=np.int16)
+        self.grade = np.array([row[2] for row in rows], dtype=np.int8)
+        self.status = np.array([row[3] for row in rows], dtype=np.int8)
+        self.salary = np.array([row[4] for row in rows], dtype=np.float32)
+        self.bits = np.zeros((len(rows), HASH_BITS), dtype=bool)
+        for number, row in enumerate(rows):
+            self.bits[number, term_bits(f'{row[5]} {row[6]}')] = True
+        self.bits = np.packbits(self.bits, axis=1)
+
+
+class ResumeMatrix:
+    COLUMNS = ('ids', 'specialty', 'grade', 'status', 'salary', 'bits', 'valid')
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.specialty = np.zeros(0, dtype=np.int16)
+        self.grade = np.zeros(0, dtype=np.int8)
+        self.status = np.zeros(0, dtype=np.int8)
+        self.salary = np.zeros(0, dtype=np.float32)
+        self.bits = np.zeros((0, ROW_BYTES), dtype=np.uint8)
+        self.valid = np.zeros(0, dtype=bool)
+        self.rows = {}
+        self.specialties = {}
+        self.synced_at = None
+        self.checked = None
+
+    def __len__(self):
+        return int(self.valid.sum())
+
+    def specialty_index(self, code) -> int:
+        return self.specialties.setdefault(code, len(self.specialties))
+
+    #################################################
+    #                   Обновление                  #
+    #################################################
+    def upsert(self, rows):
+        """Добавляет или заменяет строки резюме (кортежи полей FIELDS)"""
+        if not rows:
+            return
+        with self.lock:
+            columns = Columns(rows, self.specialty_index)
+            known = np.array([pk in self.rows for pk in columns.ids.tolist()], dtype=bool)
+            self._replace(columns, known)
+            self._append(columns, ~known)
+            self.synced_at = max(filter(None, (self.synced_at, *(row[-1] for row in rows))))
+
+    def _replace(self, columns, mask):
+        positions = [self.rows[pk] for pk in columns.ids[mask].tolist()]
+        for name in ('specialty', 'grade', 'status', 'salary', 'bits'):
+            getattr(self, name)[positions] = getattr(columns, name)[mask]
+        self.valid[positions] = True
+
+    def _append(self, columns, mask):
+        start = len(self.ids)
+        self.rows.update((pk, start + offset) for offset, pk in enumerate(columns.ids[mask].tolist()))
+        for name in ('ids', 'specialty', 'grade', 'status', 'salary', 'bits'):
+            setattr(self, name, np.concatenate([getattr(self, name), getattr(columns, name)[mask]]))
+        self.valid = np.concatenate([self.valid, np.ones(int(mask.sum()), dtype=bool)])
+
+    def remove(self, ids):
+        with self.lock:
+            self.valid[[self.rows[pk] for pk in ids if pk in self.rows]] = False
+
+    def build(self, batch_size=5000):
+        """Все резюме из базы пачками; отдаёт число загруженных после каждой пачки"""
+        rows = Resume.objects.order_by('id').values_list(*FIELDS).iterator(chunk_size=batch_size)
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == batch_size:
+                self.upsert(batch)
+                batch = []
+                yield len(self.ids)
+        self.upsert(batch)
+        yield len(self.ids)
+
+    def sync(self):
+        """Догружает резюме, изменённые с последней сверки; пустая матрица строится целиком"""
+        self.checked = time.monotonic()
+        if self.synced_at is None:
+            deque(self.build(), maxlen=0)
+            return
+        self.upsert(list(Resume.objects.filter(updated_at__gte=self.synced_at).values_list(*FIELDS)))
+
+    #################################################
+    #                     Снимок                    #
+    #################################################
+    def save(self, path):
+        with self.lock:
+            arrays = {name: getattr(self, name) for name in self.COLUMNS}
+            np.savez(
+                path,
+                specialties=np.array(list(self.specialties), dtype=str),
+                synced_at=np.array(self.synced_at.timestamp() if self.synced_at else 0.0),
+                **arrays,
+            )
+
+    def load(self, path):
+        with np.load(path) as snapshot, self.lock:
+            for name in self.COLUMNS:
+                setattr(self, name, snapshot[name])
+            self.rows = {pk: position for position, pk in enumerate(self.ids.tolist())}
+            self.specialties = {code: index for index, code in enumerate(snapshot['specialties'].tolist())}
+            stamp = float(snapshot['synced_at'])
+            self.synced_at = datetime.fromtimestamp(stamp, timezone.utc) if stamp else None
+
+    #################################################
+    #                     Оценка                    #
+    #################################################
+    def scores(self, vacancy) -> np.ndarray:
+        """Оценка каждой строки матрицы для вакансии; недействительные строки - -inf"""
+        weights = getattr(settings, 'MATCHING_WEIGHTS', DEFAULT_WEIGHTS)
+        with self.lock:
+            components = {
+                'specialty': self.specialty == self.specialties.get(vacancy.specialty_id, -1),
+                'grade': self._grade_scores(vacancy_grade(vacancy.title)),
+                'salary': np.clip(2 - self.salary / max(vacancy.salary_max, 1), 0, 1),
+                'status': STATUS_SCORES[self.status],
+                'text': self._text_scores(term_bits(vacancy.skills)),
+            }
+            total = sum(weight * components[name] for name, weight in weights.items())
+            return np.where(self.valid, total, -np.inf)
+
+    def _grade_scores(self, grade):
+        if grade is None:
+            return np.full(len(self.ids), 0.5, dtype=np.float32)
+        return 1 - np.abs(self.grade - int(grade)) / 4
+
+    def _text_scores(self, positions):
+        """Доля установленных бит из positions: по одному столбцу байтов на бит"""
+        found = np.zeros(len(self.ids), dtype=np.float32)
+        for position in positions.tolist():
+            found += (self.bits[:, position >> 3] >> (7 - (position & 7))) & 1
+        return found / max(len(positions), 1)
+
+    def best(self, vacancy, count) -> list:
+        """[(id резюме, оценка)] лучших count, по убыванию оценки"""
+        scores = self.scores(vacancy)
+        count = min(count, int(np.isfinite(scores).sum()))
+        top = np.argpartition(-scores, count - 1)[:count] if count else np.zeros(0, dtype=np.int64)
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return list(zip(self.ids[top].tolist(), scores[top].tolist()))
+
+
+matrix = ResumeMatrix()
+
+
+def _snapshot_path():
+    return getattr(settings, 'MATCHING_SNAPSHOT', None)
+
+
+def _prepare():
+    """Первое обращение - снимок или база; дальше - догрузка изменений раз в MATCHING_SYNC_INTERVAL"""
+    path = _snapshot_path()
+    interval = getattr(settings, 'MATCHING_SYNC_INTERVAL', 60)
+    with matrix.lock:
+        if matrix.checked is None and path and os.path.exists(path):
+            matrix.load(path)
+        if matrix.checked is None or time.monotonic() - matrix.checked > interval:
+            matrix.sync()
+
+
+def resume_saved(resume):
+    """Сохранённое в этом процессе резюме - сразу в матрицу, если она уже загружена"""
+    if matrix.checked is not None:
+        matrix.upsert([tuple(getattr(resume, name) for name in FIELDS)])
+
+
+def resume_deleted(pk):
+    matrix.remove([pk])
+
+
+def best_candidates(vacancy, count=10) -> list:
+    """[(резюме, оценка 0-100)] лучших кандидатов на вакансию; удалённые резюме убираются из матрицы"""
+    _prepare()
+    weights = getattr(settings, 'MATCHING_WEIGHTS', DEFAULT_WEIGHTS)
+    # с запасом: часть резюме могли удалить в других процессах
+    ranked = matrix.best(vacancy, 2 * count)
+    resumes = Resume.objects.select_related('specialty').in_bulk([pk for pk, _ in ranked])
+    matrix.remove([pk for pk, _ in ranked if pk not in resumes])
+    found = [(resumes[pk], round(100 * score / sum(weights.values()))) for pk, score in ranked if pk in resumes]
+    return found[:count]
@@ -0,0 +1,168 @@
+"""
+Отдача файлов из MEDIA_ROOT по MEDIA_URL.
+
+Режим задаётся settings.MEDIA_SERVE:
+
+* 'x-accel' - ответ с заголовком X-Accel-Redirect, байты отдаёт nginx:
+
+      location /protected-media/ {
+          internal;
+          alias /path/to/media/;
+      }
+
+* 'x-sendfile' - заголовок X-Sendfile с абсолютным путём (Apache mod_xsendfile, lighttpd);
+* 'python' (по умолчанию) - сам Django: FileResponse (под gunicorn - os.sendfile через wsgi.file_wrapper),
+  сильный ETag, Last-Modified, ответы 304/412 на условные запросы и один диапазон байт (206/416).
+
+MediaMiddleware стоит первым в MIDDLEWARE: запросы к файлам не проходят сессии, CSRF и аутентификацию.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, HttpResponse, HttpResponseNotAllowed, HttpResponseNotFound
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class FileRange:
+    """Окно файла [start, start + length) для FileResponse; fileno() оставляет возможность sendfile"""
+
+    def __init__(self, source, start, length):
+        source.seek(start)
+        self.file = source
+        self.remaining = length
+
+    def read(self, size=-1):
+        size = self.remaining if size < 0 else min(size, self.remaining)
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def media_path(relative_path: str):
+    """Абсолютный путь к файлу внутри MEDIA_ROOT или None"""
+    try:
+        path = safe_join(settings.MEDIA_ROOT, relative_path)
+    except SuspiciousFileOperation:
+        return None
+    return path if os.path.isfile(path) else None
+
+
+def etag(stat) -> str:
+    return f'"{stat.st_ino:x}-{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def parse_range(header: str, size: int):
+    """(начало, длина) единственного диапазона; None - отдать файл целиком; ValueError - диапазон вне файла"""
+    match = RANGE.match(header)
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    start = int(first) if first else max(size - int(last), 0)
+    end = min(int(last), size - 1) if first and last else size - 1
+    if start > end:
+        raise ValueError(header)
+    return start, end - start + 1
+
+
+def _if_range_matches(request, tag, mtime):
+    """If-Range: диапазон отдаётся, только если файл не менялся"""
+    condition = request.META.get('HTTP_IF_RANGE')
+    if condition is None or condition == tag:
+        return True
+    return parse_http_date_safe(condition) == int(mtime)
+
+
+def _requested_window(request, stat, tag):
+    if not _if_range_matches(request, tag, stat.st_mtime):
+        return None
+    return parse_range(request.META.get('HTTP_RANGE', ''), stat.st_size)
+
+
+def _range_response(request, path, stat, tag):
+    try:
+        window = _requested_window(request, stat, tag)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return response
+    return _file_response(path, stat, window)
+
+
+def _file_response(path, stat, window):
+    if window is None:
+        return FileResponse(open(path, 'rb'))
+    start, length = window
+    response = FileResponse(FileRange(open(path, 'rb'), start, length), status=206)
+    response['Content-Length'] = length
+    response['Content-Range'] = f'bytes {start}-{start + length - 1}/{stat.st_size}'
+    return response
+
+
+def serve_python(request, path):
+    stat = os.stat(path)
+    tag = etag(stat)
+    response = get_conditional_response(request, etag=tag, last_modified=int(stat.st_mtime))
+    if response is None:
+        response = _range_response(request, path, stat, tag)
+    response['Content-Type'] = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    response['ETag'] = tag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def serve_x_accel(request, path):
+    response = HttpResponse(content_type=mimetypes.guess_type(path)[0])
+    relative_path = os.path.relpath(path, settings.MEDIA_ROOT).replace(os.sep, '/')
+    response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX + quote(relative_path)
+    return response
+
+
+def serve_x_sendfile(request, path):
+    response = HttpResponse(content_type=mimetypes.guess_type(path)[0])
+    response['X-Sendfile'] = path
+    return response
+
+
+SERVERS = {
+    'python': serve_python,
+    'x-accel': serve_x_accel,
+    'x-sendfile': serve_x_sendfile,
+}
+
+
+def serve(request, relative_path):
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponseNotAllowed(['GET', 'HEAD'])
+    path = media_path(relative_path)
+    if path is None:
+        return HttpResponseNotFound('Файл не найден', content_type='text/plain; charset=utf-8')
+    response = SERVERS[getattr(settings, 'MEDIA_SERVE', 'python')](request, path)
+    patch_cache_control(response, public=True, max_age=getattr(settings, 'MEDIA_MAX_AGE', 3600))
+    return response
+
+
+class MediaMiddleware:
+    """Запросы к MEDIA_URL обрабатываются до остальных middleware и URLconf"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not request.path.startswith(settings.MEDIA_URL):
+            return self.get_response(request)
+        return serve(request, request.path[len(settings.MEDIA_URL):])
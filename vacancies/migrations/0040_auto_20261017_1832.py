@@ -0,0 +1,63 @@
+# Generated by Django 3.1.6 on 2026-10-17 18:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from vacancies.search.text import document_terms
+
+
+def build_search_index(apps, schema_editor):
+    Vacancy = apps.get_model('vacancies', 'Vacancy')
+    SearchDocument = apps.get_model('vacancies', 'SearchDocument')
+    SearchPosting = apps.get_model('vacancies', 'SearchPosting')
+
+    for vacancy in Vacancy.objects.select_related('company').iterator():
+        terms = document_terms(
+            title=vacancy.title,
+            skills=vacancy.skills,
+            description=vacancy.description,
+            company_name=vacancy.company.name,
+        )
+        document = SearchDocument.objects.create(vacancy_id=vacancy.id, length=sum(terms.values()))
+        SearchPosting.objects.bulk_create(
+            SearchPosting(term=term, document=document, frequency=frequency) for term, frequency in terms.items()
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacancies', '0039_auto_20210502_1411'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('vacancy', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='vacancies.vacancy')),
+                ('length', models.PositiveIntegerField(default=0, verbose_name='длина документа')),
+            ],
+            options={
+                'verbose_name': 'поисковый документ',
+                'verbose_name_plural': 'поисковые документы',
+            },
+        ),
+        migrations.CreateModel(
+            name='SearchPosting',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=50, verbose_name='термин')),
+                ('frequency', models.PositiveIntegerField(verbose_name='взвешенная частота')),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='postings', to='vacancies.searchdocument')),
+            ],
+            options={
+                'verbose_name': 'вхождение термина',
+                'verbose_name_plural': 'вхождения терминов',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='searchposting',
+            constraint=models.UniqueConstraint(fields=('term', 'document'), name='search_posting_term_document'),
+        ),
+        migrations.RunPython(build_search_index, migrations.RunPython.noop),
+    ]
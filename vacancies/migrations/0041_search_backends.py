@@ -0,0 +1,153 @@
+from django.db import migrations
+
+# DDL на момент миграции; текущие определения и триггеры SQLite - vacancies.search.sql
+# (их ставит post_migrate)
+SQLITE_SCHEMA = (
+    '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS vacancies_vacancy_fts
+    USING fts5(title, skills, description, company_name, tokenize = 'unicode61 remove_diacritics 2')
+    ''',
+    '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS vacancies_resume_fts
+    USING fts5(name, surname, experience, education, tokenize = 'unicode61 remove_diacritics 2')
+    ''',
+)
+
+SQLITE_POPULATE = (
+    '''
+    INSERT INTO vacancies_vacancy_fts(rowid, title, skills, description, company_name)
+    SELECT v.id, v.title, v.skills, v.description, c.name
+    FROM vacancies_vacancy v JOIN vacancies_company c ON c.id = v.company_id
+    ''',
+    '''
+    INSERT INTO vacancies_resume_fts(rowid, name, surname, experience, education)
+    SELECT id, name, surname, experience, education FROM vacancies_resume
+    ''',
+)
+
+SQLITE_DROP = (
+    'DROP TRIGGER IF EXISTS vacancies_vacancy_fts_insert',
+    'DROP TRIGGER IF EXISTS vacancies_vacancy_fts_update',
+    'DROP TRIGGER IF EXISTS vacancies_vacancy_fts_delete',
+    'DROP TRIGGER IF EXISTS vacancies_company_fts_update',
+    'DROP TRIGGER IF EXISTS vacancies_resume_fts_insert',
+    'DROP TRIGGER IF EXISTS vacancies_resume_fts_update',
+    'DROP TRIGGER IF EXISTS vacancies_resume_fts_delete',
+    'DROP TABLE IF EXISTS vacancies_vacancy_fts',
+    'DROP TABLE IF EXISTS vacancies_resume_fts',
+)
+
+POSTGRES_SCHEMA = (
+    'ALTER TABLE vacancies_vacancy ADD COLUMN IF NOT EXISTS search_vector tsvector',
+    '''
+    CREATE INDEX IF NOT EXISTS vacancies_vacancy_search_vector
+    ON vacancies_vacancy USING GIN (search_vector)
+    ''',
+    '''
+    CREATE OR REPLACE FUNCTION vacancies_vacancy_search_vector() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('russian', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('russian', coalesce(NEW.skills, '')), 'B') ||
+            setweight(to_tsvector('russian', coalesce(
+                (SELECT name FROM vacancies_company WHERE id = NEW.company_id), '')), 'B') ||
+            setweight(to_tsvector('russian', coalesce(NEW.description, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    ''',
+    'DROP TRIGGER IF EXISTS vacancies_vacancy_search_vector ON vacancies_vacancy',
+    '''
+    CREATE TRIGGER vacancies_vacancy_search_vector
+    BEFORE INSERT OR UPDATE OF title, skills, description, company_id ON vacancies_vacancy
+    FOR EACH ROW EXECUTE PROCEDURE vacancies_vacancy_search_vector()
+    ''',
+    '''
+    CREATE OR REPLACE FUNCTION vacancies_company_search_vector() RETURNS trigger AS $$
+    BEGIN
+        IF NEW.name IS DISTINCT FROM OLD.name THEN
+            UPDATE vacancies_vacancy SET company_id = company_id WHERE company_id = NEW.id;
+        END IF;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    ''',
+    'DROP TRIGGER IF EXISTS vacancies_company_search_vector ON vacancies_company',
+    '''
+    CREATE TRIGGER vacancies_company_search_vector AFTER UPDATE OF name ON vacancies_company
+    FOR EACH ROW EXECUTE PROCEDURE vacancies_company_search_vector()
+    ''',
+    'ALTER TABLE vacancies_resume ADD COLUMN IF NOT EXISTS search_vector tsvector',
+    '''
+    CREATE INDEX IF NOT EXISTS vacancies_resume_search_vector
+    ON vacancies_resume USING GIN (search_vector)
+    ''',
+    '''
+    CREATE OR REPLACE FUNCTION vacancies_resume_search_vector() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('russian', coalesce(NEW.name, '') || ' ' || coalesce(NEW.surname, '')), 'A') ||
+            setweight(to_tsvector('russian', coalesce(NEW.experience, '')), 'B') ||
+            setweight(to_tsvector('russian', coalesce(NEW.education, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    ''',
+    'DROP TRIGGER IF EXISTS vacancies_resume_search_vector ON vacancies_resume',
+    '''
+    CREATE TRIGGER vacancies_resume_search_vector
+    BEFORE INSERT OR UPDATE OF name, surname, experience, education ON vacancies_resume
+    FOR EACH ROW EXECUTE PROCEDURE vacancies_resume_search_vector()
+    ''',
+)
+
+# UPDATE индексируемой колонки без изменений заставляет триггер посчитать search_vector
+POSTGRES_POPULATE = (
+    'UPDATE vacancies_vacancy SET title = title',
+    'UPDATE vacancies_resume SET name = name',
+)
+
+POSTGRES_DROP = (
+    'DROP TRIGGER IF EXISTS vacancies_vacancy_search_vector ON vacancies_vacancy',
+    'DROP TRIGGER IF EXISTS vacancies_company_search_vector ON vacancies_company',
+    'DROP TRIGGER IF EXISTS vacancies_resume_search_vector ON vacancies_resume',
+    'DROP FUNCTION IF EXISTS vacancies_vacancy_search_vector()',
+    'DROP FUNCTION IF EXISTS vacancies_company_search_vector()',
+    'DROP FUNCTION IF EXISTS vacancies_resume_search_vector()',
+    'ALTER TABLE vacancies_vacancy DROP COLUMN IF EXISTS search_vector',
+    'ALTER TABLE vacancies_resume DROP COLUMN IF EXISTS search_vector',
+)
+
+INSTALL = {
+    'sqlite': SQLITE_SCHEMA + SQLITE_POPULATE,
+    'postgresql': POSTGRES_SCHEMA + POSTGRES_POPULATE,
+}
+
+UNINSTALL = {
+    'sqlite': SQLITE_DROP,
+    'postgresql': POSTGRES_DROP,
+}
+
+
+def execute_all(schema_editor, statements):
+    for statement in statements.get(schema_editor.connection.vendor, ()):
+        schema_editor.execute(statement)
+
+
+def install_search_schema(apps, schema_editor):
+    execute_all(schema_editor, INSTALL)
+
+
+def uninstall_search_schema(apps, schema_editor):
+    execute_all(schema_editor, UNINSTALL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacancies', '0040_auto_20261017_1832'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_schema, uninstall_search_schema),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 3.1.6 on 2026-10-17 18:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacancies', '0041_search_backends'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(fields=['published_at', 'id'], name='vacancy_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(fields=['specialty', 'published_at', 'id'], name='vacancy_specialty_pub_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(fields=['company', 'published_at', 'id'], name='vacancy_company_pub_idx'),
+        ),
+    ]
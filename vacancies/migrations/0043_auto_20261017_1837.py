@@ -0,0 +1,48 @@
+# Generated by Django 3.1.6 on 2026-10-17 18:37
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def recount(model, field, related_model, related_field):
+    related = related_model.objects.filter(**{related_field: OuterRef('pk')}).order_by()
+    counts = related.values(related_field).annotate(total=Count('pk')).values('total')
+    model.objects.update(**{field: Coalesce(Subquery(counts, output_field=IntegerField()), 0)})
+
+
+def fill_counters(apps, schema_editor):
+    Specialty = apps.get_model('vacancies', 'Specialty')
+    Company = apps.get_model('vacancies', 'Company')
+    Vacancy = apps.get_model('vacancies', 'Vacancy')
+    Application = apps.get_model('vacancies', 'Application')
+
+    recount(Specialty, 'vacancy_count', Vacancy, 'specialty')
+    recount(Company, 'vacancy_count', Vacancy, 'company')
+    recount(Vacancy, 'application_count', Application, 'vacancy')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacancies', '0042_auto_20261017_1836'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='vacancy_count',
+            field=models.IntegerField(default=0, verbose_name='количество вакансий'),
+        ),
+        migrations.AddField(
+            model_name='specialty',
+            name='vacancy_count',
+            field=models.IntegerField(default=0, verbose_name='количество вакансий'),
+        ),
+        migrations.AddField(
+            model_name='vacancy',
+            name='application_count',
+            field=models.IntegerField(default=0, verbose_name='количество откликов'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
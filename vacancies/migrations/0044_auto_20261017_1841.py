@@ -0,0 +1,67 @@
+# Generated by Django 3.1.6 on 2026-10-17 18:41
+
+from itertools import islice
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from vacancies.skills import link_skills
+
+
+def fill_skills(apps, schema_editor):
+    Skill = apps.get_model('vacancies', 'Skill')
+    Vacancy = apps.get_model('vacancies', 'Vacancy')
+    VacancySkill = apps.get_model('vacancies', 'VacancySkill')
+
+    vacancies = Vacancy.objects.only('id', 'skills').iterator(chunk_size=500)
+    for batch in iter(lambda: list(islice(vacancies, 500)), []):
+        link_skills(batch, Skill, VacancySkill)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacancies', '0043_auto_20261017_1837'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, verbose_name='название')),
+                ('slug', models.SlugField(allow_unicode=True, unique=True, verbose_name='код')),
+            ],
+            options={
+                'verbose_name': 'навык',
+                'verbose_name_plural': 'навыки',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='VacancySkill',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vacancy_links', to='vacancies.skill')),
+                ('vacancy', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_links', to='vacancies.vacancy')),
+            ],
+            options={
+                'verbose_name': 'навык вакансии',
+                'verbose_name_plural': 'навыки вакансий',
+            },
+        ),
+        migrations.AddField(
+            model_name='vacancy',
+            name='skill_tags',
+            field=models.ManyToManyField(related_name='vacancies', through='vacancies.VacancySkill', to='vacancies.Skill', verbose_name='навыки'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancyskill',
+            index=models.Index(fields=['skill', 'vacancy'], name='vacancy_skill_skill_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='vacancyskill',
+            constraint=models.UniqueConstraint(fields=('vacancy', 'skill'), name='vacancy_skill_unique'),
+        ),
+        migrations.RunPython(fill_skills, migrations.RunPython.noop),
+    ]
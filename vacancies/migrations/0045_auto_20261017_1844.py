@@ -0,0 +1,25 @@
+# Generated by Django 3.1.6 on 2026-10-17 18:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacancies', '0044_auto_20261017_1841'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='company',
+            index=models.Index(fields=['location', 'employee_count'], name='company_location_size_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(fields=['specialty', 'salary_min'], name='vacancy_specialty_salary_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(fields=['salary_min'], name='vacancy_salary_idx'),
+        ),
+    ]
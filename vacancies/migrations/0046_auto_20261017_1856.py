@@ -0,0 +1,39 @@
+# Generated by Django 3.1.6 on 2026-10-17 18:56
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacancies', '0045_auto_20261017_1844'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, verbose_name='задача')),
+                ('args', models.JSONField(default=list, verbose_name='аргументы')),
+                ('priority', models.SmallIntegerField(default=5, verbose_name='приоритет')),
+                ('status', models.SmallIntegerField(choices=[(1, 'В очереди'), (2, 'Выполняется'), (3, 'Ошибка')], default=1, verbose_name='статус')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='попыток')),
+                ('max_attempts', models.PositiveSmallIntegerField(default=3, verbose_name='максимум попыток')),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='выполнить не раньше')),
+                ('locked_by', models.CharField(blank=True, max_length=100, verbose_name='воркер')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='взято воркером')),
+                ('last_error', models.TextField(blank=True, verbose_name='последняя ошибка')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='создано')),
+            ],
+            options={
+                'verbose_name': 'фоновое задание',
+                'verbose_name_plural': 'фоновые задания',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'priority', 'run_at'], name='job_ready_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 3.1.6 on 2026-10-17 19:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacancies', '0047_auto_20261017_1913'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='specialty',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='изменено'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(fields=['company', 'updated_at'], name='vacancy_company_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(fields=['specialty', 'updated_at'], name='vacancy_specialty_updated_idx'),
+        ),
+    ]
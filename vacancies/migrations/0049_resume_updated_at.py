@@ -0,0 +1,18 @@
+# Generated by Django 3.1.6 on 2026-10-17 19:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacancies', '0048_auto_20261017_1916'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resume',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='изменено'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.1.6 on 2026-10-17 19:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacancies', '0049_resume_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarVacancy',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(verbose_name='сходство')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_to', to='vacancies.vacancy')),
+                ('vacancy', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='similar_links', to='vacancies.vacancy')),
+            ],
+            options={
+                'verbose_name': 'похожая вакансия',
+                'verbose_name_plural': 'похожие вакансии',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='similarvacancy',
+            index=models.Index(fields=['vacancy', '-score'], name='similar_vacancy_score_idx'),
+        ),
+    ]
@@ -0,0 +1,75 @@
+from django.db import migrations
+from django.db.models import Q
+from django.utils.text import slugify
+
+MAX_LENGTH = 50
+
+# разбор навыков на момент миграции (vacancies.skills): + и # больше не теряются в slug
+SLUG_SYMBOLS = str.maketrans({'+': 'plus', '#': 'sharp'})
+
+
+def skill_slug(name):
+    return slugify(name.translate(SLUG_SYMBOLS), allow_unicode=True)[:MAX_LENGTH]
+
+
+def parse_skills(text):
+    skills = {}
+    for part in text.split(','):
+        name = ' '.join(part.split())[:MAX_LENGTH]
+        skills.setdefault(skill_slug(name), name)
+    skills.pop('', None)
+    return skills
+
+
+def with_symbols(field):
+    return Q(**{f'{field}__contains': '+'}) | Q(**{f'{field}__contains': '#'})
+
+
+def relink_vacancies(Skill, Vacancy, VacancySkill):
+    """Связи вакансий, в навыках которых есть + или #, - с навыками по новым slug"""
+    rows = Vacancy.objects.filter(with_symbols('skills')).values_list('id', 'skills')
+    parsed = {pk: parse_skills(text) for pk, text in rows.iterator()}
+    names = {}
+    for skills in parsed.values():
+        for slug, name in skills.items():
+            names.setdefault(slug, name)
+    Skill.objects.bulk_create([Skill(slug=slug, name=name) for slug, name in names.items()], ignore_conflicts=True)
+    ids = dict(Skill.objects.filter(slug__in=names).values_list('slug', 'id'))
+
+    VacancySkill.objects.filter(vacancy_id__in=parsed).delete()
+    VacancySkill.objects.bulk_create([
+        VacancySkill(vacancy_id=pk, skill_id=ids[slug]) for pk, skills in parsed.items() for slug in skills
+    ])
+
+
+def fix_merged_skills(Skill, VacancySkill):
+    """Навык "C" мог получить название "C++": название - из оставшейся вакансии, вакансий нет - навык удаляется"""
+    for skill in Skill.objects.filter(with_symbols('name')):
+        if skill_slug(skill.name) == skill.slug:
+            continue
+        text = VacancySkill.objects.filter(skill_id=skill.id).values_list('vacancy__skills', flat=True).first()
+        if text is None:
+            skill.delete()
+            continue
+        skill.name = parse_skills(text).get(skill.slug, skill.name)
+        skill.save(update_fields=['name'])
+
+
+def relink_skills(apps, schema_editor):
+    Skill = apps.get_model('vacancies', 'Skill')
+    Vacancy = apps.get_model('vacancies', 'Vacancy')
+    VacancySkill = apps.get_model('vacancies', 'VacancySkill')
+
+    relink_vacancies(Skill, Vacancy, VacancySkill)
+    fix_merged_skills(Skill, VacancySkill)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacancies', '0051_recommendation'),
+    ]
+
+    operations = [
+        migrations.RunPython(relink_skills, migrations.RunPython.noop),
+    ]
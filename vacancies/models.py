@@ -1,5 +1,6 @@
 from django.contrib.auth.models import User
 from django.db import models
+from django.utils import timezone
 from phonenumber_field.modelfields import PhoneNumberField
 
 from conf.settings import MEDIA_COMPANY_IMAGE_DIR, MEDIA_SPECIALITY_IMAGE_DIR, MEDIA_USER_PHOTO_IMAGE_DIR
@@ -13,6 +14,8 @@ class Specialty(models.Model):
         upload_to=MEDIA_SPECIALITY_IMAGE_DIR,
         default=f'{MEDIA_SPECIALITY_IMAGE_DIR}/100x60.gif',
     )
+    vacancy_count = models.IntegerField("количество вакансий", default=0)
+    updated_at = models.DateTimeField("изменено", auto_now=True)
 
     class Meta:
         verbose_name = "специализация"
@@ -36,10 +39,31 @@ class Company(models.Model):
     employee_count = models.IntegerField("количество сотрудников", choices=EmployeeCount.choices)
     logo = models.ImageField("логотип", upload_to=MEDIA_COMPANY_IMAGE_DIR)
     owner = models.OneToOneField(User, on_delete=models.CASCADE, related_name="owner_user", verbose_name="owner_id")
+    vacancy_count = models.IntegerField("количество вакансий", default=0)
+    # версия страниц компании и карточек её вакансий (vacancies.versions, vacancies.cards)
+    updated_at = models.DateTimeField("изменено", auto_now=True)
 
     class Meta:
         verbose_name = "компания"
         verbose_name_plural = "компании"
+        # фасеты "город" и "размер компании"
+        indexes = [
+            models.Index(fields=['location', 'employee_count'], name='company_location_size_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name}"
+
+
+class Skill(models.Model):
+    """Навык из справочника (разбирается из Vacancy.skills, см. vacancies.skills)"""
+    name = models.CharField("название", max_length=50)
+    slug = models.SlugField("код", max_length=50, unique=True, allow_unicode=True)
+
+    class Meta:
+        verbose_name = "навык"
+        verbose_name_plural = "навыки"
+        ordering = ['name']
 
     def __str__(self):
         return f"{self.name}"
@@ -56,16 +80,68 @@ class Vacancy(models.Model):
                                 on_delete=models.CASCADE, related_name="vacancies", verbose_name="компания")
     specialty = models.ForeignKey(Specialty,
                                   on_delete=models.PROTECT, related_name="vacancies", verbose_name="специализация")
+    application_count = models.IntegerField("количество откликов", default=0)
+    skill_tags = models.ManyToManyField(Skill, through='VacancySkill', related_name="vacancies", verbose_name="навыки")
+    updated_at = models.DateTimeField("изменено", auto_now=True)
 
     class Meta:
         verbose_name = "вакансия"
         verbose_name_plural = "вакансии"
         ordering = ['id']
+        # курсорная пагинация (published_at, id) по всем вакансиям, по специализации и по компании
+        indexes = [
+            models.Index(fields=['published_at', 'id'], name='vacancy_published_idx'),
+            models.Index(fields=['specialty', 'published_at', 'id'], name='vacancy_specialty_pub_idx'),
+            models.Index(fields=['company', 'published_at', 'id'], name='vacancy_company_pub_idx'),
+            # фасеты "специализация" + "зарплата" и зарплата отдельно
+            models.Index(fields=['specialty', 'salary_min'], name='vacancy_specialty_salary_idx'),
+            models.Index(fields=['salary_min'], name='vacancy_salary_idx'),
+            # версии страниц компании и специализации: MAX(updated_at) (vacancies.versions)
+            models.Index(fields=['company', 'updated_at'], name='vacancy_company_updated_idx'),
+            models.Index(fields=['specialty', 'updated_at'], name='vacancy_specialty_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title}"
 
 
+class SimilarVacancy(models.Model):
+    """Похожая вакансия: сосед по TF-IDF (vacancies.similar), пересчитывается в фоне"""
+    vacancy = models.ForeignKey(Vacancy, on_delete=models.CASCADE, related_name="similar_links", db_index=False)
+    similar = models.ForeignKey(Vacancy, on_delete=models.CASCADE, related_name="similar_to")
+    score = models.FloatField("сходство")
+
+    class Meta:
+        verbose_name = "похожая вакансия"
+        verbose_name_plural = "похожие вакансии"
+        # список похожих на странице вакансии - по индексу, сразу в порядке сходства
+        indexes = [
+            models.Index(fields=['vacancy', '-score'], name='similar_vacancy_score_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.vacancy_id} ~ {self.similar_id}"
+
+
+class VacancySkill(models.Model):
+    vacancy = models.ForeignKey(Vacancy, on_delete=models.CASCADE, related_name="skill_links")
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name="vacancy_links")
+
+    class Meta:
+        verbose_name = "навык вакансии"
+        verbose_name_plural = "навыки вакансий"
+        # уникальность покрывает выборку навыков вакансии, индекс (skill, vacancy) - вакансии по навыку
+        constraints = [
+            models.UniqueConstraint(fields=['vacancy', 'skill'], name='vacancy_skill_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['skill', 'vacancy'], name='vacancy_skill_skill_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.vacancy_id} - {self.skill_id}"
+
+
 class Application(models.Model):
     written_username = models.CharField("имя", max_length=50)
     written_phone = PhoneNumberField("номер телефона", region='RU')
@@ -105,6 +181,8 @@ class Resume(models.Model):
     education = models.TextField("образование", max_length=1000)
     experience = models.TextField("опыт работы", max_length=1000)
     portfolio = models.URLField("ссылка на портфолио", max_length=100)
+    # догрузка изменённых резюме в матрицу подбора (vacancies.matching)
+    updated_at = models.DateTimeField("изменено", auto_now=True, db_index=True)
 
     class Meta:
         verbose_name = "резюме"
@@ -113,3 +191,85 @@ class Resume(models.Model):
 
     def __str__(self):
         return f"{self.surname} {self.name}"
+
+
+class Recommendation(models.Model):
+    """Вакансия в ленте соискателя (vacancies.recommendations): ленты строятся в фоне"""
+    resume = models.ForeignKey(Resume, on_delete=models.CASCADE, related_name="recommendations", db_index=False)
+    vacancy = models.ForeignKey(Vacancy, on_delete=models.CASCADE, related_name="recommendations")
+    score = models.FloatField("оценка")
+
+    class Meta:
+        verbose_name = "рекомендация"
+        verbose_name_plural = "рекомендации"
+        constraints = [
+            models.UniqueConstraint(fields=['resume', 'vacancy'], name='recommendation_unique'),
+        ]
+        # страница ленты - по индексу в порядке оценки, курсор (score, vacancy)
+        indexes = [
+            models.Index(fields=['resume', 'score', 'vacancy'], name='recommendation_feed_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.resume_id} -> {self.vacancy_id}"
+
+
+class SearchDocument(models.Model):
+    """Вакансия в поисковом индексе"""
+    vacancy = models.OneToOneField(Vacancy, on_delete=models.CASCADE, primary_key=True, related_name="search_document")
+    length = models.PositiveIntegerField("длина документа", default=0)
+
+    class Meta:
+        verbose_name = "поисковый документ"
+        verbose_name_plural = "поисковые документы"
+
+    def __str__(self):
+        return f"{self.vacancy_id}"
+
+
+class SearchPosting(models.Model):
+    """Вхождение термина в вакансию (обратный индекс)"""
+    term = models.CharField("термин", max_length=50)
+    document = models.ForeignKey(SearchDocument, on_delete=models.CASCADE, related_name="postings")
+    frequency = models.PositiveIntegerField("взвешенная частота")
+
+    class Meta:
+        verbose_name = "вхождение термина"
+        verbose_name_plural = "вхождения терминов"
+        constraints = [
+            models.UniqueConstraint(fields=['term', 'document'], name='search_posting_term_document'),
+        ]
+
+    def __str__(self):
+        return f"{self.term} -> {self.document_id}"
+
+
+class Job(models.Model):
+    """Задание фоновой очереди (см. vacancies.jobs); выполненные задания удаляются"""
+    class Status(models.IntegerChoices):
+        queued = 1, 'В очереди'
+        running = 2, 'Выполняется'
+        failed = 3, 'Ошибка'
+
+    name = models.CharField("задача", max_length=200)
+    args = models.JSONField("аргументы", default=list)
+    priority = models.SmallIntegerField("приоритет", default=5)
+    status = models.SmallIntegerField("статус", choices=Status.choices, default=Status.queued)
+    attempts = models.PositiveSmallIntegerField("попыток", default=0)
+    max_attempts = models.PositiveSmallIntegerField("максимум попыток", default=3)
+    run_at = models.DateTimeField("выполнить не раньше", default=timezone.now)
+    locked_by = models.CharField("воркер", max_length=100, blank=True)
+    locked_at = models.DateTimeField("взято воркером", null=True, blank=True)
+    last_error = models.TextField("последняя ошибка", blank=True)
+    created_at = models.DateTimeField("создано", auto_now_add=True)
+
+    class Meta:
+        verbose_name = "фоновое задание"
+        verbose_name_plural = "фоновые задания"
+        # выборка готовых заданий воркером
+        indexes = [
+            models.Index(fields=['status', 'priority', 'run_at'], name='job_ready_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name}{tuple(self.args)}"
@@ -0,0 +1,69 @@
+"""
+Компания и резюме вошедшего пользователя: request.company и request.resume (OwnersMiddleware).
+
+Оба - ленивые объекты: запрос делает первое обращение, дальше в пределах запроса значение готово. Нет
+компании (резюме) или пользователь не вошёл - объект ложен (if request.company), поля читать нельзя.
+Между запросами значения лежат в кэше на USER_CACHE_TIMEOUT секунд; сохранение и удаление компании или
+резюме убирает их из кэша (vacancies.signals), в том числе у прежнего владельца. Только в общем кэше
+(vacancies.caching): компанию удаляет фоновая задача, сброс в её процессе локальный кэш сайта не увидит.
+
+Формы правки самой компании и резюме читают их из базы: кэш - для проверок владения и ссылок.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404
+from django.utils.functional import SimpleLazyObject
+
+from vacancies import caching
+from vacancies.models import Company, Resume
+
+# модель -> поле владельца
+OWNED = {Company: 'owner_id', Resume: 'user_id'}
+
+
+def owned_cache_key(model, user_id) -> str:
+    return f'owned:{model._meta.model_name}:{user_id}'
+
+
+def invalidate_owned(model, *user_ids):
+    cache.delete_many([owned_cache_key(model, user_id) for user_id in user_ids if user_id])
+
+
+def _from_db(model, user_id):
+    return model.objects.filter(**{OWNED[model]: user_id}).first()
+
+
+def _from_cache(model, user_id):
+    key = owned_cache_key(model, user_id)
+    # в кэше - кортеж: сохранённый None не отличить от промаха
+    cached = cache.get(key)
+    if cached is None:
+        cached = (_from_db(model, user_id),)
+        cache.set(key, cached, getattr(settings, 'USER_CACHE_TIMEOUT', 300))
+    return cached[0]
+
+
+def owned(model, user_id):
+    """Компания или резюме пользователя (из кэша или базы) или None"""
+    if not user_id:
+        return None
+    return _from_cache(model, user_id) if caching.is_shared() else _from_db(model, user_id)
+
+
+class OwnersMiddleware:
+    """request.company и request.resume; стоит после CachedUserMiddleware"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.company = SimpleLazyObject(lambda: owned(Company, request.user.id))
+        request.resume = SimpleLazyObject(lambda: owned(Resume, request.user.id))
+        return self.get_response(request)
+
+
+def company_or_404(request):
+    """Компания вошедшего пользователя, нет её - 404 (как get_object_or_404)"""
+    if not request.company:
+        raise Http404('Компания не найдена')
+    return request.company
@@ -0,0 +1,137 @@
+from django.conf import settings
+from django.core import signing
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q, QuerySet
+from django.http import Http404
+
+CURSOR_SALT = 'vacancies.pagination.cursor'
+
+
+class CursorSerializer(signing.JSONSerializer):
+    def dumps(self, obj):
+        return DjangoJSONEncoder(separators=(',', ':')).encode(obj).encode('latin-1')
+
+
+def encode_cursor(payload: dict) -> str:
+    return signing.dumps(payload, salt=CURSOR_SALT, serializer=CursorSerializer, compress=True)
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        return signing.loads(cursor, salt=CURSOR_SALT, serializer=CursorSerializer)
+    except signing.BadSignature:
+        raise Http404('Неверный курсор страницы')
+
+
+def _beyond(keys, values, lookup):
+    """(k1, k2, ...) < (v1, v2, ...) для lookup='lt', развёрнутое в OR по префиксам ключа"""
+    condition = Q()
+    for position, key in enumerate(keys):
+        equal = dict(zip(keys[:position], values[:position]))
+        condition |= Q(**equal, **{f'{key}__{lookup}': values[position]})
+    return condition
+
+
+class KeysetPage:
+    """Страница курсорной пагинации (совместима с page_obj в шаблонах)"""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Пагинация по ключу (по умолчанию (published_at, id), от новых к старым).
+
+    Страница выбирается условием WHERE по ключу последней записи, а не OFFSET, и без COUNT(*),
+    поэтому любая страница стоит столько же, сколько первая. Списки не-QuerySet (например,
+    результаты поиска в порядке релевантности) листаются по позиции.
+    """
+
+    def __init__(self, object_list, per_page, keys=('published_at', 'id')):
+        self.object_list = object_list
+        self.per_page = per_page
+        self.keys = tuple(keys)
+
+    def page(self, cursor=None) -> KeysetPage:
+        payload = decode_cursor(cursor) if cursor else {}
+        if not isinstance(self.object_list, QuerySet):
+            return self._position_page(payload.get('o', 0))
+        if payload.get('d') == 'prev':
+            return self._previous_page(payload['k'])
+        return self._next_page(payload.get('k'))
+
+    def _key(self, obj):
+        return [getattr(obj, key) for key in self.keys]
+
+    def _cursor(self, obj, direction):
+        return encode_cursor({'k': self._key(obj), 'd': direction})
+
+    def _next_page(self, after):
+        queryset = self.object_list.order_by(*(f'-{key}' for key in self.keys))
+        if after is not None:
+            queryset = queryset.filter(_beyond(self.keys, after, 'lt'))
+        rows = list(queryset[:self.per_page + 1])
+        objects = rows[:self.per_page]
+        return KeysetPage(
+            objects,
+            next_cursor=self._cursor(objects[-1], 'next') if len(rows) > self.per_page else None,
+            previous_cursor=self._cursor(objects[0], 'prev') if after is not None and objects else None,
+        )
+
+    def _previous_page(self, before):
+        queryset = self.object_list.order_by(*self.keys).filter(_beyond(self.keys, before, 'gt'))
+        rows = list(queryset[:self.per_page + 1])
+        objects = rows[:self.per_page][::-1]
+        return KeysetPage(
+            objects,
+            next_cursor=self._cursor(objects[-1], 'next') if objects else None,
+            previous_cursor=self._cursor(objects[0], 'prev') if len(rows) > self.per_page else None,
+        )
+
+    def _position_page(self, offset):
+        rows = self.object_list[offset:offset + self.per_page + 1]
+        return KeysetPage(
+            rows[:self.per_page],
+            next_cursor=encode_cursor({'o': offset + self.per_page}) if len(rows) > self.per_page else None,
+            previous_cursor=encode_cursor({'o': max(offset - self.per_page, 0)}) if offset else None,
+        )
+
+
+class KeysetPaginationMixin:
+    """
+    Курсорная пагинация для ListView.
+
+    Режим задаётся атрибутом pagination_mode или settings.PAGINATION_MODE ('offset' | 'keyset').
+    В режиме keyset в контексте paginator = None, а page_obj - KeysetPage с next_cursor/previous_cursor.
+    """
+    pagination_mode = None
+    keyset = ('published_at', 'id')
+    cursor_kwarg = 'cursor'
+
+    def get_pagination_mode(self):
+        return self.pagination_mode or getattr(settings, 'PAGINATION_MODE', 'offset')
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.get_pagination_mode() != 'keyset':
+            return super().paginate_queryset(queryset, page_size)
+
+        page = KeysetPaginator(queryset, page_size, self.keyset).page(self.request.GET.get(self.cursor_kwarg))
+        return None, page, page.object_list, page.has_other_pages()
@@ -0,0 +1,179 @@
+"""
+Профилирование запросов в продакшене.
+
+ProfilingMiddleware для доли PROFILING_SAMPLE_RATE запросов измеряет время SQL и число запросов,
+время представления и рендеринга шаблона и копит статистику по имени URL - последние PROFILING_WINDOW
+замеров. Заголовок Server-Timing (видно во вкладке Network браузера) получают только staff или все, если
+PROFILING_SERVER_TIMING = True: по нему посторонний узнал бы, какие страницы дорого обходятся базе.
+
+Каждый процесс копит замеры у себя и раз в PROFILING_FLUSH_INTERVAL секунд кладёт их в кэш под своим
+ключом; страница /admin/profiling/ (только для staff) сводит замеры всех процессов. Общей статистика будет
+при общем кэше (Memcached/Redis); с локальным кэшем видны замеры одного процесса.
+"""
+from collections import defaultdict, deque
+import os
+import random
+import socket
+import statistics
+import threading
+import time
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+WORKER = f'{socket.gethostname()}:{os.getpid()}'
+WORKERS_KEY = 'profiling:workers'
+WORKER_TIMEOUT = 600
+
+
+class Sample(NamedTuple):
+    total: float
+    view: float
+    render: float
+    db: float
+    queries: int
+
+
+class Measurement:
+    """Замер одного запроса; он же execute_wrapper для подсчёта SQL"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_started = self.render_started = None
+        self.view = self.render = self.db = 0.0
+        self.queries = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - started
+            self.queries += 1
+
+    def view_done(self):
+        if self.view_started is not None and not self.view:
+            self.view = time.perf_counter() - self.view_started
+
+    def rendered(self, response):
+        self.render = time.perf_counter() - self.render_started
+        return response
+
+    def sample(self) -> Sample:
+        total = time.perf_counter() - self.started
+        return Sample(*(round(1000 * value, 2) for value in (total, self.view, self.render, self.db)), self.queries)
+
+
+def server_timing(sample: Sample) -> str:
+    # заголовок - только latin-1, поэтому описания латиницей
+    return ', '.join([
+        f'db;dur={sample.db};desc="SQL x{sample.queries}"',
+        f'view;dur={sample.view};desc="View"',
+        f'tpl;dur={sample.render};desc="Template"',
+        f'total;dur={sample.total}',
+    ])
+
+
+#################################################
+#                   Статистика                  #
+#################################################
+class Collector:
+    """Замеры процесса по именам URL; в кэш выгружаются не чаще раза в PROFILING_FLUSH_INTERVAL"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = defaultdict(lambda: deque(maxlen=getattr(settings, 'PROFILING_WINDOW', 500)))
+        self.flushed = time.monotonic()
+
+    def add(self, name: str, sample: Sample):
+        with self.lock:
+            self.samples[name].append(sample)
+        if time.monotonic() - self.flushed > getattr(settings, 'PROFILING_FLUSH_INTERVAL', 10):
+            self.flush()
+
+    def flush(self):
+        self.flushed = time.monotonic()
+        with self.lock:
+            snapshot = {name: list(samples) for name, samples in self.samples.items()}
+        cache.set(f'profiling:{WORKER}', snapshot, WORKER_TIMEOUT)
+        # список процессов: гонка при одновременной записи исправится следующей выгрузкой
+        workers = cache.get(WORKERS_KEY, set()) | {WORKER}
+        cache.set(WORKERS_KEY, workers, None)
+
+
+collector = Collector()
+
+
+def _summary(samples) -> dict:
+    totals = sorted(sample.total for sample in samples)
+    return {
+        'count': len(samples),
+        'p50': totals[len(totals) // 2],
+        'p95': totals[min(int(len(totals) * 0.95), len(totals) - 1)],
+        'view': round(statistics.mean(sample.view for sample in samples), 2),
+        'render': round(statistics.mean(sample.render for sample in samples), 2),
+        'db': round(statistics.mean(sample.db for sample in samples), 2),
+        'queries': round(statistics.mean(sample.queries for sample in samples), 1),
+    }
+
+
+def statistics_by_url() -> dict:
+    """{имя URL: сводка} по замерам всех процессов, от самых медленных (p95)"""
+    collector.flush()
+    merged = defaultdict(list)
+    snapshots = cache.get_many([f'profiling:{worker}' for worker in cache.get(WORKERS_KEY, set())])
+    for snapshot in snapshots.values():
+        for name, samples in snapshot.items():
+            merged[name].extend(Sample(*sample) for sample in samples)
+    summaries = {name: _summary(samples) for name, samples in merged.items()}
+    return dict(sorted(summaries.items(), key=lambda item: -item[1]['p95']))
+
+
+#################################################
+#                   Middleware                  #
+#################################################
+class ProfilingMiddleware:
+    """Стоит в начале MIDDLEWARE: замер охватывает остальные middleware"""
+
+    def __init__(self, get_response):
+        self.rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0)
+        if not self.rate:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= self.rate:
+            return self.get_response(request)
+        request.profiling = measurement = Measurement()
+        with connection.execute_wrapper(measurement):
+            response = self.get_response(request)
+        measurement.view_done()
+        sample = measurement.sample()
+        if self.show_timing(request):
+            response['Server-Timing'] = server_timing(sample)
+        match = request.resolver_match
+        collector.add(match.view_name if match else '<нет URL>', sample)
+        return response
+
+    @staticmethod
+    def show_timing(request) -> bool:
+        if getattr(settings, 'PROFILING_SERVER_TIMING', False):
+            return True
+        user = getattr(request, 'user', None)
+        return user is not None and user.is_staff
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if hasattr(request, 'profiling'):
+            request.profiling.view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        # вызывается последним из middleware (в обратном порядке), дальше сразу рендеринг
+        measurement = getattr(request, 'profiling', None)
+        if measurement is not None:
+            measurement.view_done()
+            measurement.render_started = time.perf_counter()
+            response.add_post_render_callback(measurement.rendered)
+        return response
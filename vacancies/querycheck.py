@@ -0,0 +1,88 @@
+"""
+Контроль запросов к базе: бюджет запросов на страницу (команда check_queries, settings.QUERY_BUDGETS)
+и обнаружение N+1 - одинаковых по форме запросов внутри одного запроса к сайту.
+
+Форма запроса - SQL без параметров (Django передаёт значения отдельно), в котором списки IN (...)
+любой длины сведены к одному виду. Запрос, повторившийся NPLUSONE_THRESHOLD раз, почти всегда значит
+обращение к связанному объекту в цикле (vacancy.company без select_related).
+
+NPlusOneMiddleware по settings.NPLUSONE_MODE:
+
+* 'raise' - исключение RepeatedQueries (разработка, проверки);
+* 'log' - предупреждение в лог для доли NPLUSONE_SAMPLE_RATE запросов (продакшен);
+* 'off' - отключён.
+
+Тестов в проекте нет: check_queries - проверка для CI, код выхода 1 при превышении бюджета или N+1 (README).
+"""
+from collections import Counter
+import logging
+import random
+import re
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+SPACES = re.compile(r'\s+')
+
+
+class RepeatedQueries(Exception):
+    """Одинаковые запросы в цикле (N+1)"""
+
+
+def shape(sql: str) -> str:
+    return IN_LIST.sub('IN (...)', SPACES.sub(' ', sql))
+
+
+class QueryShapes:
+    """execute_wrapper, считающий запросы по форме"""
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        self.counts[shape(sql)] += 1
+        return execute(sql, params, many, context)
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def repeated(self, threshold=None) -> list:
+        """[(форма, сколько раз)] для форм, повторившихся не меньше threshold раз"""
+        threshold = threshold or getattr(settings, 'NPLUSONE_THRESHOLD', 3)
+        return [(sql, count) for sql, count in self.counts.most_common() if count >= threshold]
+
+
+def describe(repeated) -> str:
+    return '; '.join(f'{count} x {sql[:300]}' for sql, count in repeated)
+
+
+class NPlusOneMiddleware:
+
+    def __init__(self, get_response):
+        self.mode = getattr(settings, 'NPLUSONE_MODE', 'off')
+        if self.mode not in ('raise', 'log'):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def sampled(self) -> bool:
+        return self.mode == 'raise' or random.random() < getattr(settings, 'NPLUSONE_SAMPLE_RATE', 0.01)
+
+    def __call__(self, request):
+        if not self.sampled():
+            return self.get_response(request)
+        shapes = QueryShapes()
+        with connection.execute_wrapper(shapes):
+            response = self.get_response(request)
+        self.report(request, shapes.repeated())
+        return response
+
+    def report(self, request, repeated):
+        if repeated and self.mode == 'raise':
+            raise RepeatedQueries(f'{request.path}: {describe(repeated)}')
+        if repeated:
+            logger.warning('N+1 на %s: %s', request.path, describe(repeated))
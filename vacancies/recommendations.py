@@ -0,0 +1,204 @@
+"""
+Подборка вакансий для соискателя: готовая лента (модель Recommendation) - RECOMMENDATIONS_SIZE лучших
+вакансий специализации его резюме.
+
+Составляющие оценки (веса - RECOMMENDATIONS_WEIGHTS):
+
+* grade - квалификация из названия вакансии против квалификации резюме (vacancies.matching.vacancy_grade):
+  1 - разница / 4; нет в названии - 0.5;
+* salary - зарплата "до" не ниже ожидания: 1, ниже - её доля от ожидания;
+* text - доля терминов навыков вакансии, которые есть в опыте и образовании (хэши терминов matching);
+* fresh - свежесть: каждые RECOMMENDATIONS_FRESHNESS дней от FRESHNESS_EPOCH прибавляют вес fresh. Оценка
+  не зависит от даты расчёта, поэтому оценки, посчитанные в разное время, сравнимы и лента не стареет.
+
+Ленты строит команда build_recommendations (и задача rebuild_recommendations после массовой загрузки):
+по каждой специализации с резюме матрица оценок "пачка резюме x вакансии" и argpartition по строкам. Дальше:
+
+* новая вакансия (vacancies.signals) - задача recommend_vacancies оценивает её для всех резюме её
+  специализации и добавляет в ленты, куда она проходит (выше последней вакансии полной ленты);
+* новое или изменённое резюме - задача refresh_recommendations строит его ленту заново.
+
+Изменения уже опубликованных вакансий и лишние (сверх RECOMMENDATIONS_SIZE) записи лент исправляет
+следующий полный пересчёт - его стоит запускать раз в сутки. Удалённые вакансии и резюме уходят из лент
+каскадно.
+
+Страница ленты - один запрос по индексу (resume, score, vacancy) с курсорной пагинацией, как список вакансий.
+"""
+from collections import deque
+from datetime import date
+from itertools import islice
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Min
+import numpy as np
+
+from vacancies import jobs
+from vacancies.matching import HASH_BITS, term_bits, vacancy_grade
+from vacancies.models import Recommendation, Resume, Vacancy
+
+FRESHNESS_EPOCH = date(2021, 1, 1)
+
+VACANCY_FIELDS = ('id', 'title', 'skills', 'salary_max', 'published_at')
+RESUME_FIELDS = ('id', 'grade', 'salary', 'experience', 'education')
+
+DEFAULT_WEIGHTS = {'grade': 1, 'salary': 2, 'text': 3, 'fresh': 1}
+
+
+def _size() -> int:
+    return getattr(settings, 'RECOMMENDATIONS_SIZE', 30)
+
+
+def _bits(texts) -> np.ndarray:
+    """Хэши терминов текстов - строки из 0 и 1 (для умножения матриц)"""
+    texts = list(texts)
+    bits = np.zeros((len(texts), HASH_BITS), dtype=np.float32)
+    for number, text in enumerate(texts):
+        bits[number, term_bits(text)] = 1
+    return bits
+
+
+class VacancyColumns:
+    """Признаки вакансий (строки VACANCY_FIELDS); квалификация не указана - nan"""
+
+    def __init__(self, rows):
+        rows = list(rows)
+        freshness = getattr(settings, 'RECOMMENDATIONS_FRESHNESS', 30)
+        self.ids = np.array([row[0] for row in rows], dtype=np.int64)
+        self.grade = np.array([vacancy_grade(row[1]) or np.nan for row in rows], dtype=np.float64)
+        self.bits = _bits(row[2] for row in rows)
+        self.terms = np.maximum(self.bits.sum(axis=1), 1)
+        self.salary = np.array([row[3] for row in rows], dtype=np.float64)
+        self.fresh = np.array([(row[4] - FRESHNESS_EPOCH).days / freshness for row in rows], dtype=np.float64)
+
+
+class ResumeColumns:
+    """Признаки пачки резюме (строки RESUME_FIELDS)"""
+
+    def __init__(self, rows):
+        rows = list(rows)
+        self.ids = np.array([row[0] for row in rows], dtype=np.int64)
+        self.grade = np.array([row[1] for row in rows], dtype=np.float64)
+        self.salary = np.array([max(row[2], 1) for row in rows], dtype=np.float64)
+        self.bits = _bits(f'{row[3]} {row[4]}' for row in rows)
+
+
+def scores(resumes: ResumeColumns, vacancies: VacancyColumns) -> np.ndarray:
+    """Матрица оценок: строки - резюме, столбцы - вакансии"""
+    weights = getattr(settings, 'RECOMMENDATIONS_WEIGHTS', DEFAULT_WEIGHTS)
+    shape = (len(resumes.ids), len(vacancies.ids))
+    difference = np.abs(resumes.grade[:, None] - vacancies.grade)
+    grade = 1 - difference / 4
+    salary = vacancies.salary / resumes.salary[:, None]
+    components = {
+        'grade': np.where(np.isnan(vacancies.grade), 0.5, grade),
+        'salary': np.clip(salary, 0, 1),
+        'text': resumes.bits @ vacancies.bits.T / vacancies.terms,
+        'fresh': np.broadcast_to(vacancies.fresh, shape),
+    }
+    return sum(weight * components[name] for name, weight in weights.items())
+
+
+def best(matrix, vacancy_ids, size) -> list:
+    """[(id вакансии, оценка)] лучших size по каждой строке matrix, по убыванию"""
+    size = min(size, matrix.shape[1])
+    if not size:
+        return [[] for _ in range(matrix.shape[0])]
+    top = np.argpartition(-matrix, size - 1, axis=1)[:, :size]
+    values = np.take_along_axis(matrix, top, axis=1)
+    order = np.argsort(-values, axis=1, kind='stable')
+    top, values = np.take_along_axis(top, order, axis=1), np.take_along_axis(values, order, axis=1)
+    return [list(zip(vacancy_ids[row].tolist(), row_values.tolist())) for row, row_values in zip(top, values)]
+
+
+@transaction.atomic
+def store(resume_ids, lists):
+    """Заменяет ленты резюме resume_ids готовыми списками lists"""
+    Recommendation.objects.filter(resume_id__in=resume_ids).delete()
+    # executemany без объектов моделей: на миллионах записей bulk_create большую часть времени их создаёт
+    table = connection.ops.quote_name(Recommendation._meta.db_table)
+    rows = [(resume_id, *item) for resume_id, items in zip(resume_ids, lists) for item in items]
+    with connection.cursor() as cursor:
+        cursor.executemany(f'INSERT INTO {table} (resume_id, vacancy_id, score) VALUES (%s, %s, %s)', rows)
+
+
+def rebuild(resumes=None, batch_size=1000):
+    """Ленты резюме (всех, если resumes не задан) заново; отдаёт число готовых после каждой пачки"""
+    resumes = Resume.objects.all() if resumes is None else resumes
+    # вакансии читаются и разбираются только для специализаций, где есть резюме
+    codes = resumes.order_by('specialty_id').values_list('specialty_id', flat=True)
+    done = 0
+    for code in codes.distinct():
+        vacancies = VacancyColumns(Vacancy.objects.filter(specialty_id=code).values_list(*VACANCY_FIELDS))
+        rows = resumes.filter(specialty_id=code).order_by('id').values_list(*RESUME_FIELDS)
+        for batch in _batches(rows.iterator(chunk_size=batch_size), batch_size):
+            columns = ResumeColumns(batch)
+            store(columns.ids.tolist(), best(scores(columns, vacancies), vacancies.ids, _size()))
+            done += len(batch)
+            yield done
+
+
+def _batches(rows, size):
+    rows = iter(rows)
+    batch = list(islice(rows, size))
+    while batch:
+        yield batch
+        batch = list(islice(rows, size))
+
+
+def _floors(resume_ids) -> np.ndarray:
+    """Оценка, выше которой вакансия проходит в ленту резюме: последняя в полной ленте, иначе -inf"""
+    floors = dict.fromkeys(resume_ids, -np.inf)
+    feeds = Recommendation.objects.filter(resume_id__in=resume_ids).values('resume_id')
+    feeds = feeds.annotate(low=Min('score'), size=Count('id')).filter(size__gte=_size())
+    floors.update(feeds.values_list('resume_id', 'low'))
+    return np.array([floors[pk] for pk in resume_ids], dtype=np.float64)
+
+
+def recommend(vacancies: VacancyColumns, specialty, batch_size=1000):
+    """Добавляет вакансии одной специализации в ленты, куда они проходят"""
+    rows = Resume.objects.filter(specialty_id=specialty).order_by('id').values_list(*RESUME_FIELDS)
+    for batch in _batches(rows.iterator(chunk_size=batch_size), batch_size):
+        resumes = ResumeColumns(batch)
+        resume_ids, vacancy_ids = resumes.ids.tolist(), vacancies.ids.tolist()
+        matrix = scores(resumes, vacancies)
+        passed = np.argwhere(matrix > _floors(resume_ids)[:, None]).tolist()
+        # лента резюме могла быть построена заново уже с этими вакансиями
+        Recommendation.objects.bulk_create(
+            (
+                Recommendation(resume_id=resume_ids[row], vacancy_id=vacancy_ids[column], score=matrix[row, column])
+                for row, column in passed
+            ),
+            ignore_conflicts=True,
+        )
+
+
+#################################################
+#                 Фоновые задачи                #
+#################################################
+@jobs.task(priority=jobs.LOW, batch=True)
+def rebuild_recommendations(batch):
+    """После массовой загрузки вакансий или резюме: один пересчёт на все задания пачки"""
+    deque(rebuild(), maxlen=0)
+
+
+@jobs.task(priority=jobs.LOW, batch=True)
+def refresh_recommendations(batch):
+    """Ленты новых и изменённых резюме"""
+    deque(rebuild(Resume.objects.filter(id__in={pk for pk, in batch})), maxlen=0)
+
+
+@jobs.task(priority=jobs.LOW, batch=True)
+def recommend_vacancies(batch):
+    """Новые вакансии - в ленты резюме их специализаций"""
+    rows = Vacancy.objects.filter(id__in={pk for pk, in batch}).values_list('specialty_id', *VACANCY_FIELDS)
+    by_specialty = {}
+    for specialty, *fields in rows:
+        by_specialty.setdefault(specialty, []).append(fields)
+    for specialty, vacancy_rows in by_specialty.items():
+        recommend(VacancyColumns(vacancy_rows), specialty)
+
+
+def feed(user_id):
+    """Лента соискателя в порядке оценки (для курсорной пагинации по ключу (score, vacancy_id))"""
+    return Recommendation.objects.filter(resume__user_id=user_id).select_related('vacancy__company')
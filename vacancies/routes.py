@@ -0,0 +1,114 @@
+"""
+Страницы сайта для команд, которые обходят его целиком (bench_views): каждый именованный URL из
+conf/urls.py с подставленными параметрами и посетителем, под которым её открывать.
+
+Посетители (sample_visitors): 'anonymous' - без входа, 'owner' - владелец компании с вакансиями,
+'seeker' - соискатель с резюме, 'staff' - сотрудник, 'newcomer' - пользователь без компании и резюме.
+Страницы с LoginRequiredMixin открывает владелец, остальные - аноним, кроме перечисленных в ROUTE_VISITORS:
+у них свои проверки в представлении. Параметры берутся у компании владельца: у него открываются и
+публичные страницы, и "моя компания". Пропускаются admin, captcha, debug_toolbar (include) и адреса,
+которые по GET меняют данные (удаление, выход).
+"""
+from typing import NamedTuple
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.urls import get_resolver, reverse, URLPattern
+
+from vacancies.models import Company, Resume, Vacancy, VacancySkill
+
+UNSAFE = ('delete', 'logout')
+
+# страницы, которые без параметров запроса показывают не то, что нужно измерять
+QUERY_STRINGS = {
+    'search': '?s=python',
+    'api_vacancy_search': '?q=python',
+}
+
+
+# страницы, которые без входа (или под владельцем) перенаправляют на другие
+ROUTE_VISITORS = {
+    'resumes': 'owner',
+    'profiling': 'staff',
+    'my_company_letsstart': 'newcomer',
+    'my_resume_letsstart': 'newcomer',
+    'my_resume_form': 'seeker',
+    'my_recommendations': 'seeker',
+}
+
+
+class Route(NamedTuple):
+    name: str
+    path: str
+    visitor: str
+
+
+def sample_kwargs(user) -> dict:
+    """Значения параметров URL: вакансия, компания, специализация, навык и профиль пользователя"""
+    company = Company.objects.filter(owner=user).first()
+    vacancies = Vacancy.objects.order_by('id')
+    vacancy = vacancies.filter(company=company).first() or vacancies.first()
+    link = VacancySkill.objects.filter(vacancy=vacancy).select_related('skill').first()
+    resume = Resume.objects.filter(user=user).first()
+    return {
+        'vacancy_id': vacancy.id,
+        'company_id': vacancy.company_id,
+        'specialty': vacancy.specialty_id,
+        'skill': link.skill.slug if link else 'python',
+        'pk': user.pk,
+        'user_id': resume.user_id if resume else user.pk,
+    }
+
+
+def sample_user(user_model):
+    """Владелец компании с вакансиями - у него работают все страницы раздела "моя компания" """
+    return user_model.objects.filter(owner_user__vacancies__isnull=False).order_by('id').first()
+
+
+def sample_visitors(user_model) -> dict:
+    """Посетитель -> пользователь (None - аноним или такого пользователя нет)"""
+    users = user_model.objects.order_by('id')
+    return {
+        'anonymous': None,
+        'owner': sample_user(user_model),
+        'seeker': users.filter(resumes__isnull=False).first(),
+        'staff': users.filter(is_staff=True).first(),
+        'newcomer': users.filter(owner_user__isnull=True, resumes__isnull=True, is_staff=False).first(),
+    }
+
+
+def _visitor(pattern) -> str:
+    if pattern.name in ROUTE_VISITORS:
+        return ROUTE_VISITORS[pattern.name]
+    view_class = getattr(pattern.callback, 'view_class', None)
+    return 'owner' if view_class is not None and issubclass(view_class, LoginRequiredMixin) else 'anonymous'
+
+
+def routes(kwargs: dict) -> list:
+    """Все безопасные для GET страницы верхнего уровня conf/urls.py"""
+    patterns = [
+        pattern for pattern in get_resolver().url_patterns
+        if isinstance(pattern, URLPattern) and pattern.name and not pattern.name.endswith(UNSAFE)
+    ]
+    return [
+        Route(
+            pattern.name,
+            reverse(pattern.name, kwargs={name: kwargs[name] for name in pattern.pattern.converters})
+            + QUERY_STRINGS.get(pattern.name, ''),
+            _visitor(pattern),
+        )
+        for pattern in patterns
+    ]
+
+
+def sample_routes(user_model, names=()) -> tuple:
+    """Посетители для обхода и страницы (только names, если заданы)"""
+    visitors = sample_visitors(user_model)
+    if visitors['owner'] is None:
+        raise LookupError('Нет компании с вакансиями - сначала generate_data')
+    selected = [route for route in routes(sample_kwargs(visitors['owner'])) if not names or route.name in names]
+    missing = sorted({route.visitor for route in selected if route.visitor != 'anonymous'} - {
+        visitor for visitor, user in visitors.items() if user is not None
+    })
+    if missing:
+        raise LookupError(f'Нет пользователей для обхода: {", ".join(missing)}')
+    return visitors, selected
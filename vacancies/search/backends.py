@@ -0,0 +1,183 @@
+from functools import lru_cache
+from itertools import islice
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from vacancies.models import Resume, SearchDocument, Vacancy
+from vacancies.search import index, sql
+from vacancies.search.text import tokenize, words
+
+DEFAULT_BACKEND = 'vacancies.search.backends.IndexSearchBackend'
+
+
+def _results_limit() -> int:
+    # как у собственного индекса (vacancies.search.index): работа не растёт с числом совпадений
+    return getattr(settings, 'SEARCH_RESULTS_LIMIT', 1001)
+
+
+def _fetch_ids(query, params):
+    with connection.cursor() as cursor:
+        cursor.execute(query, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def id_ranges(queryset, batch_size):
+    """Диапазоны (первый, последний) id по batch_size записей"""
+    ids = queryset.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=batch_size)
+    while True:
+        batch = list(islice(ids, batch_size))
+        if not batch:
+            return
+        yield batch[0], batch[-1]
+
+
+class RankedResults:
+    """Объекты в порядке релевантности, грузятся из базы только для нужной страницы"""
+
+    def __init__(self, ids, queryset):
+        self.ids = ids
+        self.queryset = queryset
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        ids = self.ids[index]
+        objects = self.queryset.in_bulk(ids)
+        return [objects[pk] for pk in ids if pk in objects]
+
+
+class BaseSearchBackend:
+    """Поиск по вакансиям и резюме. Методы search_* возвращают id в порядке релевантности"""
+    vendor = None
+
+    def __init__(self):
+        if self.vendor and connection.vendor != self.vendor:
+            raise ImproperlyConfigured(f'{type(self).__name__} требует базу {self.vendor}, а не {connection.vendor}')
+
+    def index_vacancy(self, vacancy):
+        """Индексы на стороне базы обновляются триггерами"""
+
+    def index_company(self, company):
+        """Индексы на стороне базы обновляются триггерами"""
+
+    def index_vacancies(self, vacancies):
+        """Массовая вставка (bulk_create) сигналов не вызывает; индексы на стороне базы - триггеры"""
+
+    def search_vacancies(self, query: str) -> list:
+        raise NotImplementedError
+
+    def search_resumes(self, query: str) -> list:
+        raise NotImplementedError
+
+    def rebuild(self, batch_size: int):
+        """Перестраивает индекс пачками, отдаёт количество обработанных записей после каждой пачки"""
+        raise NotImplementedError
+
+
+class IndexSearchBackend(BaseSearchBackend):
+    """Собственный обратный индекс с BM25 (работает на любой базе)"""
+
+    def index_vacancy(self, vacancy):
+        index.index_vacancy(vacancy)
+
+    def index_company(self, company):
+        index.index_vacancies(company.vacancies.select_related('company'))
+
+    def index_vacancies(self, vacancies):
+        index.index_vacancies(vacancies)
+
+    def search_vacancies(self, query):
+        return index.search_vacancies(query)
+
+    def search_resumes(self, query):
+        condition = Q()
+        for word in words(query):
+            condition |= Q(name__icontains=word) | Q(surname__icontains=word) | Q(experience__icontains=word)
+        return list(Resume.objects.filter(condition).values_list('id', flat=True)) if condition else []
+
+    def rebuild(self, batch_size):
+        SearchDocument.objects.all().delete()
+        queryset = Vacancy.objects.select_related('company')
+        done = 0
+        for first, last in id_ranges(queryset, batch_size):
+            batch = list(queryset.filter(id__range=(first, last)))
+            index.index_vacancies(batch)
+            done += len(batch)
+            yield done
+
+
+class DatabaseSearchBackend(BaseSearchBackend):
+    """Индекс хранит сама база и обновляет триггерами (см. vacancies.search.sql)"""
+
+    def rebuild(self, batch_size):
+        sql.install(connection)
+        sql.execute_all(connection, sql.CLEAR.get(connection.vendor, ()))
+        done = 0
+        with connection.cursor() as cursor:
+            for model, statement in sql.POPULATE[connection.vendor]:
+                for first, last in id_ranges(apps.get_model(model).objects.all(), batch_size):
+                    cursor.execute(statement, [first, last])
+                    done += cursor.rowcount
+                    yield done
+
+
+class SqliteFTSSearchBackend(DatabaseSearchBackend):
+    """Виртуальные таблицы FTS5"""
+    vendor = 'sqlite'
+
+    @staticmethod
+    def _match(query):
+        # основа слова + префиксный поиск покрывают словоформы, которые unicode61 не нормализует
+        return ' OR '.join(f'"{term}"*' for term in set(tokenize(query)))
+
+    def _search(self, table, weights, query):
+        match = self._match(query)
+        if not match:
+            return []
+        return _fetch_ids(
+            f'SELECT rowid FROM {table} WHERE {table} MATCH %s ORDER BY bm25({table}, {weights}), rowid LIMIT %s',
+            [match, _results_limit()],
+        )
+
+    def search_vacancies(self, query):
+        return self._search('vacancies_vacancy_fts', '3.0, 2.0, 1.0, 2.0', query)
+
+    def search_resumes(self, query):
+        return self._search('vacancies_resume_fts', '3.0, 3.0, 2.0, 1.0', query)
+
+
+class PostgresSearchBackend(DatabaseSearchBackend):
+    """Колонка tsvector с GIN-индексом"""
+    vendor = 'postgresql'
+
+    @staticmethod
+    def _tsquery(query):
+        return ' | '.join(f'{word}:*' for word in set(words(query)))
+
+    def _search(self, table, query):
+        tsquery = self._tsquery(query)
+        if not tsquery:
+            return []
+        return _fetch_ids(
+            f"SELECT id FROM {table} WHERE search_vector @@ to_tsquery('russian', %s) "
+            f"ORDER BY ts_rank_cd(search_vector, to_tsquery('russian', %s)) DESC, id LIMIT %s",
+            [tsquery, tsquery, _results_limit()],
+        )
+
+    def search_vacancies(self, query):
+        return self._search('vacancies_vacancy', query)
+
+    def search_resumes(self, query):
+        return self._search('vacancies_resume', query)
+
+
+@lru_cache(maxsize=None)
+def get_backend() -> BaseSearchBackend:
+    """Бэкенд из settings.SEARCH_BACKEND"""
+    return import_string(getattr(settings, 'SEARCH_BACKEND', DEFAULT_BACKEND))()
@@ -0,0 +1,97 @@
+from collections import Counter
+import math
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Avg, Case, Count, F, FloatField, Sum, Value, When
+from django.db.models.functions import Cast
+
+from vacancies.models import SearchDocument, SearchPosting
+from vacancies.search.text import document_terms, tokenize
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+STATS_CACHE_KEY = 'search:collection_stats'
+
+
+def vacancy_terms(vacancy) -> Counter:
+    return document_terms(
+        title=vacancy.title,
+        skills=vacancy.skills,
+        description=vacancy.description,
+        company_name=vacancy.company.name,
+    )
+
+
+@transaction.atomic
+def index_vacancy(vacancy):
+    """Переиндексация одной вакансии"""
+    terms = vacancy_terms(vacancy)
+    document, _ = SearchDocument.objects.update_or_create(
+        vacancy_id=vacancy.id,
+        defaults={'length': sum(terms.values())},
+    )
+    document.postings.all().delete()
+    SearchPosting.objects.bulk_create(
+        SearchPosting(term=term, document=document, frequency=frequency) for term, frequency in terms.items()
+    )
+
+
+@transaction.atomic
+def index_vacancies(vacancies):
+    """Переиндексация пачки вакансий: по одному запросу на удаление и вставку документов и вхождений"""
+    terms = {vacancy.id: vacancy_terms(vacancy) for vacancy in vacancies}
+    SearchDocument.objects.filter(vacancy_id__in=terms).delete()
+    SearchDocument.objects.bulk_create(
+        SearchDocument(vacancy_id=pk, length=sum(counter.values())) for pk, counter in terms.items()
+    )
+    SearchPosting.objects.bulk_create(
+        SearchPosting(term=term, document_id=pk, frequency=frequency)
+        for pk, counter in terms.items() for term, frequency in counter.items()
+    )
+
+
+def _collection_stats():
+    """Количество документов и средняя длина (кэшируются, точность не критична)"""
+    stats = cache.get(STATS_CACHE_KEY)
+    if stats is None:
+        stats = SearchDocument.objects.aggregate(total=Count('pk'), avg_length=Avg('length'))
+        cache.set(STATS_CACHE_KEY, stats, getattr(settings, 'SEARCH_STATS_TIMEOUT', 300))
+    return stats['total'] or 0, stats['avg_length'] or 1
+
+
+def _idf(total, frequency):
+    return math.log(1 + (total - frequency + 0.5) / (frequency + 0.5))
+
+
+def _document_frequencies(terms) -> dict:
+    """{термин: число документов с ним} - счёт по индексу (term, document), без выборки вхождений"""
+    rows = SearchPosting.objects.filter(term__in=terms).values('term').annotate(found=Count('document_id'))
+    return {row['term']: row['found'] for row in rows}
+
+
+def _bm25(frequencies) -> Sum:
+    """Сумма BM25 вхождений документа; IDF терминов подставлен в запрос константами"""
+    total, avg_length = _collection_stats()
+    idf = Case(
+        *(When(term=term, then=Value(_idf(total, found))) for term, found in frequencies.items()),
+        output_field=FloatField(),
+    )
+    frequency = Cast('frequency', FloatField())
+    norm = BM25_K1 * (1 - BM25_B) + BM25_K1 * BM25_B / avg_length * F('document__length')
+    return Sum(idf * frequency * (BM25_K1 + 1) / (frequency + norm))
+
+
+def search_vacancies(query: str) -> list:
+    """id вакансий, отсортированные по убыванию релевантности (BM25), не больше SEARCH_RESULTS_LIMIT.
+
+    Оценки считает база (GROUP BY по документу) и отдаёт только лучшие: вхождения в Python не выбираются.
+    """
+    frequencies = _document_frequencies(set(tokenize(query)))
+    if not frequencies:
+        return []
+    postings = SearchPosting.objects.filter(term__in=frequencies).values('document_id')
+    ranked = postings.annotate(score=_bm25(frequencies)).order_by('-score', 'document_id')
+    return list(ranked.values_list('document_id', flat=True)[:getattr(settings, 'SEARCH_RESULTS_LIMIT', 1001)])
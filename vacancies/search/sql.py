@@ -0,0 +1,260 @@
+"""
+DDL полнотекстовых индексов, которые поддерживает сама база.
+
+Триггеры обновления срабатывают только на индексируемые колонки: счётчики, updated_at и прочие служебные
+UPDATE индекс не трогают.
+
+Все выражения идемпотентны. Триггеры SQLite ссылаются на соседние таблицы, а миграции SQLite пересоздают
+таблицу через DROP + RENAME, что с такими триггерами невозможно. Поэтому на время migrate триггеры SQLite
+удаляются (pre_migrate) и создаются заново после него (post_migrate), см. vacancies.signals.
+"""
+
+# максимальный id для заполнения «всей таблицы» теми же запросами, что и при пакетной перестройке
+MAX_ID = 2 ** 63 - 1
+
+SQLITE_SCHEMA = (
+    '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS vacancies_vacancy_fts
+    USING fts5(title, skills, description, company_name, tokenize = 'unicode61 remove_diacritics 2')
+    ''',
+    '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS vacancies_resume_fts
+    USING fts5(name, surname, experience, education, tokenize = 'unicode61 remove_diacritics 2')
+    ''',
+)
+
+SQLITE_TRIGGERS = (
+    '''
+    CREATE TRIGGER IF NOT EXISTS vacancies_vacancy_fts_insert AFTER INSERT ON vacancies_vacancy BEGIN
+        INSERT INTO vacancies_vacancy_fts(rowid, title, skills, description, company_name)
+        VALUES (new.id, new.title, new.skills, new.description,
+                (SELECT name FROM vacancies_company WHERE id = new.company_id));
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS vacancies_vacancy_fts_update
+    AFTER UPDATE OF title, skills, description, company_id ON vacancies_vacancy
+    WHEN old.title IS NOT new.title OR old.skills IS NOT new.skills
+        OR old.description IS NOT new.description OR old.company_id IS NOT new.company_id
+    BEGIN
+        DELETE FROM vacancies_vacancy_fts WHERE rowid = old.id;
+        INSERT INTO vacancies_vacancy_fts(rowid, title, skills, description, company_name)
+        VALUES (new.id, new.title, new.skills, new.description,
+                (SELECT name FROM vacancies_company WHERE id = new.company_id));
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS vacancies_vacancy_fts_delete AFTER DELETE ON vacancies_vacancy BEGIN
+        DELETE FROM vacancies_vacancy_fts WHERE rowid = old.id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS vacancies_company_fts_update AFTER UPDATE OF name ON vacancies_company BEGIN
+        UPDATE vacancies_vacancy_fts SET company_name = new.name
+        WHERE rowid IN (SELECT id FROM vacancies_vacancy WHERE company_id = new.id);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS vacancies_resume_fts_insert AFTER INSERT ON vacancies_resume BEGIN
+        INSERT INTO vacancies_resume_fts(rowid, name, surname, experience, education)
+        VALUES (new.id, new.name, new.surname, new.experience, new.education);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS vacancies_resume_fts_update
+    AFTER UPDATE OF name, surname, experience, education ON vacancies_resume
+    WHEN old.name IS NOT new.name OR old.surname IS NOT new.surname
+        OR old.experience IS NOT new.experience OR old.education IS NOT new.education
+    BEGIN
+        DELETE FROM vacancies_resume_fts WHERE rowid = old.id;
+        INSERT INTO vacancies_resume_fts(rowid, name, surname, experience, education)
+        VALUES (new.id, new.name, new.surname, new.experience, new.education);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS vacancies_resume_fts_delete AFTER DELETE ON vacancies_resume BEGIN
+        DELETE FROM vacancies_resume_fts WHERE rowid = old.id;
+    END
+    ''',
+)
+
+SQLITE_DROP_TRIGGERS = (
+    'DROP TRIGGER IF EXISTS vacancies_vacancy_fts_insert',
+    'DROP TRIGGER IF EXISTS vacancies_vacancy_fts_update',
+    'DROP TRIGGER IF EXISTS vacancies_vacancy_fts_delete',
+    'DROP TRIGGER IF EXISTS vacancies_company_fts_update',
+    'DROP TRIGGER IF EXISTS vacancies_resume_fts_insert',
+    'DROP TRIGGER IF EXISTS vacancies_resume_fts_update',
+    'DROP TRIGGER IF EXISTS vacancies_resume_fts_delete',
+)
+
+SQLITE_DROP = SQLITE_DROP_TRIGGERS + (
+    'DROP TABLE IF EXISTS vacancies_vacancy_fts',
+    'DROP TABLE IF EXISTS vacancies_resume_fts',
+)
+
+POSTGRES_SCHEMA = (
+    'ALTER TABLE vacancies_vacancy ADD COLUMN IF NOT EXISTS search_vector tsvector',
+    '''
+    CREATE INDEX IF NOT EXISTS vacancies_vacancy_search_vector
+    ON vacancies_vacancy USING GIN (search_vector)
+    ''',
+    '''
+    CREATE OR REPLACE FUNCTION vacancies_vacancy_search_vector() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('russian', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('russian', coalesce(NEW.skills, '')), 'B') ||
+            setweight(to_tsvector('russian', coalesce(
+                (SELECT name FROM vacancies_company WHERE id = NEW.company_id), '')), 'B') ||
+            setweight(to_tsvector('russian', coalesce(NEW.description, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    ''',
+    'DROP TRIGGER IF EXISTS vacancies_vacancy_search_vector ON vacancies_vacancy',
+    '''
+    CREATE TRIGGER vacancies_vacancy_search_vector
+    BEFORE INSERT OR UPDATE OF title, skills, description, company_id ON vacancies_vacancy
+    FOR EACH ROW EXECUTE PROCEDURE vacancies_vacancy_search_vector()
+    ''',
+    '''
+    CREATE OR REPLACE FUNCTION vacancies_company_search_vector() RETURNS trigger AS $$
+    BEGIN
+        IF NEW.name IS DISTINCT FROM OLD.name THEN
+            UPDATE vacancies_vacancy SET company_id = company_id WHERE company_id = NEW.id;
+        END IF;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    ''',
+    'DROP TRIGGER IF EXISTS vacancies_company_search_vector ON vacancies_company',
+    '''
+    CREATE TRIGGER vacancies_company_search_vector AFTER UPDATE OF name ON vacancies_company
+    FOR EACH ROW EXECUTE PROCEDURE vacancies_company_search_vector()
+    ''',
+    'ALTER TABLE vacancies_resume ADD COLUMN IF NOT EXISTS search_vector tsvector',
+    '''
+    CREATE INDEX IF NOT EXISTS vacancies_resume_search_vector
+    ON vacancies_resume USING GIN (search_vector)
+    ''',
+    '''
+    CREATE OR REPLACE FUNCTION vacancies_resume_search_vector() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('russian', coalesce(NEW.name, '') || ' ' || coalesce(NEW.surname, '')), 'A') ||
+            setweight(to_tsvector('russian', coalesce(NEW.experience, '')), 'B') ||
+            setweight(to_tsvector('russian', coalesce(NEW.education, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    ''',
+    'DROP TRIGGER IF EXISTS vacancies_resume_search_vector ON vacancies_resume',
+    '''
+    CREATE TRIGGER vacancies_resume_search_vector
+    BEFORE INSERT OR UPDATE OF name, surname, experience, education ON vacancies_resume
+    FOR EACH ROW EXECUTE PROCEDURE vacancies_resume_search_vector()
+    ''',
+)
+
+POSTGRES_DROP = (
+    'DROP TRIGGER IF EXISTS vacancies_vacancy_search_vector ON vacancies_vacancy',
+    'DROP TRIGGER IF EXISTS vacancies_company_search_vector ON vacancies_company',
+    'DROP TRIGGER IF EXISTS vacancies_resume_search_vector ON vacancies_resume',
+    'DROP FUNCTION IF EXISTS vacancies_vacancy_search_vector()',
+    'DROP FUNCTION IF EXISTS vacancies_company_search_vector()',
+    'DROP FUNCTION IF EXISTS vacancies_resume_search_vector()',
+    'ALTER TABLE vacancies_vacancy DROP COLUMN IF EXISTS search_vector',
+    'ALTER TABLE vacancies_resume DROP COLUMN IF EXISTS search_vector',
+)
+
+# (модель, запрос) - заполнение индекса для диапазона id
+SQLITE_POPULATE = (
+    (
+        'vacancies.Vacancy',
+        '''
+        INSERT INTO vacancies_vacancy_fts(rowid, title, skills, description, company_name)
+        SELECT v.id, v.title, v.skills, v.description, c.name
+        FROM vacancies_vacancy v JOIN vacancies_company c ON c.id = v.company_id
+        WHERE v.id BETWEEN %s AND %s
+        ''',
+    ),
+    (
+        'vacancies.Resume',
+        '''
+        INSERT INTO vacancies_resume_fts(rowid, name, surname, experience, education)
+        SELECT id, name, surname, experience, education FROM vacancies_resume
+        WHERE id BETWEEN %s AND %s
+        ''',
+    ),
+)
+
+SQLITE_CLEAR = (
+    'DELETE FROM vacancies_vacancy_fts',
+    'DELETE FROM vacancies_resume_fts',
+)
+
+# UPDATE индексируемой колонки без изменений заставляет триггер пересчитать search_vector
+POSTGRES_POPULATE = (
+    ('vacancies.Vacancy', 'UPDATE vacancies_vacancy SET title = title WHERE id BETWEEN %s AND %s'),
+    ('vacancies.Resume', 'UPDATE vacancies_resume SET name = name WHERE id BETWEEN %s AND %s'),
+)
+
+SCHEMA = {
+    'sqlite': SQLITE_SCHEMA,
+    'postgresql': POSTGRES_SCHEMA,
+}
+
+TRIGGERS = {
+    'sqlite': SQLITE_TRIGGERS,
+}
+
+DROP_TRIGGERS = {
+    'sqlite': SQLITE_DROP_TRIGGERS,
+}
+
+POPULATE = {
+    'sqlite': SQLITE_POPULATE,
+    'postgresql': POSTGRES_POPULATE,
+}
+
+CLEAR = {
+    'sqlite': SQLITE_CLEAR,
+}
+
+DROP = {
+    'sqlite': SQLITE_DROP,
+    'postgresql': POSTGRES_DROP,
+}
+
+
+def execute_all(connection, statements):
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def create_schema(connection):
+    """Таблицы и колонки индекса (без триггеров SQLite)"""
+    execute_all(connection, SCHEMA.get(connection.vendor, ()))
+
+
+def install(connection):
+    """Создаёт (или восстанавливает) индексы и триггеры для текущей базы"""
+    create_schema(connection)
+    execute_all(connection, TRIGGERS.get(connection.vendor, ()))
+
+
+def drop_triggers(connection):
+    execute_all(connection, DROP_TRIGGERS.get(connection.vendor, ()))
+
+
+def populate(connection):
+    """Заполняет индекс целиком по текущим данным"""
+    with connection.cursor() as cursor:
+        for _, statement in POPULATE.get(connection.vendor, ()):
+            cursor.execute(statement, [0, MAX_ID])
+
+
+def uninstall(connection):
+    execute_all(connection, DROP.get(connection.vendor, ()))
@@ -0,0 +1,96 @@
+import re
+
+#################################################
+#       Русский стеммер (алгоритм Портера)      #
+#################################################
+_RV = re.compile(r'^(.*?[аеиоуыэюя])(.*)$')
+_PERFECTIVE_GERUND = re.compile(r'((ив|ивши|ившись|ыв|ывши|ывшись)|((?<=[ая])(в|вши|вшись)))$')
+_REFLEXIVE = re.compile(r'(с[яь])$')
+_ADJECTIVE = re.compile(r'(ее|ие|ые|ое|ими|ыми|ей|ий|ый|ой|ем|им|ым|ом|его|ого|ему|ому|их|ых|ую|юю|ая|яя|ою|ею)$')
+_PARTICIPLE = re.compile(r'((ивш|ывш|ующ)|((?<=[ая])(ем|нн|вш|ющ|щ)))$')
+_VERB = re.compile(
+    r'((ила|ыла|ена|ейте|уйте|ите|или|ыли|ей|уй|ил|ыл|им|ым|ен|ило|ыло|ено|ят|ует|уют|ит|ыт|ены|ить|ыть|ишь|ую|ю)'
+    r'|((?<=[ая])(ла|на|ете|йте|ли|й|л|ем|н|ло|но|ет|ют|ны|ть|ешь|нно)))$',
+)
+_NOUN = re.compile(
+    r'(а|ев|ов|ие|ье|е|иями|ями|ами|еи|ии|и|ией|ей|ой|ий|й|иям|ям|ием|ем|ам|ом|о|у|ах|иях|ях|ы|ь|ию|ью|ю|ия|ья|я)$',
+)
+_I = re.compile(r'и$')
+_DERIVATIONAL = re.compile(r'.*[^аеиоуыэюя]+[аеиоуыэюя].*ость?$')
+_DERIVATIONAL_SUFFIX = re.compile(r'ость?$')
+_SOFT_SIGN = re.compile(r'ь$')
+_SUPERLATIVE = re.compile(r'(ейше|ейш)$')
+_DOUBLE_N = re.compile(r'нн$')
+
+
+def _strip_first(patterns, rv):
+    """Отрезает окончание по первому сработавшему шаблону"""
+    for pattern in patterns:
+        stripped = pattern.sub('', rv, count=1)
+        if stripped != rv:
+            return stripped, True
+    return rv, False
+
+
+def _strip_endings(rv):
+    """Шаг 1: деепричастия, возвратность, прилагательные, глаголы, существительные"""
+    rv, found = _strip_first((_PERFECTIVE_GERUND,), rv)
+    if found:
+        return rv
+
+    rv = _REFLEXIVE.sub('', rv, count=1)
+    rv, found = _strip_first((_ADJECTIVE,), rv)
+    if found:
+        return _PARTICIPLE.sub('', rv, count=1)
+
+    rv, _ = _strip_first((_VERB, _NOUN), rv)
+    return rv
+
+
+def _strip_suffixes(rv):
+    """Шаги 2-4: «и», словообразовательные суффиксы, превосходная степень, «нн» и «ь»"""
+    rv = _I.sub('', rv, count=1)
+    if _DERIVATIONAL.match(rv):
+        rv = _DERIVATIONAL_SUFFIX.sub('', rv, count=1)
+
+    stripped = _SOFT_SIGN.sub('', rv, count=1)
+    if stripped != rv:
+        return stripped
+
+    rv = _SUPERLATIVE.sub('', rv, count=1)
+    return _DOUBLE_N.sub('н', rv, count=1)
+
+
+def stem_russian(word: str) -> str:
+    match = _RV.match(word.replace('ё', 'е'))
+    if not match:
+        return word
+
+    prefix, rv = match.groups()
+    return prefix + _strip_suffixes(_strip_endings(rv))
+
+
+#################################################
+#            Облегчённый английский             #
+#################################################
+_EN_ENDINGS = re.compile(
+    r'(ational|ization|ations?|ingly|edly|ments?|ness|ings?|ies|ied|ed|(?:(?<=[sxz])|(?<=[cs]h))es|(?<!s)s)$',
+)
+_EN_VOWEL = re.compile(r'[aeiouy]')
+
+
+def stem_english(word: str) -> str:
+    stem = _EN_ENDINGS.sub('', word, count=1)
+    if len(stem) < 3 or not _EN_VOWEL.search(stem):
+        stem = word
+    return stem[:-1] if stem.endswith('e') and len(stem) > 3 else stem
+
+
+_CYRILLIC = re.compile(r'[а-яё]')
+
+
+def stem(word: str) -> str:
+    """Основа слова: русский или английский стеммер в зависимости от алфавита"""
+    if _CYRILLIC.search(word):
+        return stem_russian(word)
+    return stem_english(word)
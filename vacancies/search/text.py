@@ -0,0 +1,41 @@
+from collections import Counter
+import re
+
+from vacancies.search.stemmers import stem
+
+_TOKEN = re.compile(r'[а-яёa-z0-9+#]+')
+
+STOP_WORDS = frozenset((
+    'и', 'в', 'во', 'на', 'с', 'со', 'по', 'для', 'от', 'до', 'из', 'к', 'о', 'об', 'у', 'за', 'не', 'или', 'а',
+    'the', 'a', 'an', 'and', 'or', 'of', 'in', 'on', 'to', 'for', 'with', 'is', 'are',
+))
+
+# вес поля вакансии при подсчёте частоты термина
+FIELD_WEIGHTS = (
+    ('title', 3),
+    ('skills', 2),
+    ('company_name', 2),
+    ('description', 1),
+)
+
+
+def words(text: str):
+    """Слова текста в нижнем регистре, без стоп-слов"""
+    for token in _TOKEN.findall(str(text).lower()):
+        if token not in STOP_WORDS:
+            yield token
+
+
+def tokenize(text: str):
+    """Термины текста: основы слов"""
+    for word in words(text):
+        yield stem(word)[:50]
+
+
+def document_terms(**fields) -> Counter:
+    """Взвешенные частоты терминов по полям вакансии"""
+    terms = Counter()
+    for field, weight in FIELD_WEIGHTS:
+        for term in tokenize(fields.get(field, '')):
+            terms[term] += weight
+    return terms
@@ -0,0 +1,106 @@
+"""
+Сессии и пользователь без запросов к базе на каждый запрос вошедшего пользователя.
+
+* SessionStore (SESSION_ENGINE = 'vacancies.sessions') - сессии из кэша SESSION_CACHE_ALIAS, как cached_db;
+  база читается только при промахе кэша. В базу сразу пишутся новые сессии и смена входа (id пользователя,
+  хэш пароля), остальные изменения - в кэш сразу, а в базу не чаще раза в SESSION_WRITE_BEHIND секунд
+  (0 - всегда, как cached_db). Это экономит запись на каждый запрос при SESSION_SAVE_EVERY_REQUEST
+  (скользящий срок сессии). Отложенные изменения теряются, если кэш вытеснит сессию раньше, а другой
+  процесс с другим кэшем прочитает их из базы устаревшими - кэш должен быть общим для процессов сайта
+  (или процесс сайта один, как в Procfile).
+* CachedUserMiddleware (вместо AuthenticationMiddleware) - request.user из кэша по id пользователя на
+  USER_CACHE_TIMEOUT секунд, если кэш общий (vacancies.caching), иначе из базы; сессия сверяется
+  с хэшем пароля, как в django.contrib.auth.get_user.
+  Сохранение или удаление пользователя (профиль, вход, смена пароля) убирает его из кэша (vacancies.signals).
+
+Сессия без базы и кэша совсем - SESSION_ENGINE = 'django.contrib.sessions.backends.signed_cookies': данные
+в подписанной cookie, CachedUserMiddleware работает и с ней.
+"""
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.backends import cached_db
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+from vacancies import caching
+
+AUTH_KEYS = (auth.SESSION_KEY, auth.BACKEND_SESSION_KEY, auth.HASH_SESSION_KEY)
+
+
+#################################################
+#                     Сессии                    #
+#################################################
+class SessionStore(cached_db.SessionStore):
+    cache_key_prefix = 'vacancies.sessions'
+
+    @property
+    def persisted_key(self):
+        """Отметка о записи в базу: живёт SESSION_WRITE_BEHIND секунд, значение - вход на момент записи"""
+        return f'{self.cache_key}:persisted'
+
+    def _auth(self) -> list:
+        return [self._session.get(key) for key in AUTH_KEYS]
+
+    def _must_persist(self, must_create) -> bool:
+        interval = getattr(settings, 'SESSION_WRITE_BEHIND', 0)
+        return must_create or not interval or self._cache.get(self.persisted_key) != self._auth()
+
+    def save(self, must_create=False):
+        # без ключа - новая сессия: её создаёт запись в базу
+        if self.session_key is not None and not self._must_persist(must_create):
+            self._cache.set(self.cache_key, self._session, self.get_expiry_age())
+            return
+        super().save(must_create)
+        self._cache.set(self.persisted_key, self._auth(), getattr(settings, 'SESSION_WRITE_BEHIND', 0) or None)
+
+    def delete(self, session_key=None):
+        if session_key or self.session_key:
+            self._cache.delete(f'{self.cache_key_prefix}{session_key or self.session_key}:persisted')
+        super().delete(session_key)
+
+
+#################################################
+#                  Пользователь                 #
+#################################################
+def user_cache_key(user_id) -> str:
+    return f'user:{user_id}'
+
+
+def invalidate_user(user_id):
+    cache.delete(user_cache_key(user_id))
+
+
+def _verified(request, user):
+    session_hash = request.session.get(auth.HASH_SESSION_KEY)
+    return session_hash and constant_time_compare(session_hash, user.get_session_auth_hash())
+
+
+def _load_user(request):
+    """django.contrib.auth.get_user (он же проверит сессию) и в кэш"""
+    user = auth.get_user(request)
+    if user.is_authenticated and caching.is_shared():
+        cache.set(user_cache_key(user.pk), user, getattr(settings, 'USER_CACHE_TIMEOUT', 300))
+    return user
+
+
+def get_user(request):
+    """Пользователь сессии: из кэша, при промахе - из базы"""
+    user_id = request.session.get(auth.SESSION_KEY)
+    user = cache.get(user_cache_key(user_id)) if user_id and caching.is_shared() else None
+    if user is None:
+        return _load_user(request)
+    # пароль сменили в другой сессии - из этой выходим, как это делает django.contrib.auth
+    if not _verified(request, user):
+        request.session.flush()
+        return AnonymousUser()
+    return user
+
+
+class CachedUserMiddleware(AuthenticationMiddleware):
+    """request.user из кэша (get_user); наследник AuthenticationMiddleware - для проверок админки"""
+
+    def process_request(self, request):
+        request.user = SimpleLazyObject(lambda: get_user(request))
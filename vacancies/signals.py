@@ -0,0 +1,264 @@
+from django.contrib.auth.models import User
+from django.db import connections, transaction
+from django.db.models.signals import post_delete, post_init, post_migrate, post_save, pre_delete, pre_migrate
+from django.dispatch import receiver
+
+from vacancies import api, counters, counts, jobs, matching, recommendations, similar, skills, tasks, thumbnails
+from vacancies import owners, sessions, versions
+from vacancies.models import Application, Company, Resume, Skill, Specialty, Vacancy, VacancySkill
+from vacancies.search import sql
+from vacancies.search.backends import get_backend
+
+
+#################################################
+#                 Поисковый индекс              #
+#################################################
+@receiver(post_save, sender=Vacancy)
+def vacancy_saved(sender, instance, **kwargs):
+    # удаление из индекса происходит каскадно (или триггером) вместе с вакансией
+    get_backend().index_vacancy(instance)
+
+
+@receiver(post_save, sender=Company)
+def company_saved(sender, instance, created, **kwargs):
+    # название компании входит в индекс её вакансий - переиндексация всех вакансий идёт в фоне
+    if not created:
+        jobs.enqueue(tasks.reindex_companies, instance.pk)
+
+
+@receiver(pre_migrate)
+def search_schema_migrating(sender, using, **kwargs):
+    # SQLite не сможет пересоздать таблицу, на которую ссылаются триггеры FTS
+    if sender.name == 'vacancies':
+        sql.drop_triggers(connections[using])
+
+
+@receiver(post_migrate)
+def search_schema_migrated(sender, using, **kwargs):
+    if sender.name == 'vacancies':
+        sql.install(connections[using])
+
+
+#################################################
+#                    Счётчики                   #
+#################################################
+def _loaded(instance, *names):
+    """Значения полей или None, если какое-то из них отложено (.only()/.defer()): его чтение в post_init -
+    запрос к базе, новый объект и снова post_init"""
+    if instance.get_deferred_fields() & set(names):
+        return None
+    return tuple(getattr(instance, name) for name in names)
+
+
+@receiver(post_init, sender=Vacancy)
+def vacancy_loaded(sender, instance, **kwargs):
+    # запоминаем, где вакансия учтена, чтобы заметить перенос при сохранении
+    instance._counted_in = _loaded(instance, 'specialty_id', 'company_id')
+
+
+@receiver(post_save, sender=Vacancy)
+def vacancy_counted(sender, instance, created, raw=False, **kwargs):
+    # без загруженных специализации и компании (.only()) перенести вакансию сохранением нельзя
+    if created:
+        counters.vacancy_created(instance)
+    elif not raw and instance._counted_in:
+        counters.vacancy_moved(instance, *instance._counted_in)
+    instance._counted_in = (instance.specialty_id, instance.company_id)
+
+
+@receiver(post_delete, sender=Vacancy)
+def vacancy_uncounted(sender, instance, **kwargs):
+    counters.vacancy_deleted(instance)
+
+
+@receiver(post_save, sender=Application)
+def application_counted(sender, instance, created, **kwargs):
+    if created:
+        counters.application_created(instance)
+
+
+@receiver(post_delete, sender=Application)
+def application_uncounted(sender, instance, **kwargs):
+    counters.application_deleted(instance)
+
+
+#################################################
+#                     Навыки                    #
+#################################################
+@receiver(post_init, sender=Vacancy)
+def vacancy_skills_loaded(sender, instance, **kwargs):
+    # отложенное поле (.only()) не читаем - при сохранении связи просто пересчитаются
+    instance._linked_skills = instance.__dict__.get('skills') if instance.pk else None
+
+
+@receiver(post_save, sender=Vacancy)
+def vacancy_skills_saved(sender, instance, raw=False, **kwargs):
+    # при загрузке фикстур (raw) связи приходят в самой фикстуре
+    if not raw and instance.skills != instance._linked_skills:
+        skills.link_skills([instance], Skill, VacancySkill)
+    instance._linked_skills = instance.skills
+
+
+#################################################
+#                   Миниатюры                   #
+#################################################
+@receiver(post_init, sender=Company)
+@receiver(post_init, sender=Specialty)
+@receiver(post_init, sender=Application)
+def images_loaded(sender, instance, **kwargs):
+    deferred = instance.get_deferred_fields()
+    instance._thumbnailed = {
+        field: getattr(instance, field).name for field in thumbnails.IMAGE_FIELDS[sender] if field not in deferred
+    }
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_save, sender=Specialty)
+@receiver(post_save, sender=Application)
+def images_saved(sender, instance, **kwargs):
+    for field, name in instance._thumbnailed.items():
+        image = getattr(instance, field)
+        if image and image.name != name:
+            jobs.enqueue(thumbnails.process_image, sender._meta.label, instance.pk, field)
+    images_loaded(sender, instance)
+
+
+@receiver(post_delete, sender=Company)
+@receiver(post_delete, sender=Specialty)
+@receiver(post_delete, sender=Application)
+def images_deleted(sender, instance, **kwargs):
+    # в том числе при каскадном удалении компании с вакансиями и откликами
+    for field in thumbnails.IMAGE_FIELDS[sender]:
+        image = getattr(instance, field)
+        if image:
+            jobs.enqueue(tasks.delete_files, image.name)
+
+
+#################################################
+#                  Уведомления                  #
+#################################################
+@receiver(post_save, sender=Application)
+def application_sent(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        jobs.enqueue(tasks.notify_employers, instance.pk)
+
+
+#################################################
+#                 Версии страниц                #
+#################################################
+@receiver(post_save, sender=Company)
+def company_touched(sender, instance, created, raw=False, **kwargs):
+    # название и логотип компании видны на страницах и в карточках её вакансий
+    if not created and not raw:
+        versions.touch_vacancies(instance)
+
+
+#################################################
+#               Итоги списков (кэш)             #
+#################################################
+@receiver(post_save, sender=Vacancy)
+@receiver(post_delete, sender=Vacancy)
+def vacancies_changed(sender, **kwargs):
+    # после коммита, чтобы параллельный запрос не закэшировал итог по ещё старым данным
+    transaction.on_commit(lambda: counts.invalidate('vacancies'))
+
+
+@receiver(post_save, sender=Resume)
+@receiver(post_delete, sender=Resume)
+def resumes_changed(sender, **kwargs):
+    transaction.on_commit(lambda: counts.invalidate('resumes'))
+
+
+#################################################
+#                 Подбор резюме                 #
+#################################################
+@receiver(post_save, sender=Resume)
+def resume_matched(sender, instance, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(lambda: matching.resume_saved(instance))
+
+
+@receiver(post_delete, sender=Resume)
+def resume_unmatched(sender, instance, **kwargs):
+    # после удаления у объекта уже нет pk
+    pk = instance.pk
+    transaction.on_commit(lambda: matching.resume_deleted(pk))
+
+
+#################################################
+#                Похожие вакансии               #
+#################################################
+@receiver(post_init, sender=Vacancy)
+def vacancy_text_loaded(sender, instance, **kwargs):
+    instance._similar_text = _loaded(instance, *similar.TEXT_FIELDS) if instance.pk else None
+
+
+@receiver(post_save, sender=Vacancy)
+def vacancy_text_saved(sender, instance, raw=False, **kwargs):
+    # соседи зависят только от текста: сохранение без его изменения задачу не ставит
+    text = tuple(getattr(instance, name) for name in similar.TEXT_FIELDS)
+    if not raw and text != instance._similar_text:
+        jobs.enqueue(similar.update_similar, instance.pk)
+    instance._similar_text = text
+
+
+@receiver(pre_delete, sender=Vacancy)
+def vacancy_text_deleted(sender, instance, **kwargs):
+    # списки, где была вакансия, удалятся каскадом - их вакансии пересчитываются тем же заданием, а до
+    # него их страницы уже без этой карточки: новая версия сразу
+    listed = similar.listed_in([instance.pk])
+    similar.touch(listed)
+    jobs.enqueue(similar.update_similar, instance.pk, *listed)
+
+
+#################################################
+#               Подборка вакансий               #
+#################################################
+@receiver(post_save, sender=Vacancy)
+def vacancy_recommended(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        jobs.enqueue(recommendations.recommend_vacancies, instance.pk)
+
+
+@receiver(post_save, sender=Resume)
+def resume_recommended(sender, instance, raw=False, **kwargs):
+    if not raw:
+        jobs.enqueue(recommendations.refresh_recommendations, instance.pk)
+
+
+#################################################
+#                Кэш пользователя               #
+#################################################
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    # правка профиля, вход (last_login) и смена пароля сохраняют пользователя
+    sessions.invalidate_user(instance.pk)
+
+
+@receiver(post_init, sender=Company)
+@receiver(post_init, sender=Resume)
+def owned_loaded(sender, instance, **kwargs):
+    # прежний владелец: при переназначении (админка) кэш чистится и у него
+    instance._owned_by = instance.__dict__.get(owners.OWNED[sender])
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+@receiver(post_save, sender=Resume)
+@receiver(post_delete, sender=Resume)
+def owned_changed(sender, instance, **kwargs):
+    owners.invalidate_owned(sender, getattr(instance, owners.OWNED[sender]), instance._owned_by)
+
+
+#################################################
+#                 JSON API (кэш)                #
+#################################################
+@receiver(post_save, sender=Vacancy)
+@receiver(post_delete, sender=Vacancy)
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+@receiver(post_save, sender=Specialty)
+@receiver(post_delete, sender=Specialty)
+def api_data_changed(sender, **kwargs):
+    transaction.on_commit(api.invalidate)
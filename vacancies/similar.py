@@ -0,0 +1,244 @@
+"""
+Похожие вакансии на странице вакансии: соседи по TF-IDF, посчитанные заранее (модель SimilarVacancy).
+
+Вектор вакансии - взвешенные частоты терминов названия, навыков и описания (vacancies.search.text, веса
+полей те же, что в поиске), умноженные на IDF и нормированные по длине; сходство двух вакансий - косинус,
+то есть скалярное произведение векторов. Векторы - строки разреженной матрицы (scipy.sparse). Соседи
+считаются блоками по SIMILAR_BLOCK_SIZE строк: блок, умноженный на транспонированную матрицу, - плотный
+массив сходств со всеми вакансиями, argpartition берёт из каждой строки SIMILAR_COUNT лучших.
+
+* команда build_similar (и задача rebuild_similar после массовой загрузки) пересчитывает всех соседей;
+* сохранение текста или удаление вакансии ставит задачу update_similar (vacancies.signals): воркер
+  пересчитывает соседей самой вакансии, вакансий, в чьих списках она была (по таблице SimilarVacancy;
+  при удалении их находит сигнал до каскадного удаления списков), и вакансий, в чьи списки она теперь
+  проходит (по блоку её сходств со всеми);
+* страница вакансии читает готовый список одним запросом по индексу (vacancy, score).
+
+Воркер держит матрицу в памяти. Словарь и IDF фиксируются при её построении; она строится заново раз
+в SIMILAR_INDEX_TTL секунд, до этого новые термины не учитываются, а изменения, обработанные другими
+воркерами, не видны.
+"""
+from collections import Counter, deque
+from functools import lru_cache
+import math
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min
+from django.utils import timezone
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import norm
+
+from vacancies import jobs
+from vacancies.models import SimilarVacancy, Vacancy
+from vacancies.search.text import document_terms
+
+TEXT_FIELDS = ('title', 'skills', 'description')
+
+
+def _count() -> int:
+    return getattr(settings, 'SIMILAR_COUNT', 6)
+
+
+def _min_score() -> float:
+    return getattr(settings, 'SIMILAR_MIN_SCORE', 0.1)
+
+
+def _blocks(positions):
+    size = getattr(settings, 'SIMILAR_BLOCK_SIZE', 256)
+    for start in range(0, len(positions), size):
+        yield positions[start:start + size]
+
+
+def vacancy_terms(ids=None, batch_size=5000) -> dict:
+    """{id: Counter терминов} всех вакансий или вакансий ids"""
+    vacancies = Vacancy.objects.order_by('id') if ids is None else Vacancy.objects.filter(id__in=ids)
+    rows = vacancies.values_list('id', *TEXT_FIELDS).iterator(chunk_size=batch_size)
+    return {
+        pk: document_terms(title=title, skills=skills, description=description)
+        for pk, title, skills, description in rows
+    }
+
+
+class SimilarityIndex:
+    """Нормированные TF-IDF векторы вакансий и нижние границы их списков соседей"""
+
+    def __init__(self, terms: dict):
+        frequencies = Counter(term for counter in terms.values() for term in counter)
+        # термин одной вакансии ни с чем её не сближает
+        self.vocabulary = {term: column for column, term in enumerate(t for t, df in frequencies.items() if df > 1)}
+        total = len(terms)
+        self.idf = np.array(
+            [math.log((1 + total) / (1 + frequencies[term])) + 1 for term in self.vocabulary], dtype=np.float32,
+        )
+        self.ids = np.array(list(terms), dtype=np.int64)
+        self.rows = {pk: row for row, pk in enumerate(self.ids.tolist())}
+        self.matrix = self.vectors(terms.values())
+        # сходство, с которым вакансия попадает в список соседей строки: последнее в полном списке
+        self.floors = np.full(total, _min_score(), dtype=np.float32)
+
+    def vectors(self, counters) -> sparse.csr_matrix:
+        indptr, indices, data = [0], [], []
+        for counter in counters:
+            known = [(self.vocabulary[term], weight) for term, weight in counter.items() if term in self.vocabulary]
+            indices.extend(column for column, _ in known)
+            data.extend(weight for _, weight in known)
+            indptr.append(len(indices))
+        shape = (len(indptr) - 1, len(self.vocabulary))
+        data = np.array(data, dtype=np.float32)
+        matrix = sparse.csr_matrix((data, np.array(indices, dtype=np.int32), indptr), shape=shape)
+        matrix.data *= self.idf[matrix.indices]
+        matrix.data /= np.repeat(norm(matrix, axis=1), np.diff(matrix.indptr)).astype(np.float32)
+        return matrix
+
+    def positions(self, ids) -> np.ndarray:
+        return np.array([self.rows[pk] for pk in ids if pk in self.rows], dtype=np.int64)
+
+    #################################################
+    #                   Обновление                  #
+    #################################################
+    def update(self, terms: dict):
+        """Заменяет векторы вакансий terms, новые добавляет в конец; пустой Counter - удалённая вакансия"""
+        added = [pk for pk in terms if pk not in self.rows]
+        self.rows.update((pk, len(self.ids) + offset) for offset, pk in enumerate(added))
+        self.ids = np.concatenate([self.ids, np.array(added, dtype=np.int64)])
+        self.floors = np.concatenate([self.floors, np.full(len(added), _min_score(), dtype=np.float32)])
+        positions = self.positions(terms)
+        kept = np.ones(len(self.ids), dtype=np.float32)
+        kept[positions] = 0
+        old = sparse.vstack([self.matrix, sparse.csr_matrix((len(added), len(self.vocabulary)), dtype=np.float32)])
+        # новые строки встают на свои места умножением на матрицу размещения
+        placement = sparse.csr_matrix(
+            (np.ones(len(positions), dtype=np.float32), (positions, np.arange(len(positions)))),
+            shape=(len(self.ids), len(positions)),
+        )
+        self.matrix = (sparse.diags(kept) @ old + placement @ self.vectors(terms.values())).tocsr()
+
+    def load_floors(self):
+        """Нижние границы полных списков соседей из базы"""
+        lists = SimilarVacancy.objects.values('vacancy_id').annotate(low=Min('score'), size=Count('id'))
+        for pk, low in lists.filter(size__gte=_count()).values_list('vacancy_id', 'low'):
+            if pk in self.rows:
+                self.floors[self.rows[pk]] = low
+
+    #################################################
+    #                    Соседи                     #
+    #################################################
+    def similarities(self, positions) -> np.ndarray:
+        """Косинусы строк positions со всеми вакансиями (плотный блок); сама с собой - 0"""
+        block = (self.matrix[positions] @ self.matrix.T).toarray()
+        block[np.arange(len(positions)), positions] = 0
+        return block
+
+    def affected(self, positions) -> np.ndarray:
+        """Строки, в чьи списки соседей попадает какая-то из строк positions"""
+        found = [np.zeros(0, dtype=np.int64)]
+        for block in _blocks(positions):
+            similar = self.similarities(block)
+            found.append(np.flatnonzero((similar >= self.floors).any(axis=0)))
+        return np.unique(np.concatenate(found))
+
+    def neighbours(self, positions) -> dict:
+        """{id: [(id соседа, сходство)]} по убыванию сходства, не ниже SIMILAR_MIN_SCORE"""
+        similar = self.similarities(positions)
+        count = min(_count(), similar.shape[1])
+        top = np.argpartition(-similar, count - 1, axis=1)[:, :count]
+        order = np.argsort(-np.take_along_axis(similar, top, axis=1), axis=1, kind='stable')
+        top = np.take_along_axis(top, order, axis=1)
+        scores = np.take_along_axis(similar, top, axis=1)
+        lists = {}
+        for position, columns, values in zip(positions.tolist(), top, scores):
+            lists[int(self.ids[position])] = self._neighbour_list(position, columns, values)
+        return lists
+
+    def _neighbour_list(self, position, columns, values) -> list:
+        kept = values >= _min_score()
+        self.floors[position] = values[-1] if kept.all() else _min_score()
+        return list(zip(self.ids[columns[kept]].tolist(), values[kept].tolist()))
+
+    def refresh(self, positions):
+        """Пересчитывает и сохраняет соседей строк positions; отдаёт число готовых после каждого блока"""
+        done = 0
+        for block in _blocks(positions):
+            touch(store(self.neighbours(block)))
+            done += len(block)
+            yield done
+
+
+@transaction.atomic
+def store(neighbours: dict) -> set:
+    """Записывает списки соседей, которые изменились; отдаёт id их вакансий"""
+    stored = SimilarVacancy.objects.filter(vacancy_id__in=neighbours).order_by('vacancy_id', '-score')
+    before = {}
+    for pk, similar_id in stored.values_list('vacancy_id', 'similar_id'):
+        before.setdefault(pk, []).append(similar_id)
+    changed = {pk for pk, items in neighbours.items() if [other for other, _ in items] != before.get(pk, [])}
+    SimilarVacancy.objects.filter(vacancy_id__in=changed).delete()
+    SimilarVacancy.objects.bulk_create(
+        SimilarVacancy(vacancy_id=pk, similar_id=other, score=score)
+        for pk in changed for other, score in neighbours[pk]
+    )
+    return changed
+
+
+def touch(ids):
+    # блок похожих - часть страницы вакансии: новая версия для условного GET (vacancies.versions)
+    if ids:
+        Vacancy.objects.filter(id__in=ids).update(updated_at=timezone.now())
+
+
+def similar_vacancies(vacancy_id) -> list:
+    """Похожие вакансии по убыванию сходства, с компаниями (для карточек)"""
+    vacancies = Vacancy.objects.filter(similar_to__vacancy_id=vacancy_id).select_related('company')
+    return list(vacancies.order_by('-similar_to__score'))
+
+
+#################################################
+#                 Фоновые задачи                #
+#################################################
+@lru_cache(maxsize=1)
+def _index(period) -> SimilarityIndex:
+    index = SimilarityIndex(vacancy_terms())
+    index.load_floors()
+    return index
+
+
+def current_index() -> SimilarityIndex:
+    """Матрица этого процесса; строится заново раз в SIMILAR_INDEX_TTL секунд"""
+    return _index(int(time.monotonic() // getattr(settings, 'SIMILAR_INDEX_TTL', 3600)))
+
+
+def rebuild(batch_size=5000):
+    """Все соседи заново; отдаёт (готово, всего) после каждого блока"""
+    index = SimilarityIndex(vacancy_terms(batch_size=batch_size))
+    positions = np.arange(len(index.ids))
+    for done in index.refresh(positions):
+        yield done, len(positions)
+    _index.cache_clear()
+
+
+@jobs.task(priority=jobs.LOW, batch=True)
+def rebuild_similar(batch):
+    """После массовой загрузки вакансий без сигналов: одна перестройка на все задания пачки"""
+    deque(rebuild(), maxlen=0)
+
+
+def listed_in(ids) -> list:
+    """id вакансий, в чьих списках похожих есть какая-то из ids"""
+    return list(SimilarVacancy.objects.filter(similar_id__in=ids).values_list('vacancy_id', flat=True).distinct())
+
+
+@jobs.task(priority=jobs.LOW, batch=True)
+def update_similar(batch):
+    """Соседи изменённых и удалённых вакансий (аргументы задания - их id) и списки, в которые они входили
+    или должны войти"""
+    ids = {pk for args in batch for pk in args}
+    terms = dict.fromkeys(ids, Counter())
+    terms.update(vacancy_terms(ids))
+    index = current_index()
+    index.update(terms)
+    changed = index.positions(ids)
+    positions = np.unique(np.concatenate([index.positions(listed_in(ids)), index.affected(changed), changed]))
+    deque(index.refresh(positions), maxlen=0)
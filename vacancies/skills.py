@@ -0,0 +1,64 @@
+"""
+Навыки вакансий: текстовое поле Vacancy.skills ("Python, Django, Git") разбирается в справочник Skill
+и связи VacancySkill, по которым строятся страницы /vacancies/skill/<slug>.
+
+Модели передаются параметрами, чтобы тем же кодом пользовались миграции (исторические модели).
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django.utils.text import slugify
+
+MAX_LENGTH = 50
+
+# slugify отбрасывает эти символы, а они различают навыки: C, C++ и C# - cplusplus и csharp
+SLUG_SYMBOLS = str.maketrans({'+': 'plus', '#': 'sharp'})
+
+
+def skill_slug(name: str) -> str:
+    return slugify(name.translate(SLUG_SYMBOLS), allow_unicode=True)[:MAX_LENGTH]
+
+
+def parse_skills(text: str) -> dict:
+    """{slug: название} в порядке упоминания, повторы и пустые элементы отбрасываются"""
+    skills = {}
+    for part in text.split(','):
+        name = ' '.join(part.split())[:MAX_LENGTH]
+        skills.setdefault(skill_slug(name), name)
+    skills.pop('', None)
+    return skills
+
+
+def _skill_ids(skill_model, names: dict) -> dict:
+    """{slug: id}, недостающие навыки создаются"""
+    skill_model.objects.bulk_create(
+        [skill_model(slug=slug, name=name) for slug, name in names.items()], ignore_conflicts=True,
+    )
+    return dict(skill_model.objects.filter(slug__in=names).values_list('slug', 'id'))
+
+
+@transaction.atomic
+def link_skills(vacancies, skill_model, link_model):
+    """Перезаписывает связи вакансий с навыками по их полю skills"""
+    parsed = {vacancy.pk: parse_skills(vacancy.skills) for vacancy in vacancies}
+    names = {}
+    for skills in parsed.values():
+        names.update(skills)
+    ids = _skill_ids(skill_model, names)
+
+    link_model.objects.filter(vacancy_id__in=parsed).delete()
+    link_model.objects.bulk_create([
+        link_model(vacancy_id=pk, skill_id=ids[slug]) for pk, skills in parsed.items() for slug in skills
+    ])
+
+
+def popular_skills(skill_model, count) -> list:
+    """Навыки с наибольшим числом вакансий; список меняется медленно - кэш на SKILLS_CACHE_TIMEOUT секунд"""
+    key = f'skills:popular:{count}'
+    skills = cache.get(key)
+    if skills is None:
+        ranked = skill_model.objects.annotate(vacancy_total=Count('vacancy_links')).filter(vacancy_total__gt=0)
+        skills = list(ranked.order_by('-vacancy_total', 'name')[:count])
+        cache.set(key, skills, getattr(settings, 'SKILLS_CACHE_TIMEOUT', 3600))
+    return skills
@@ -0,0 +1,238 @@
+"""
+Синтетические данные для проверки масштабирования (команда generate_data): пользователи, компании,
+вакансии, резюме и отклики на русском языке в заданном количестве.
+
+Записи вставляются пачками через bulk_insert (vacancies.feeds) с теми же шагами после вставки, что и
+при импорте: навыки, счётчики, поисковый индекс. В памяти держится пачка и массив id вакансий
+(8 байт на вакансию) для ссылок из откликов. Даты публикации растягиваются на days дней назад:
+чем больше id, тем новее вакансия.
+"""
+from array import array
+from datetime import timedelta
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db.models import Max
+from django.utils import timezone
+
+from vacancies import api, counters, counts, jobs, recommendations, similar
+from vacancies.feeds import bulk_insert, VacancyFeed
+from vacancies.models import Application, Company, Resume, Specialty, Vacancy
+
+SPECIALTIES = {
+    'frontend': 'Фронтенд',
+    'backend': 'Бэкенд',
+    'gamedev': 'Геймдев',
+    'devops': 'Девопс',
+    'design': 'Дизайн',
+    'products': 'Продукты',
+    'management': 'Менеджмент',
+    'testing': 'Тестирование',
+}
+
+POSITIONS = {
+    'frontend': ['Фронтенд-разработчик', 'Верстальщик', 'React-разработчик', 'Vue.js-разработчик'],
+    'backend': ['Python-разработчик', 'Бэкенд-разработчик', 'Java-разработчик', 'Go-разработчик', 'PHP-программист'],
+    'gamedev': ['Unity-разработчик', 'Геймдизайнер', 'Разработчик игр на C++', '3D-художник'],
+    'devops': ['DevOps-инженер', 'Системный администратор', 'SRE-инженер', 'Инженер по безопасности'],
+    'design': ['UX/UI-дизайнер', 'Графический дизайнер', 'Веб-дизайнер', 'Дизайнер интерфейсов'],
+    'products': ['Продакт-менеджер', 'Продуктовый аналитик', 'Аналитик данных', 'Владелец продукта'],
+    'management': ['Руководитель разработки', 'Проектный менеджер', 'Тимлид', 'Технический директор'],
+    'testing': ['QA-инженер', 'Тестировщик', 'Инженер по автоматизации тестирования', 'Тест-менеджер'],
+}
+
+SKILLS = {
+    'frontend': ['JavaScript', 'TypeScript', 'React', 'Vue.js', 'HTML', 'CSS', 'Webpack', 'Git'],
+    'backend': ['Python', 'Django', 'Flask', 'PostgreSQL', 'Redis', 'Docker', 'Java', 'Go', 'Git', 'Linux'],
+    'gamedev': ['Unity', 'C#', 'C++', 'Unreal Engine', 'Blender', 'Git'],
+    'devops': ['Linux', 'Docker', 'Kubernetes', 'Ansible', 'Terraform', 'Nginx', 'Prometheus', 'Bash'],
+    'design': ['Figma', 'Photoshop', 'Illustrator', 'Sketch', 'Прототипирование', 'Типографика'],
+    'products': ['SQL', 'Python', 'A/B-тесты', 'Jira', 'Аналитика', 'Excel'],
+    'management': ['Scrum', 'Kanban', 'Jira', 'Управление командой', 'Планирование', 'Agile'],
+    'testing': ['Selenium', 'Pytest', 'Postman', 'SQL', 'Jira', 'Python', 'Нагрузочное тестирование'],
+}
+
+GRADES = ['Junior', 'Middle', 'Senior', 'Ведущий', 'Старший', 'Младший']
+
+SENTENCES = [
+    'Мы ищем специалиста, который готов расти вместе с продуктом.',
+    'Команда работает по Scrum, спринты длятся две недели.',
+    'Офис в центре города, возможна удалённая работа.',
+    'Оформление по ТК РФ, белая зарплата и ДМС со стоматологией.',
+    'Вы будете развивать сервис с миллионами пользователей.',
+    'У нас ревью кода, автотесты и непрерывная поставка.',
+    'Гибкий график, компенсация обучения и конференций.',
+    'Нужен опыт коммерческой разработки от двух лет.',
+    'Будет плюсом опыт работы с высоконагруженными системами.',
+    'Предстоит проектировать архитектуру новых модулей.',
+    'Мы ценим самостоятельность и умение договариваться.',
+    'Английский язык на уровне чтения документации.',
+    'Проект международный, часть команды работает из Европы.',
+    'Испытательный срок три месяца, затем пересмотр зарплаты.',
+]
+
+CITIES = [
+    'Москва', 'Санкт-Петербург', 'Новосибирск', 'Екатеринбург', 'Казань', 'Нижний Новгород',
+    'Самара', 'Краснодар', 'Воронеж', 'Пермь', 'Томск', 'Иннополис',
+]
+
+COMPANY_WORDS = (
+    ['Северный', 'Цифровой', 'Быстрый', 'Умный', 'Открытый', 'Первый', 'Новый', 'Облачный'],
+    ['Код', 'Поток', 'Сервис', 'Лаб', 'Софт', 'Системс', 'Технолоджи', 'Диджитал'],
+)
+
+FIRST_NAMES = ['Иван', 'Анна', 'Сергей', 'Мария', 'Алексей', 'Ольга', 'Дмитрий', 'Елена', 'Павел', 'Наталья']
+LAST_NAMES = ['Иванов', 'Смирнова', 'Кузнецов', 'Попова', 'Соколов', 'Лебедева', 'Козлов', 'Новикова']
+
+UNIVERSITIES = ['МГУ им. М.В. Ломоносова', 'СПбГУ', 'МФТИ', 'НГУ', 'УрФУ', 'КФУ', 'ННГУ им. Н.И. Лобачевского']
+
+
+class Generator:
+
+    def __init__(self, batch_size=5000, seed=None, days=365):
+        self.random = random.Random(seed)
+        self.batch_size = batch_size
+        self.days = days
+        logos = Company.objects.exclude(logo='').values_list('logo', flat=True).distinct()
+        self.logos = list(logos[:50]) or ['']
+        # имена пользователей уникальны между запусками: отсчёт от последнего id
+        self.user_offset = (User.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+        self.vacancy_ids = array('q')
+        self.resume_user_ids = array('q')
+
+    def _chunks(self, total):
+        for start in range(0, total, self.batch_size):
+            yield start, min(self.batch_size, total - start)
+
+    def _text(self, low, high) -> str:
+        return ' '.join(self.random.sample(SENTENCES, self.random.randint(low, high)))
+
+    def users(self, count, kind, **fields):
+        first = self.user_offset
+        self.user_offset += count
+        return bulk_insert(User, [
+            User(
+                username=f'synthetic_{kind}_{first + number}',
+                email=f'synthetic_{kind}_{first + number}@example.com',
+                first_name=self.random.choice(FIRST_NAMES),
+                last_name=self.random.choice(LAST_NAMES),
+                password=make_password(None),
+                **fields,
+            )
+            for number in range(count)
+        ])
+
+    def specialties(self) -> list:
+        for code, title in SPECIALTIES.items():
+            Specialty.objects.get_or_create(code=code, defaults={'title': title})
+        return list(SPECIALTIES)
+
+    def company(self, owner):
+        return Company(
+            name=f'{self.random.choice(COMPANY_WORDS[0])} {self.random.choice(COMPANY_WORDS[1])}',
+            location=self.random.choice(CITIES),
+            description=self._text(2, 4),
+            employee_count=self.random.choice(Company.EmployeeCount.values),
+            logo=self.random.choice(self.logos),
+            owner=owner,
+        )
+
+    def vacancy(self, company_ids, specialty):
+        salary = self.random.randrange(40, 400, 5) * 1000
+        return Vacancy(
+            title=f'{self.random.choice(GRADES)} {self.random.choice(POSITIONS[specialty])}',
+            skills=', '.join(self.random.sample(SKILLS[specialty], self.random.randint(2, 5))),
+            description=f'<p>{self._text(3, 7)}</p>',
+            salary_min=salary,
+            salary_max=salary + self.random.randrange(0, 150, 5) * 1000,
+            company_id=self.random.choice(company_ids),
+            specialty_id=specialty,
+        )
+
+    def resume(self, user, specialty):
+        return Resume(
+            user=user,
+            name=user.first_name,
+            surname=user.last_name,
+            status=self.random.choice(Resume.Status.values),
+            specialty_id=specialty,
+            salary=self.random.randrange(30, 350, 5) * 1000,
+            grade=self.random.choice(Resume.Grade.values),
+            education=f'{self.random.randint(2000, 2022)} {self.random.choice(UNIVERSITIES)}',
+            experience=self._text(1, 3),
+            portfolio=f'https://github.com/{user.username}',
+        )
+
+    def application(self):
+        user_id = self.random.choice(self.resume_user_ids) if self.resume_user_ids else None
+        return Application(
+            written_username=self.random.choice(FIRST_NAMES),
+            written_phone=f'+7916{self.random.randint(0, 9999999):07d}',
+            written_cover_letter=self._text(1, 3),
+            vacancy_id=self.random.choice(self.vacancy_ids),
+            user_id=user_id,
+        )
+
+    #################################################
+    #                    Этапы                      #
+    #################################################
+    def generate(self, vacancies, companies, resumes, applications):
+        """Генератор этапов: после каждой пачки отдаёт (модель, готово, всего)"""
+        specialties = self.specialties()
+        company_ids = []
+        for done, size in self._chunks(companies):
+            company_ids += [company.pk for company in bulk_insert(Company, [
+                self.company(owner) for owner in self.users(size, 'company')
+            ])]
+            yield 'companies', done + size, companies
+        yield from self.generate_vacancies(vacancies, company_ids, specialties)
+        yield from self.generate_resumes(resumes, specialties)
+        yield from self.generate_visitors()
+        for done, size in self._chunks(applications if self.vacancy_ids else 0):
+            bulk_insert(Application, [self.application() for _ in range(size)])
+            yield 'applications', done + size, applications
+        self.finish()
+
+    def generate_vacancies(self, total, company_ids, specialties):
+        feed = VacancyFeed()
+        for done, size in self._chunks(total if company_ids else 0):
+            batch = [self.vacancy(company_ids, self.random.choice(specialties)) for _ in range(size)]
+            feed.insert(batch)
+            self.vacancy_ids.extend(vacancy.pk for vacancy in batch)
+            yield 'vacancies', done + size, total
+
+    def generate_visitors(self):
+        """Сотрудник и пользователь без компании и резюме: под ними check_queries открывает свои страницы
+        (vacancies.routes); пароль непригоден, войти под ними нельзя"""
+        self.users(1, 'staff', is_staff=True)
+        self.users(1, 'newcomer')
+        yield 'users', 2, 2
+
+    def generate_resumes(self, total, specialties):
+        for done, size in self._chunks(total):
+            users = self.users(size, 'resume')
+            bulk_insert(Resume, [self.resume(user, self.random.choice(specialties)) for user in users])
+            self.resume_user_ids.extend(user.pk for user in users)
+            yield 'resumes', done + size, total
+
+    def finish(self):
+        self.spread_dates()
+        counters.reconcile()
+        counts.invalidate('vacancies')
+        counts.invalidate('resumes')
+        api.invalidate()
+        jobs.enqueue(similar.rebuild_similar)
+        jobs.enqueue(recommendations.rebuild_recommendations)
+
+    def spread_dates(self):
+        """published_at (auto_now_add) задаётся отдельными UPDATE по диапазонам id - по одному на день"""
+        ids = self.vacancy_ids  # по возрастанию: в порядке вставки
+        now = timezone.now()
+        today = now.date()
+        step = max(len(ids) // self.days, 1)
+        for age, start in enumerate(range(len(ids) - 1, -1, -step)):
+            low = ids[max(start - step + 1, 0)]
+            Vacancy.objects.filter(id__range=(low, ids[start])).update(
+                published_at=today - timedelta(days=age), updated_at=now,
+            )
@@ -0,0 +1,74 @@
+"""
+Фоновые задачи, которые раньше выполнялись прямо в запросе (ставятся из vacancies.signals).
+
+Все задачи пачечные: воркер передаёт аргументы всех заданий пачки одним списком, поэтому повторы
+(несколько сохранений одной компании, несколько откликов одному работодателю) схлопываются.
+"""
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.mail import send_mass_mail
+from django.db import transaction
+from django.template.loader import render_to_string
+
+from vacancies import jobs, thumbnails
+from vacancies.models import Application, Company, Vacancy
+from vacancies.search.backends import get_backend
+
+
+@jobs.task(priority=jobs.LOW, batch=True)
+def reindex_companies(batch):
+    """Название компании входит в поисковый индекс всех её вакансий"""
+    for company in Company.objects.filter(id__in={company_id for company_id, in batch}):
+        get_backend().index_company(company)
+
+
+def _in_use(name) -> bool:
+    # общие файлы: картинка по умолчанию, одно изображение у нескольких объектов
+    return any(
+        name == model._meta.get_field(field).default or model.objects.filter(**{field: name}).exists()
+        for model, fields in thumbnails.IMAGE_FIELDS.items() for field in fields
+    )
+
+
+@jobs.task(priority=jobs.LOW, batch=True)
+def delete_files(batch):
+    """Удаляет изображения удалённых объектов вместе с миниатюрами, если на них больше никто не ссылается"""
+    names = {name for name, in batch}
+    for name in (name for name in names if not _in_use(name)):
+        for path in [name] + thumbnails.thumbnail_names(name):
+            default_storage.delete(path)
+
+
+@jobs.task(priority=jobs.HIGH, batch=True)
+def delete_companies(batch):
+    """Удаление компаний: вакансии с откликами и связями - короткими транзакциями, затем сама компания"""
+    for company_id in {company_id for company_id, in batch}:
+        _delete_vacancies(company_id)
+        Company.objects.filter(id=company_id).delete()
+
+
+def _delete_vacancies(company_id, batch_size=100):
+    vacancies = Vacancy.objects.filter(company_id=company_id).values_list('id', flat=True)
+    ids = list(vacancies[:batch_size])
+    while ids:
+        with transaction.atomic():
+            Vacancy.objects.filter(id__in=ids).delete()
+        ids = list(vacancies[:batch_size])
+
+
+@jobs.task(priority=jobs.HIGH, batch=True)
+def notify_employers(batch):
+    """Одно письмо владельцу компании на все новые отклики из пачки"""
+    applications = Application.objects.filter(id__in={application_id for application_id, in batch})
+    applications = applications.exclude(vacancy__company__owner__email='').select_related('vacancy__company__owner')
+    by_owner = {}
+    for application in applications:
+        by_owner.setdefault(application.vacancy.company.owner, []).append(application)
+    send_mass_mail([_letter(owner, items) for owner, items in by_owner.items()])
+
+
+def _letter(owner, applications):
+    subject = f'Новые отклики на вакансии: {len(applications)}'
+    context = {'owner': owner, 'applications': applications, 'site_url': settings.SITE_URL}
+    body = render_to_string('vacancies/email/applications.txt', context)
+    return subject, body, settings.DEFAULT_FROM_EMAIL, [owner.email]
@@ -2,6 +2,9 @@ from typing import Union
 
 from django import template
 
+from vacancies import cards
+from vacancies.thumbnails import thumbnail_url
+
 register = template.Library()
 
 
@@ -25,3 +28,33 @@ def list_li(tags_str):
     tags_str = tags_str.split(',')
     tags = '</li><li>'.join(tags_str)
     return f'<li>{tags}</li>'
+
+
+@register.simple_tag(takes_context=True)
+def cursor_url(context, cursor):
+    """Ссылка на страницу курсорной пагинации с сохранением остальных GET-параметров"""
+    query = context['request'].GET.copy()
+    query.pop('page', None)
+    query.pop('cursor', None)
+    if cursor:
+        query['cursor'] = cursor
+    return f'?{query.urlencode()}'
+
+
+@register.inclusion_tag('vacancies/picture.html')
+def picture(image, size, **attrs):
+    """<picture> с миниатюрами WebP/JPEG размера size (list, card, detail); пока их нет - исходный файл;
+    нет файла (компания без логотипа) - ничего"""
+    if not image:
+        return {}
+    return {
+        'webp': thumbnail_url(image, size, 'webp'),
+        'src': thumbnail_url(image, size, 'jpeg') or image.url,
+        'attrs': attrs,
+    }
+
+
+@register.simple_tag()
+def vacancy_cards(vacancies):
+    """Карточки вакансий страницы списка из кэша (см. vacancies.cards)"""
+    return cards.render_cards(vacancies)
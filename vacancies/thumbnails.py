@@ -0,0 +1,141 @@
+"""
+Миниатюры загруженных изображений (логотипы компаний, картинки специализаций, фото в откликах).
+
+Для каждого изображения и размера из SIZES рядом в хранилище кладутся JPEG и, если Pillow собран
+с libwebp, WebP: media/thumbnails/<путь исходника без расширения>-<размер>.<jpg|webp>.
+Шаблоны выбирают вариант тегом {% picture %} (см. templatetags/my_filters.py).
+
+Обработка идёт фоновой задачей process_image (vacancies.jobs) после сохранения модели. Фото из откликов
+перед этим нормализуются: поворот по EXIF, уменьшение до PHOTO_MAX_SIZE, JPEG без метаданных.
+"""
+from io import BytesIO
+import os
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import features, Image, ImageOps
+
+from vacancies import versions
+from vacancies.jobs import task
+from vacancies.models import Application, Company, Specialty
+
+THUMBNAIL_DIR = 'thumbnails'
+
+# рамка (ширина, высота) вдвое больше размера в вёрстке - для экранов высокой плотности; увеличения нет
+SIZES = {
+    'list': (260, 160),
+    'card': (400, 220),
+    'detail': (800, 800),
+}
+
+FORMATS = ('webp', 'jpeg') if features.check('webp') else ('jpeg',)
+EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+QUALITY = 82
+
+IMAGE_FIELDS = {
+    Company: ('logo',),
+    Specialty: ('picture',),
+    Application: ('written_photo',),
+}
+
+# загружаются пользователями как есть (фото с телефона): нормализуются перед созданием миниатюр
+NORMALIZED_FIELDS = {('vacancies.Application', 'written_photo')}
+PHOTO_MAX_SIZE = (1600, 1600)
+
+
+def thumbnail_name(name: str, size: str, fmt: str) -> str:
+    root, extension = os.path.splitext(name)
+    return f'{THUMBNAIL_DIR}/{root}-{size}.{EXTENSIONS[fmt]}'
+
+
+def thumbnail_names(name: str) -> list:
+    return [thumbnail_name(name, size, fmt) for size in SIZES for fmt in FORMATS]
+
+
+def thumbnail_url(image, size: str, fmt: str = 'jpeg'):
+    """URL готовой миниатюры или None, если её ещё нет"""
+    name = thumbnail_name(image.name, size, fmt)
+    return default_storage.url(name) if default_storage.exists(name) else None
+
+
+def has_thumbnails(image) -> bool:
+    return all(default_storage.exists(name) for name in thumbnail_names(image.name))
+
+
+def _flatten(image):
+    """JPEG без прозрачности: прозрачные области логотипов становятся белыми"""
+    image = image.convert('RGBA')
+    background = Image.new('RGB', image.size, 'white')
+    background.paste(image, mask=image.getchannel('A'))
+    return background
+
+
+def _encode(image, fmt) -> bytes:
+    buffer = BytesIO()
+    image = image.convert('RGBA') if fmt == 'webp' else _flatten(image)
+    image.save(buffer, fmt, quality=QUALITY)
+    return buffer.getvalue()
+
+
+def _store(name, content):
+    # storage.save() не перезаписывает, а подбирает свободное имя
+    if default_storage.exists(name):
+        default_storage.delete(name)
+    default_storage.save(name, ContentFile(content))
+
+
+def _open(image):
+    with image.storage.open(image.name, 'rb') as file:
+        source = ImageOps.exif_transpose(Image.open(file))
+        source.load()
+    return source
+
+
+def normalize(instance, field):
+    """Заменяет исходный файл нормализованным JPEG; не-изображение удаляется. Возвращает файл или None"""
+    image = getattr(instance, field)
+    original = image.name
+    try:
+        source = _open(image)
+    except OSError:
+        # при загрузке проверяется только сигнатура файла
+        image.delete(save=False)
+    else:
+        source.thumbnail(PHOTO_MAX_SIZE, Image.LANCZOS)
+        stem = os.path.splitext(os.path.basename(original))[0]
+        image.save(f'{stem}.jpg', ContentFile(_encode(source, 'jpeg')), save=False)
+        default_storage.delete(original)
+    type(instance).objects.filter(pk=instance.pk).update(**{field: image.name or ''})
+    return image or None
+
+
+@task()
+def process_image(label, pk, field):
+    """Фоновая задача: нормализация (для NORMALIZED_FIELDS) и миниатюры изображения из поля модели"""
+    instance = apps.get_model(label).objects.filter(pk=pk).first()
+    image = getattr(instance, field, None)
+    if image and (label, field) in NORMALIZED_FIELDS:
+        image = normalize(instance, field)
+    if image:
+        generate(image)
+        touch(instance)
+
+
+def touch(instance):
+    """Сдвигает updated_at (если есть): страницы и карточки с прежней картинкой устаревают (vacancies.versions)"""
+    if hasattr(instance, 'updated_at'):
+        versions.touch(instance)
+
+
+def generate(image) -> list:
+    """Создаёт (пересоздаёт) все миниатюры изображения, возвращает их имена"""
+    source = _open(image)
+    names = []
+    for size, box in SIZES.items():
+        thumbnail = source.copy()
+        thumbnail.thumbnail(box, Image.LANCZOS)
+        for fmt in FORMATS:
+            names.append(thumbnail_name(image.name, size, fmt))
+            _store(names[-1], _encode(thumbnail, fmt))
+    return names
@@ -0,0 +1,69 @@
+"""
+Приём загружаемых файлов.
+
+Все загрузки в проекте - изображения. ImageUploadHandler сразу пишет их кусками во временный файл
+(без буфера в памяти) и уже на первом куске отбрасывает не-изображения (по сигнатуре), а на куске,
+переходящем за IMAGE_UPLOAD_MAX_SIZE, - слишком большие файлы. Отброшенный файл попадает в
+request.FILES как RejectedUpload, и поле формы с validate_upload показывает причину.
+
+Декодирование, поворот, уменьшение и перекодирование делаются уже вне запроса (vacancies.thumbnails).
+"""
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.template.defaultfilters import filesizeformat
+
+DEFAULT_MAX_SIZE = 10 * 1024 * 1024
+
+SIGNATURES = (b'\xff\xd8\xff', b'\x89PNG\r\n\x1a\n', b'GIF87a', b'GIF89a')
+
+
+def is_image(head: bytes) -> bool:
+    """JPEG, PNG, GIF или WebP по первым байтам файла"""
+    return head.startswith(SIGNATURES) or (head[:4] == b'RIFF' and head[8:12] == b'WEBP')
+
+
+class RejectedUpload(UploadedFile):
+    """Пустая заглушка вместо отброшенного файла"""
+
+    def __init__(self, name, size, reason):
+        super().__init__(BytesIO(), name=name, size=size)
+        self.reason = reason
+
+
+class ImageUploadHandler(TemporaryFileUploadHandler):
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+        self.reason = None
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.reason is None:
+            self.reason = self._check(raw_data, start)
+            return self._discard() if self.reason else super().receive_data_chunk(raw_data, start)
+        return None
+
+    def file_complete(self, file_size):
+        if self.reason is None:
+            return super().file_complete(file_size)
+        return RejectedUpload(self.file_name, self.received, self.reason)
+
+    def _check(self, raw_data, start):
+        if start == 0 and not is_image(raw_data[:12]):
+            return 'Загрузите изображение: JPEG, PNG, GIF или WebP'
+        limit = getattr(settings, 'IMAGE_UPLOAD_MAX_SIZE', DEFAULT_MAX_SIZE)
+        return f'Файл больше {filesizeformat(limit)}' if self.received > limit else None
+
+    def _discard(self):
+        # временный файл удаляется при закрытии, остаток потока только дочитывается
+        self.file.close()
+
+
+def validate_upload(value):
+    if isinstance(value, RejectedUpload):
+        raise ValidationError(value.reason)
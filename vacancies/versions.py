@@ -0,0 +1,71 @@
+"""
+Версии публичных страниц и условный GET: посетитель, у которого страница уже есть (браузер, поисковый
+робот), получает 304 Not Modified без рендеринга.
+
+Версия страницы - время последнего изменения (поля updated_at) и число вакансий (счётчики
+vacancy_count). Удалённая вакансия из MAX(updated_at) пропадает, но счётчик компании и специализации
+меняется вместе с их updated_at (vacancies.counters) - Last-Modified тоже растёт. Всё это - один-два
+запроса по первичному ключу и индексам (компания/специализация, updated_at).
+
+Вакансия показывает название и логотип своей компании, поэтому изменение компании сдвигает updated_at
+и её вакансий (vacancies.signals, vacancies.thumbnails) - страницы списков достаточно сверять по вакансиям.
+Страница вакансии сверяется и по карточкам похожих: их изменение, новый список (vacancies.similar) и
+удаление соседа (vacancies.signals) сдвигают версию.
+
+Условный GET только для анонимных посетителей: у вошедших на странице имя, сообщения и формы.
+"""
+from datetime import datetime
+from typing import NamedTuple
+
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.functional import cached_property
+from django.views.decorators.http import condition
+
+from vacancies.models import Company, Vacancy
+
+
+class PageVersion(NamedTuple):
+    modified: datetime
+    count: int = 0
+
+    @property
+    def etag(self) -> str:
+        return f'{self.modified.timestamp()}-{self.count}'
+
+
+def latest(owner, vacancies) -> PageVersion:
+    """Версия страницы владельца (компании, специализации) со списком его вакансий"""
+    modified = vacancies.aggregate(latest=Max('updated_at'))['latest'] or owner.updated_at
+    return PageVersion(max(owner.updated_at, modified), owner.vacancy_count)
+
+
+def touch_vacancies(company):
+    Vacancy.objects.filter(company_id=company.pk).update(updated_at=company.updated_at)
+
+
+def touch(instance):
+    """Новое updated_at без сохранения модели и сигналов; для компании - и у её вакансий"""
+    instance.updated_at = timezone.now()
+    type(instance).objects.filter(pk=instance.pk).update(updated_at=instance.updated_at)
+    if isinstance(instance, Company):
+        touch_vacancies(instance)
+
+
+class ConditionalGetMixin:
+    """ETag и Last-Modified по get_page_version(); 304 до вызова get() представления"""
+
+    def get_page_version(self) -> PageVersion:
+        raise NotImplementedError
+
+    @cached_property
+    def page_version(self) -> PageVersion:
+        return self.get_page_version()
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.user.is_authenticated or request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        return condition(
+            etag_func=lambda *args, **kwargs: self.page_version.etag,
+            last_modified_func=lambda *args, **kwargs: self.page_version.modified,
+        )(super().dispatch)(request, *args, **kwargs)
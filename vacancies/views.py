@@ -1,20 +1,29 @@
+from django.conf import settings
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.models import User
 from django.contrib.auth.views import LoginView
-from django.db.models import Count
-from django.db.models import Q
-from django.http import Http404, HttpResponseNotFound, HttpResponseServerError
+from django.http import HttpResponseNotFound, HttpResponseServerError, JsonResponse
 from django.shortcuts import get_object_or_404
 from django.shortcuts import redirect
 from django.shortcuts import render
 from django.urls import reverse_lazy
+from django.utils.decorators import method_decorator
+from django.utils.functional import cached_property
 from django.views.generic import CreateView, DeleteView, TemplateView, UpdateView, View
 from django.views.generic.list import ListView
 
+from vacancies import exports, jobs, matching, profiling, recommendations, similar, skills, tasks
+from vacancies.counts import CachedCountMixin
+from vacancies.facets import FacetedListMixin
 from vacancies.forms import ApplicationForm, CompanyForm, ResumeForm, VacancyForm
 from vacancies.forms import MyLoginForm, MyRegistrationForm, UserProfileForm
-from vacancies.models import Application, Company, Resume, Specialty, Vacancy
+from vacancies.models import Application, Company, Resume, Skill, Specialty, Vacancy
+from vacancies.owners import company_or_404
+from vacancies.pagination import KeysetPaginationMixin
+from vacancies.search.backends import get_backend, RankedResults
+from vacancies.versions import ConditionalGetMixin, latest, PageVersion
 
 
 #################################################
@@ -65,64 +74,114 @@ class UserProfile(LoginRequiredMixin, UpdateView):
 class MainView(TemplateView):
     """Главная"""
     template_name = 'vacancies/main.html'
+    async_prefetch = ('specialties', 'companies', 'popular_skills')  # независимые запросы (см. vacancies.async_views)
+
+    @cached_property
+    def specialties(self):
+        return list(Specialty.objects.all()[:8])
+
+    @cached_property
+    def companies(self):
+        return list(Company.objects.all()[:8])
+
+    @cached_property
+    def popular_skills(self):
+        # примеры под строкой поиска - только навыки, у которых есть страница
+        return skills.popular_skills(Skill, 3)
 
     def get_context_data(self, **kwargs):
         context = super(MainView, self).get_context_data(**kwargs)
-        context['specialties'] = Specialty.objects.annotate(count=Count('vacancies__specialty_id'))[:8]
-        context['companies'] = Company.objects.annotate(count=Count('vacancies__specialty_id'))[:8]
+        context['specialties'] = self.specialties
+        context['companies'] = self.companies
+        context['popular_skills'] = self.popular_skills
         return context
 
 
-class VacanciesView(ListView):
+class VacanciesView(FacetedListMixin, CachedCountMixin, KeysetPaginationMixin, ListView):
     """Все вакансии"""
     template_name = 'vacancies/vacancies.html'
     model = Vacancy
     context_object_name = 'vacancies'
     paginate_by = 3
+    async_prefetch = ('total', 'facet_counts')
 
     def get_queryset(self, **kwargs):
-        return self.model.objects.select_related('company').all()
+        return self.filter_facets(self.model.objects.select_related('company').all())
 
     def get_context_data(self, **kwargs):
         context = super(VacanciesView, self).get_context_data(**kwargs)
-        context['vacancies_count'] = Vacancy.objects.count()
+        context['vacancies_count'], context['vacancies_count_approximate'] = self.total
         return context
 
 
-class VacanciesSpecialtyView(VacanciesView):
+class VacanciesSpecialtyView(ConditionalGetMixin, VacanciesView):
     """Вакансии по специализации"""
 
+    @cached_property
+    def specialty(self):
+        return get_object_or_404(Specialty, code=self.kwargs['specialty'])
+
+    def get_page_version(self):
+        return latest(self.specialty, Vacancy.objects.filter(specialty_id=self.specialty.code))
+
     def get_queryset(self, **kwargs):
-        return self.model.objects.select_related('company').filter(specialty_id=self.kwargs['specialty'])
+        queryset = self.model.objects.select_related('company').filter(specialty_id=self.kwargs['specialty'])
+        return self.filter_facets(queryset)
+
+    def get_count_key(self):
+        return super().get_count_key() + (self.kwargs['specialty'],)
 
     def get_context_data(self, **kwargs):
         context = super(VacanciesSpecialtyView, self).get_context_data(**kwargs)
-        context['specialty'] = get_object_or_404(Specialty, code=self.kwargs['specialty'])
-        context['vacancies_count'] = Vacancy.objects.filter(specialty_id=self.kwargs['specialty']).count()
+        context['specialty'] = self.specialty
+        return context
+
+
+class VacanciesSkillView(VacanciesView):
+    """Вакансии по навыку (через индекс связей навык - вакансия)"""
+
+    def get_queryset(self, **kwargs):
+        self.skill = get_object_or_404(Skill, slug=self.kwargs['skill'])
+        return self.filter_facets(self.model.objects.select_related('company').filter(skill_tags=self.skill))
+
+    def get_count_key(self):
+        return super().get_count_key() + (self.skill.pk,)
+
+    def get_context_data(self, **kwargs):
+        context = super(VacanciesSkillView, self).get_context_data(**kwargs)
+        context['skill'] = self.skill
         return context
 
 
-class ResumesView(ListView):
+class ResumesView(CachedCountMixin, KeysetPaginationMixin, ListView):
     """Все резюме"""
     template_name = 'vacancies/resumes.html'
     model = Resume
     context_object_name = 'resumes'
     paginate_by = 3
+    keyset = ('id',)
+    count_namespace = 'resumes'
+
+    @property
+    def count_limit(self):
+        # поиск отдаёт не больше SEARCH_RESULTS_LIMIT резюме (vacancies.search.backends) - итог "более 1000"
+        return settings.SEARCH_COUNT_LIMIT if self.request.GET.get('s', '').strip() else None
 
     def get(self, request, *args, **kwargs):
-        try:
-            Company.objects.get(owner_id=request.user.id)
-        except Company.DoesNotExist:
+        if not request.company:
             return redirect('resumes_access')
-        else:
-            return super().get(request, *args, **kwargs)
+        return super().get(request, *args, **kwargs)
 
     def get_queryset(self, **kwargs):
-        return self.model.objects.all()
+        request_user = self.request.GET.get('s', '').strip()
+        if not request_user:
+            return self.model.objects.all()
+        return RankedResults(get_backend().search_resumes(request_user), self.model.objects.all())
 
     def get_context_data(self, **kwargs):
         context = super(ResumesView, self).get_context_data(**kwargs)
-        context['resumes_count'] = Resume.objects.count()
+        context['s'] = self.request.GET.get('s', '')
+        context['resumes_count'], context['resumes_count_approximate'] = self.total
         return context
 
 
@@ -133,53 +192,86 @@ class ResumesAccessView(TemplateView):
 class SearchView(VacanciesView):
     """Поиск вакансий(строка поиска)"""
     template_name = 'vacancies/search.html'
+    count_limit = settings.SEARCH_COUNT_LIMIT
+    facets = ()
+
+    def get_count_key(self):
+        # пустой запрос - это список всех вакансий, итог общий с VacanciesView
+        return ('VacanciesView',)
 
     def get_queryset(self):
-        request_user = self.request.GET.get('s')
-        return self.model.objects.select_related('company').filter(
-            Q(title__icontains=request_user) | Q(description__icontains=request_user),
-        )
+        queryset = self.model.objects.select_related('company')
+        request_user = self.request.GET.get('s', '').strip()
+        if not request_user:
+            return queryset.all()
+        return RankedResults(get_backend().search_vacancies(request_user), queryset)
 
     def get_context_data(self, **kwargs):
         context = super(SearchView, self).get_context_data(**kwargs)
         context['s'] = self.request.GET.get('s')
-        context['vacancies_count'] = context['paginator'].count
         return context
 
 
-class CompanyCardView(VacanciesView):
+class CompanyCardView(ConditionalGetMixin, VacanciesView):
     """Карточка компании"""
     template_name = 'vacancies/company/company.html'
+    facets = ()
+    async_prefetch = ('company', 'total')
+
+    @cached_property
+    def company(self):
+        return get_object_or_404(Company, id=self.kwargs['company_id'])
+
+    def get_page_version(self):
+        return latest(self.company, Vacancy.objects.filter(company_id=self.company.pk))
 
     def get_queryset(self, **kwargs):
         return Vacancy.objects.select_related('company').filter(company_id=self.kwargs['company_id'])
 
+    def get_count_key(self):
+        return 'company', self.kwargs['company_id']
+
     def get_context_data(self, **kwargs):
         context = super(CompanyCardView, self).get_context_data(**kwargs)
-        context['company'] = get_object_or_404(Company, id=self.kwargs['company_id'])
+        context['company'] = self.company
         return context
 
 
-class VacancyView(CreateView):
+class VacancyView(ConditionalGetMixin, CreateView):
     """Страница вакансии + отклик"""
     template_name = 'vacancies/vacancy.html'
     model = Vacancy
     form_class = ApplicationForm
+    async_prefetch = ('vacancy', 'application_sent', 'similar_vacancies')
+
+    @cached_property
+    def vacancy(self):
+        return get_object_or_404(self.model.objects.select_related('company'), id=self.kwargs['vacancy_id'])
+
+    @cached_property
+    def similar_vacancies(self):
+        return similar.similar_vacancies(self.kwargs['vacancy_id'])
+
+    def get_page_version(self):
+        # карточки похожих - тоже часть страницы; список тот же, что потом уйдёт в шаблон
+        shown = [self.vacancy, *self.similar_vacancies]
+        modified = max(moment for vacancy in shown for moment in (vacancy.updated_at, vacancy.company.updated_at))
+        return PageVersion(modified, len(self.similar_vacancies))
+
+    @cached_property
+    def application_sent(self):
+        return Application.objects.filter(vacancy_id=self.kwargs['vacancy_id'], user_id=self.request.user.id).exists()
 
     def get_success_url(self, **kwargs):
         return reverse_lazy('resume_send', kwargs={'vacancy_id': self.kwargs['vacancy_id']})
 
     def get_context_data(self, **kwargs):
         context = super(VacancyView, self).get_context_data(**kwargs)
+        context['application_sent'] = self.application_sent
+        context['vacancy'] = self.vacancy
+        context['similar'] = self.similar_vacancies
 
-        user_in_application = Application.objects.filter(
-            vacancy_id=self.kwargs['vacancy_id'],
-            user_id=self.request.user.id,
-        )
-        context['application_sent'] = user_in_application
-        context['vacancy'] = self.model.objects.select_related('company').get(id=self.kwargs['vacancy_id'])
-
-        if user_in_application:
+        if self.application_sent:
             messages.info(self.request, 'Вы уже отзывались на эту вакансию')
 
         return context
@@ -211,7 +303,7 @@ class MyCompanyLetsstarView(View):
     template_name = 'vacancies/company/company-create.html'
 
     def get(self, request, *args, **kwargs):
-        if Company.objects.filter(owner_id=request.user.id).values():
+        if request.company:
             return redirect('my_company_form')
         return render(request, 'vacancies/company/company-create.html')
 
@@ -260,20 +352,13 @@ class MyCompanyView(LoginRequiredMixin, UpdateView):
         return super().form_invalid(form)
 
 
-class MyCompanyDeleteView(LoginRequiredMixin, DeleteView):
-    """Удаление компании"""
-    model = Company
-    success_url = reverse_lazy("my_company_letsstart")
-
-    def get(self, *args, **kwargs):
-        return self.post(*args, **kwargs)
+class MyCompanyDeleteView(LoginRequiredMixin, View):
+    """Удаление компании: каскад (вакансии, отклики, индекс) - в фоне, задачей tasks.delete_companies"""
 
-    def get_object(self, queryset=None):
-        return self.get_queryset().get(owner_id=self.request.user.id).get()
-
-    def delete(self, request, *args, **kwargs):
-        messages.success(self.request, 'Компания удалена')
-        return super(MyCompanyDeleteView, self).delete(request, *args, **kwargs)
+    def get(self, request, *args, **kwargs):
+        jobs.enqueue(tasks.delete_companies, company_or_404(request).id)
+        messages.success(request, 'Компания удаляется: через несколько секунд её и её вакансий не станет')
+        return redirect('main')
 
 
 class MyVacanciesView(LoginRequiredMixin, ListView):
@@ -283,8 +368,7 @@ class MyVacanciesView(LoginRequiredMixin, ListView):
     context_object_name = 'vacancies'
 
     def get_queryset(self):
-        company_id = get_object_or_404(Company, owner_id=self.request.user.id)
-        return Vacancy.objects.filter(company_id=company_id).annotate(application_count=Count('applications'))
+        return Vacancy.objects.filter(company_id=company_or_404(self.request).id)
 
 
 class MyVacancyCreateView(LoginRequiredMixin, CreateView):
@@ -298,7 +382,7 @@ class MyVacancyCreateView(LoginRequiredMixin, CreateView):
 
     def form_valid(self, form):
         form_add = form.save(commit=False)
-        form_add.company_id = Company.objects.get(owner_id=self.request.user.id).id
+        form_add.company_id = company_or_404(self.request).id
         form.save()
 
         messages.success(self.request, 'Вакансия успешно создана')
@@ -317,16 +401,15 @@ class MyVacancyView(LoginRequiredMixin, UpdateView):
     pk_url_kwarg = 'vacancy_id'
 
     def get_object(self, queryset=None):
-        vacancy = get_object_or_404(Vacancy, id=self.kwargs['vacancy_id'])
-        company_user = get_object_or_404(Company, owner_id=self.request.user.id)
-        # проверка, что компания принадлежит юзеру
-        if vacancy.company_id != company_user.id:
-            raise Http404
-        return vacancy
+        # чужая вакансия - 404, как и несуществующая
+        return get_object_or_404(Vacancy, id=self.kwargs['vacancy_id'], company_id=company_or_404(self.request).id)
 
     def get_context_data(self, **kwargs):
         context = super(MyVacancyView, self).get_context_data(**kwargs)
-        context['applications'] = Application.objects.filter(vacancy_id=self.kwargs['vacancy_id'])
+        # на странице - последние отклики, все - в выгрузке (MyVacancyApplicationsExportView)
+        applications = Application.objects.filter(vacancy_id=self.kwargs['vacancy_id']).order_by('-id')
+        context['applications'] = applications[:settings.APPLICATIONS_ON_PAGE]
+        context['candidates'] = matching.best_candidates(self.object, settings.MATCHING_CANDIDATES)
         context['vacancy_exists'] = self.kwargs['vacancy_id']
         return context
 
@@ -343,6 +426,30 @@ class MyVacancyView(LoginRequiredMixin, UpdateView):
         return super().form_invalid(form)
 
 
+class MyApplicationsExportView(LoginRequiredMixin, View):
+    """Выгрузка откликов на все вакансии компании (?format=csv|xlsx)"""
+
+    def get_queryset(self):
+        return Application.objects.filter(vacancy__company_id=company_or_404(self.request).id)
+
+    def get_filename(self):
+        return 'applications'
+
+    def get(self, request, *args, **kwargs):
+        return exports.applications_response(self.get_queryset(), request.GET.get('format', 'csv'), self.get_filename())
+
+
+class MyVacancyApplicationsExportView(MyApplicationsExportView):
+    """Выгрузка откликов на одну вакансию компании"""
+
+    def get_queryset(self):
+        vacancy = get_object_or_404(Vacancy, id=self.kwargs['vacancy_id'], company_id=company_or_404(self.request).id)
+        return Application.objects.filter(vacancy_id=vacancy.id)
+
+    def get_filename(self):
+        return f'applications-{self.kwargs["vacancy_id"]}'
+
+
 class MyVacancyDeleteView(LoginRequiredMixin, DeleteView):
     """Удаление вакансии"""
     model = Vacancy
@@ -353,11 +460,7 @@ class MyVacancyDeleteView(LoginRequiredMixin, DeleteView):
         return self.post(*args, **kwargs)
 
     def get_object(self, queryset=None):
-        vacnacy = get_object_or_404(Vacancy, id=self.kwargs['vacancy_id'])
-        company_user = get_object_or_404(Company, owner_id=self.request.user.id)
-        if vacnacy.company_id != company_user.id:
-            raise Http404
-        return vacnacy
+        return get_object_or_404(Vacancy, id=self.kwargs['vacancy_id'], company_id=company_or_404(self.request).id)
 
     def delete(self, request, *args, **kwargs):
         messages.success(self.request, 'Вакансия удалена')
@@ -371,7 +474,7 @@ class MyResumeLetsstartView(LoginRequiredMixin, View):
     """Резюме, редложение создать"""
 
     def get(self, request, *args, **kwargs):
-        if Resume.objects.filter(user_id=request.user.id):
+        if request.resume:
             return redirect('my_resume_form')
         return render(request, 'vacancies/resume/resume-create.html')
 
@@ -420,6 +523,26 @@ class MyResumeView(LoginRequiredMixin, UpdateView):
         return super().form_invalid(form)
 
 
+class MyRecommendationsView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
+    """Подборка вакансий по резюме: готовая лента, листается курсором по оценке"""
+    template_name = 'vacancies/resume/recommendations.html'
+    context_object_name = 'recommendations'
+    paginate_by = 3
+    pagination_mode = 'keyset'
+    keyset = ('score', 'vacancy_id')
+
+    def get_queryset(self):
+        return recommendations.feed(self.request.user.id)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['vacancies'] = [recommendation.vacancy for recommendation in context['page_obj']]
+        if not context['vacancies']:
+            # пустая лента: резюме нет или лента ещё не построена
+            context['has_resume'] = bool(self.request.resume)
+        return context
+
+
 class MyResumeDeleteView(LoginRequiredMixin, DeleteView):
     model = Resume
     success_url = reverse_lazy("my_resume_letsstart")
@@ -437,6 +560,26 @@ class MyResumeDeleteView(LoginRequiredMixin, DeleteView):
         return super(MyResumeDeleteView, self).delete(request, *args, **kwargs)
 
 
+#################################################
+#                 Профилирование                #
+#################################################
+@method_decorator(staff_member_required, name='dispatch')
+class ProfilingView(TemplateView):
+    """Статистика ProfilingMiddleware по именам URL; ?format=json - для скриптов"""
+    template_name = 'vacancies/profiling.html'
+
+    def get(self, request, *args, **kwargs):
+        if request.GET.get('format') == 'json':
+            return JsonResponse(profiling.statistics_by_url(), json_dumps_params={'ensure_ascii': False})
+        return super().get(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['statistics'] = profiling.statistics_by_url()
+        context['sample_rate'] = getattr(settings, 'PROFILING_SAMPLE_RATE', 0)
+        return context
+
+
 def custom_handler404(request, exception):
     return HttpResponseNotFound(render(request, '404.html'))
 